@@ -30,7 +30,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # 2. Import your application's settings and database Base
 
-from app.config import settings
+from app.config import get_settings
 
 from app.database import Base
 
@@ -48,6 +48,28 @@ target_metadata = Base.metadata
 
 
 
+# 4. Multi-store mode: `alembic -x store=<id> upgrade head` migrates that
+
+# store's database (see app/stores.py and scripts/migrate_stores.py)
+
+def database_url() -> str:
+
+    store = context.get_x_argument(as_dictionary=True).get("store")
+
+    if store:
+
+        from app import stores
+
+        if not stores.is_known(store):
+
+            raise SystemExit(f"Unknown store {store!r}; add it to STORE_IDS")
+
+        return stores.store_url(store)
+
+    return get_settings().database_url
+
+
+
 # --- CUSTOM CONFIGURATION END ---
 
 
@@ -90,7 +112,7 @@ def run_migrations_offline() -> None:
 
     # CLEAN CODE: Read URL from settings, not alembic.ini
 
-    url = settings.database_url
+    url = database_url()
 
     
 
@@ -132,7 +154,7 @@ def run_migrations_online() -> None:
 
     configuration = config.get_section(config.config_ini_section)
 
-    configuration["sqlalchemy.url"] = settings.database_url
+    configuration["sqlalchemy.url"] = database_url()
 
 
 
@@ -152,7 +174,10 @@ def run_migrations_online() -> None:
 
         context.configure(
 
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            # Online backfills commit per chunk (app/online_migration.py),
+            # so each migration file gets its own transaction
+            transaction_per_migration=True,
 
         )
 
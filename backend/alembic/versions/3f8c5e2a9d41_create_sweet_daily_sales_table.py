@@ -0,0 +1,34 @@
+"""create sweet_daily_sales table
+
+Revision ID: 3f8c5e2a9d41
+Revises: 7a2d94c1e6b8
+Create Date: 2026-10-19 21:48:15.630174
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8c5e2a9d41'
+down_revision: Union[str, Sequence[str], None] = '7a2d94c1e6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Starts empty: past purchases were never recorded, so plans sharpen as sales come in
+    op.create_table('sweet_daily_sales',
+    sa.Column('sweet_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('sweet_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sweet_daily_sales')
@@ -0,0 +1,35 @@
+"""create popular sweets table
+
+Revision ID: 5b1e0c9d2a47
+Revises: f47023e49865
+Create Date: 2026-10-19 15:02:37.481920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e0c9d2a47'
+down_revision: Union[str, Sequence[str], None] = 'f47023e49865'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('popular_sweets',
+    sa.Column('sweet_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Float(), nullable=False),
+    sa.Column('error', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['sweet_id'], ['sweets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('sweet_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('popular_sweets')
@@ -0,0 +1,34 @@
+"""create sweet stock slots table
+
+Revision ID: 630bad9e2aef
+Revises: 23a15d2b78cb
+Create Date: 2026-10-19 11:03:27.540112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '630bad9e2aef'
+down_revision: Union[str, Sequence[str], None] = '23a15d2b78cb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sweet_stock_slots',
+    sa.Column('sweet_id', sa.Integer(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['sweet_id'], ['sweets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('sweet_id', 'slot')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sweet_stock_slots')
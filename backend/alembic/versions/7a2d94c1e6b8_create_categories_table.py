@@ -0,0 +1,98 @@
+"""create categories table and link sweets to it
+
+Revision ID: 7a2d94c1e6b8
+Revises: e5a90f1b7c24
+Create Date: 2026-10-19 20:31:44.207913
+
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2d94c1e6b8'
+down_revision: Union[str, Sequence[str], None] = 'e5a90f1b7c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of the app code (app/categories.py at this revision), so the
+# migration keeps doing the same thing when the app changes
+sweets = sa.table('sweets', sa.column('id'), sa.column('category'), sa.column('category_id'))
+categories = sa.table('categories', sa.column('id'), sa.column('name'), sa.column('key'))
+
+
+def clean(name: str) -> str:
+    return " ".join(name.split())
+
+
+def normalize(name: str) -> str:
+    return clean(name).casefold()
+
+
+def link_all(connection) -> None:
+    """Links every sweet to a category, named after the most common spelling of its group."""
+    spellings = connection.execute(
+        sa.select(sweets.c.category, sa.func.count())
+        .where(sweets.c.category_id.is_(None))
+        .group_by(sweets.c.category)
+    ).all()
+    if not spellings:
+        return
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    for spelling, count in spellings:
+        counts[normalize(spelling)][spelling] += count
+
+    connection.execute(categories.insert(), [
+        # Ties broken alphabetically
+        {"name": clean(min(counter, key=lambda s: (-counter[s], s))), "key": key}
+        for key, counter in counts.items()
+    ])
+    linked = {row.key: (row.id, row.name)
+              for row in connection.execute(sa.select(categories.c.id, categories.c.name, categories.c.key))}
+
+    updates = []
+    for key, counter in counts.items():
+        category_id, name = linked[key]
+        updates.extend({"spelling": spelling, "new_id": category_id, "new_name": name} for spelling in counter)
+    connection.execute(
+        sweets.update()
+        .where(sweets.c.category_id.is_(None), sweets.c.category == sa.bindparam("spelling"))
+        .values(category_id=sa.bindparam("new_id"), category=sa.bindparam("new_name")),
+        updates,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_categories_key'), 'categories', ['key'], unique=True)
+    # SQLite cannot add a foreign key in place: batch mode rebuilds the table once
+    with op.batch_alter_table('sweets') as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_sweets_category_id', 'categories', ['category_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_sweets_category_id'), ['category_id'], unique=False)
+        # Filters use category_id now
+        batch_op.drop_index('ix_sweets_category')
+
+    # One category per spelling group ("Chocolate", "chocolate ", ...), named
+    # after the most common spelling; every sweet is linked and renamed to it
+    link_all(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sweets') as batch_op:
+        batch_op.create_index('ix_sweets_category', ['category'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_sweets_category_id'))
+        batch_op.drop_constraint('fk_sweets_category_id', type_='foreignkey')
+        batch_op.drop_column('category_id')
+    op.drop_index(op.f('ix_categories_key'), table_name='categories')
+    op.drop_table('categories')
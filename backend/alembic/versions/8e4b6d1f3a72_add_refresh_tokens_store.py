@@ -0,0 +1,30 @@
+"""add refresh_tokens.store
+
+Revision ID: 8e4b6d1f3a72
+Revises: 3f8c5e2a9d41
+Create Date: 2026-10-20 09:14:37.208551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b6d1f3a72'
+down_revision: Union[str, Sequence[str], None] = '3f8c5e2a9d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing tokens keep NULL: they were issued without a store and stay valid there
+    op.add_column('refresh_tokens', sa.Column('store', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_column('store')
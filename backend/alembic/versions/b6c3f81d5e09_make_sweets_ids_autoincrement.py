@@ -0,0 +1,37 @@
+"""make sweets ids autoincrement
+
+Revision ID: b6c3f81d5e09
+Revises: 8e4b6d1f3a72
+Create Date: 2026-10-20 10:02:51.447180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6c3f81d5e09'
+down_revision: Union[str, Sequence[str], None] = '8e4b6d1f3a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite cannot add AUTOINCREMENT in place: batch mode rebuilds the table
+    with op.batch_alter_table('sweets', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # Never hand out an id still waiting in the archive
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'sweets'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'sweets', MAX("
+        "COALESCE((SELECT MAX(id) FROM sweets), 0), "
+        "COALESCE((SELECT MAX(sweet_id) FROM sweets_archive), 0))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sweets', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+        pass
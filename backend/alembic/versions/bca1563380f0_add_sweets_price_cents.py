@@ -0,0 +1,107 @@
+"""add sweets.price_cents (online backfill)
+
+Revision ID: bca1563380f0
+Revises: 630bad9e2aef
+Create Date: 2026-10-19 13:42:08.118402
+
+"""
+import contextlib
+from datetime import UTC, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bca1563380f0'
+down_revision: Union[str, Sequence[str], None] = '630bad9e2aef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A frozen copy of the sweets_price_cents backfill in app/online_migration.py
+# at this revision, so the migration keeps doing the same thing when the app
+# changes. It checkpoints the same way: the CLI resumes an interrupted run.
+NAME = 'sweets_price_cents'
+CHUNK_SIZE = 1000
+
+online_migrations = sa.table(
+    'online_migrations', sa.column('name'), sa.column('last_key'), sa.column('rows_done'),
+    sa.column('started_at'), sa.column('updated_at'), sa.column('finished_at'),
+)
+
+
+def transaction(connection):
+    """A short transaction per chunk; Alembic's autocommit block already commits per statement."""
+    if connection.in_transaction():
+        return contextlib.nullcontext()
+    return connection.begin()
+
+
+def backfill_price_cents(connection) -> None:
+    """Fills price_cents in id-range chunks, one committed transaction each."""
+    # CAST truncates, so "+ 0.5" rounds half up like models.price_to_cents
+    fill = sa.text(
+        "UPDATE sweets SET price_cents = CAST(price * 100 + 0.5 AS INTEGER) "
+        "WHERE id > :last AND id <= :upper AND price_cents IS NULL"
+    )
+    next_bound = sa.text("SELECT id FROM sweets WHERE id > :last ORDER BY id LIMIT 1 OFFSET :offset")
+    now = datetime.now(UTC).replace(tzinfo=None)
+    with transaction(connection):
+        connection.execute(online_migrations.insert().values(
+            name=NAME, last_key=None, rows_done=0, started_at=now, updated_at=now, finished_at=None,
+        ))
+
+    last, done, finished = -(2 ** 63), 0, False
+    while not finished:
+        with transaction(connection):
+            upper = connection.execute(next_bound, {"last": last, "offset": CHUNK_SIZE - 1}).scalar()
+            if upper is None:
+                upper = connection.execute(sa.text("SELECT MAX(id) FROM sweets")).scalar()
+            if upper is None or upper <= last:
+                finished = True
+            else:
+                done += connection.execute(fill, {"last": last, "upper": upper}).rowcount
+                last = upper
+            now = datetime.now(UTC).replace(tzinfo=None)
+            connection.execute(
+                online_migrations.update().where(online_migrations.c.name == NAME).values(
+                    last_key=None if last < 0 else last, rows_done=done, updated_at=now,
+                    finished_at=now if finished else None,
+                )
+            )
+        if not finished:
+            print(f"--> {NAME}: {done} rows, last key {last}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('online_migrations',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_key', sa.Integer(), nullable=True),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Nullable, no default: adding it does not rewrite the table
+    op.add_column('sweets', sa.Column('price_cents', sa.Integer(), nullable=True))
+
+    # Fill existing rows in committed chunks (resumable via the CLI). The
+    # schema change above is committed first, so the API can keep writing
+    # between chunks. In offline (--sql) mode nothing runs; use the CLI.
+    context = op.get_context()
+    if context.as_sql:
+        print(f"--> Skipping online backfill {NAME} in --sql mode; "
+              f"run: python -m app.online_migration run {NAME}")
+        return
+    with context.autocommit_block():
+        backfill_price_cents(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sweets') as batch_op:
+        batch_op.drop_column('price_cents')
+    op.drop_table('online_migrations')
@@ -0,0 +1,46 @@
+"""create sweet changes tables
+
+Revision ID: c81e4b7f0d36
+Revises: 9d3f6a2c8e15
+Create Date: 2026-10-19 18:05:41.227093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81e4b7f0d36'
+down_revision: Union[str, Sequence[str], None] = '9d3f6a2c8e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sweet_changes',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('sweet_id', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    op.create_index(op.f('ix_sweet_changes_changed_at'), 'sweet_changes', ['changed_at'], unique=False)
+    op.create_index(op.f('ix_sweet_changes_sweet_id'), 'sweet_changes', ['sweet_id'], unique=False)
+    op.create_table('sweet_change_floor',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('compacted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sweet_change_floor')
+    op.drop_index(op.f('ix_sweet_changes_sweet_id'), table_name='sweet_changes')
+    op.drop_index(op.f('ix_sweet_changes_changed_at'), table_name='sweet_changes')
+    op.drop_table('sweet_changes')
@@ -0,0 +1,56 @@
+"""add sweet discontinuation and archive table
+
+Revision ID: e5a90f1b7c24
+Revises: c81e4b7f0d36
+Create Date: 2026-10-19 19:12:08.514260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a90f1b7c24'
+down_revision: Union[str, Sequence[str], None] = 'c81e4b7f0d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable columns: a cheap ALTER, no table rewrite
+    op.add_column('sweets', sa.Column('discontinued_at', sa.DateTime(), nullable=True))
+    op.add_column('sweets', sa.Column('out_of_stock_since', sa.DateTime(), nullable=True))
+    # Sweets already out of stock start their clock now
+    op.execute("UPDATE sweets SET out_of_stock_since = CURRENT_TIMESTAMP WHERE quantity <= 0")
+    op.create_table('sweets_archive',
+    sa.Column('archive_id', sa.Integer(), nullable=False),
+    sa.Column('sweet_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('price_cents', sa.Integer(), nullable=True),
+    sa.Column('discontinued_at', sa.DateTime(), nullable=True),
+    sa.Column('out_of_stock_since', sa.DateTime(), nullable=True),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('archive_id')
+    )
+    op.create_index(op.f('ix_sweets_archive_archived_at'), 'sweets_archive', ['archived_at'], unique=False)
+    op.create_index(op.f('ix_sweets_archive_name'), 'sweets_archive', ['name'], unique=False)
+    op.create_index(op.f('ix_sweets_archive_sweet_id'), 'sweets_archive', ['sweet_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sweets_archive_sweet_id'), table_name='sweets_archive')
+    op.drop_index(op.f('ix_sweets_archive_name'), table_name='sweets_archive')
+    op.drop_index(op.f('ix_sweets_archive_archived_at'), table_name='sweets_archive')
+    op.drop_table('sweets_archive')
+    with op.batch_alter_table('sweets') as batch_op:
+        batch_op.drop_column('out_of_stock_since')
+        batch_op.drop_column('discontinued_at')
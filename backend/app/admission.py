@@ -0,0 +1,229 @@
+# backend/app/admission.py
+"""
+Admission control and load shedding.
+
+Sync handlers run on AnyIO's worker thread pool and hold a DB connection, so
+under a spike they queue up invisibly and every request gets slow. This
+middleware admits requests *before* they reach the thread pool:
+
+- Every API route belongs to a group ("purchase", "admin", "auth", "browse").
+  Each group has an optional concurrency limit, and the whole server has one.
+- Requests that can't start right away wait in a bounded, priority-ordered
+  queue (purchases first, anonymous browsing last).
+- A request that can't start within the queue-time budget, or finds the
+  queue full, gets an immediate ``503`` with ``Retry-After``.
+
+Shed counts and queue depths are exposed via ``GET /api/ops/admission``.
+"""
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from .config import get_settings
+
+# Lower value = served first
+PRIORITY_PURCHASE = 0
+PRIORITY_AUTHENTICATED = 1
+PRIORITY_ANONYMOUS = 2
+
+_PURCHASE_PATH = re.compile(r"^/api/sweets/\d+/purchase/?$|^/api/checkout")
+
+
+class Shed(Exception):
+    """Raised when a request is rejected instead of queued."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Limiter:
+    """A concurrency limit with a bounded, priority-ordered wait queue."""
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "timeout": 0}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    async def acquire(self, priority: int, timeout: float) -> None:
+        if self.in_flight < self.limit and self.queued == 0:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.max_queue or timeout <= 0:
+            self.shed["queue_full" if timeout > 0 else "timeout"] += 1
+            raise Shed("queue_full" if timeout > 0 else "timeout")
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        timer = loop.call_later(timeout, self._expire, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Client went away while queued (or right after being granted a slot)
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self.release()
+            elif not waiter.done():
+                waiter.cancel()
+                self.queued -= 1
+            raise
+        finally:
+            timer.cancel()
+        self.admitted += 1
+
+    def _expire(self, waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            self.queued -= 1
+            self.shed["timeout"] += 1
+            waiter.set_exception(Shed("timeout"))
+
+    def release(self) -> None:
+        # Hand the slot straight to the most urgent live waiter, if any
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self.queued -= 1
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+class AdmissionController:
+    """Per-group limiters in front of one server-wide limiter."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        route_limits: Optional[Dict[str, int]] = None,
+        retry_after: int = 1,
+    ):
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.server = Limiter("server", max_concurrency, max_queue)
+        self.groups = {
+            group: Limiter(group, limit, max_queue)
+            for group, limit in (route_limits or {}).items()
+        }
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        settings = get_settings()
+        return cls(
+            max_concurrency=settings.admission_max_concurrency,
+            max_queue=settings.admission_max_queue,
+            queue_timeout=settings.admission_queue_timeout,
+            route_limits=settings.admission_route_limits,
+            retry_after=settings.admission_retry_after,
+        )
+
+    async def admit(self, group: str, priority: int) -> None:
+        deadline = time.monotonic() + self.queue_timeout
+        group_limiter = self.groups.get(group)
+        if group_limiter is not None:
+            await group_limiter.acquire(priority, self.queue_timeout)
+        try:
+            await self.server.acquire(priority, deadline - time.monotonic())
+        except BaseException:
+            if group_limiter is not None:
+                group_limiter.release()
+            raise
+
+    def release(self, group: str) -> None:
+        self.server.release()
+        group_limiter = self.groups.get(group)
+        if group_limiter is not None:
+            group_limiter.release()
+
+    def stats(self) -> dict:
+        return {
+            "queue_timeout": self.queue_timeout,
+            "server": self.server.stats(),
+            "groups": {name: limiter.stats() for name, limiter in self.groups.items()},
+        }
+
+
+def classify(method: str, path: str, headers: list) -> Optional[Tuple[str, int]]:
+    """Maps a request to (group, priority), or None if it bypasses admission."""
+    if not path.startswith("/api/") or path.startswith("/api/ops/"):
+        # Health checks, docs and monitoring must keep answering under load
+        return None
+    if method == "OPTIONS":
+        return None
+
+    if method == "POST" and _PURCHASE_PATH.match(path):
+        return "purchase", PRIORITY_PURCHASE
+
+    authenticated = any(name == b"authorization" for name, _ in headers)
+    priority = PRIORITY_AUTHENTICATED if authenticated else PRIORITY_ANONYMOUS
+    if path.startswith("/api/auth/"):
+        return "auth", priority
+    if method in ("GET", "HEAD"):
+        return "browse", priority
+    return "admin", priority
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware, so admission happens before any thread is taken."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        route = classify(scope["method"], scope["path"], scope["headers"])
+        if route is None:
+            return await self.app(scope, receive, send)
+
+        group, priority = route
+        try:
+            await self.controller.admit(group, priority)
+        except Shed:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry later"},
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            return await response(scope, receive, send)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(group)
+
+
+@lru_cache
+def get_controller() -> AdmissionController:
+    return AdmissionController.from_settings()
@@ -0,0 +1,272 @@
+# backend/app/archive.py
+"""
+Hot/cold partitioning of the catalog.
+
+Dead items used to stay in ``sweets`` (deleting lost their history), so every
+list and search scanned them. Now:
+
+- ``DELETE /api/sweets/{id}`` discontinues the sweet instead of deleting
+  it: ``discontinued_at`` is set, public reads skip it from then on, and
+  in-memory indexes and delta-sync clients see it as deleted.
+- The archiver moves discontinued sweets, and sweets out of stock for
+  ``ARCHIVE_OUT_OF_STOCK_DAYS``, from ``sweets`` to ``sweets_archive``. It
+  works in batches of ``ARCHIVE_BATCH_SIZE``, each in its own short
+  transaction, and pauses ``ARCHIVE_BATCH_SLEEP_MS`` between them so
+  purchases keep committing. Each batch is a ``DELETE ... RETURNING``, so two
+  workers archiving at once cannot archive a sweet twice.
+- It runs every ``ARCHIVE_INTERVAL_SECONDS`` in a background thread of each
+  worker (0 = never). ``POST /api/ops/archive`` and scripts/archive_sweets.py
+  run it on demand. In multi-store mode it goes through every store.
+- Admins browse the archive (``GET /api/archive/sweets``) and restore a
+  sweet (``POST /api/archive/sweets/{id}/restore``), discontinued or
+  archived, under its old id (``sweets`` is AUTOINCREMENT, so no new sweet
+  can have taken it). A restored sweet starts a new out-of-stock clock.
+
+Each run also prunes the sales ledger (see app/sales.py) once a day: days
+older than ``RESTOCK_HISTORY_DAYS`` go, in batches like the sweets. Archived
+sweets' ledger rows go with them.
+
+Out-of-stock age comes from ``sweets.out_of_stock_since``, which ORM writes
+keep up to date (see models._track_out_of_stock). In sharded-inventory mode
+a sweet is only archived if none of its stock slots has units left.
+"""
+import logging
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import and_, delete, exists, insert, or_, select
+
+from . import catalog_events, changefeed, database, inventory, models, sales, stores
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DISCONTINUED = "discontinued"
+OUT_OF_STOCK = "out_of_stock"
+
+Sweet = models.Sweet
+Archived = models.ArchivedSweet
+
+# Columns copied as they are into the archive (and back on restore)
+COPIED = ("name", "category", "price", "quantity", "image_url", "price_cents",
+          "discontinued_at", "out_of_stock_since")
+
+# One archiver run at a time per process
+_running = threading.Lock()
+_last: Optional[dict] = None
+# Per store: the day the sales ledger was last pruned (a pass scans the table)
+_sales_pruned_on: Dict[Optional[str], int] = {}
+
+
+class RestoreError(Exception):
+    pass
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, the way SQLite DateTime columns hand values back
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _archivable(out_of_stock_days: float):
+    conditions = [Sweet.discontinued_at.is_not(None)]
+    if out_of_stock_days > 0:
+        no_stock_in_slots = ~exists().where(
+            models.SweetStockSlot.sweet_id == Sweet.id, models.SweetStockSlot.quantity > 0
+        )
+        conditions.append(and_(
+            Sweet.quantity <= 0,
+            Sweet.out_of_stock_since < _utcnow() - timedelta(days=out_of_stock_days),
+            no_stock_in_slots,
+        ))
+    return or_(*conditions)
+
+
+def archive_batch(db, batch_size: int, out_of_stock_days: float) -> int:
+    """Moves up to ``batch_size`` archivable sweets to the archive; returns how many."""
+    archivable = _archivable(out_of_stock_days)
+    batch = select(Sweet.id).where(archivable).order_by(Sweet.id).limit(batch_size)
+    # Core statements on the session's connection: no ORM bookkeeping for rows nobody loaded
+    connection = db.connection()
+    rows = connection.execute(
+        delete(Sweet.__table__)
+        .where(Sweet.id.in_(batch.scalar_subquery()), archivable)
+        .returning(Sweet.id, *(getattr(Sweet, name) for name in COPIED))
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    ids = [row.id for row in rows]
+    # Discontinued sweets keep their remaining stock on record
+    live = inventory.totals(db, ids) if inventory.enabled() else {}
+    now = _utcnow()
+    connection.execute(insert(Archived.__table__), [
+        {
+            "sweet_id": row.id,
+            **{name: getattr(row, name) for name in COPIED},
+            "quantity": live.get(row.id, row.quantity),
+            "reason": DISCONTINUED if row.discontinued_at is not None else OUT_OF_STOCK,
+            "archived_at": now,
+        }
+        for row in rows
+    ])
+    connection.execute(delete(models.SweetStockSlot.__table__).where(models.SweetStockSlot.sweet_id.in_(ids)))
+    connection.execute(delete(models.PopularSweet.__table__).where(models.PopularSweet.sweet_id.in_(ids)))
+    connection.execute(delete(models.SweetDailySales.__table__).where(models.SweetDailySales.sweet_id.in_(ids)))
+    changefeed.mark_deleted(db, ids)
+    catalog_events.mark_deleted(db, ids)
+    db.commit()
+    return len(ids)
+
+
+def run(batch_size: Optional[int] = None, out_of_stock_days: Optional[float] = None,
+        batch_sleep: Optional[float] = None) -> dict:
+    """Archives everything archivable in the current store, batch by batch."""
+    settings = get_settings()
+    batch_size = batch_size or settings.archive_batch_size
+    out_of_stock_days = settings.archive_out_of_stock_days if out_of_stock_days is None else out_of_stock_days
+    batch_sleep = settings.archive_batch_sleep_ms / 1000 if batch_sleep is None else batch_sleep
+
+    started = time.perf_counter()
+    archived = batches = 0
+    db = database.SessionLocal()
+    try:
+        while True:
+            moved = archive_batch(db, batch_size, out_of_stock_days)
+            if not moved:
+                break
+            archived += moved
+            batches += 1
+            if moved < batch_size:
+                break
+            # Let writers in between batches
+            time.sleep(batch_sleep)
+        pruned = prune_sales(db, batch_size, batch_sleep)
+    finally:
+        db.close()
+    return {"archived": archived, "batches": batches, "sales_pruned": pruned,
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+def prune_sales(db, batch_size: int, batch_sleep: float) -> int:
+    """Deletes ledger days the restock planner no longer reads, once a day per store."""
+    today = sales.today()
+    store = stores.current_store()
+    if _sales_pruned_on.get(store) == today:
+        return 0
+    before_day = today - get_settings().restock_history_days + 1
+    pruned = 0
+    while True:
+        deleted = sales.prune(db, before_day, batch_size)
+        db.commit()
+        pruned += deleted
+        if deleted < batch_size:
+            break
+        time.sleep(batch_sleep)
+    _sales_pruned_on[store] = today
+    return pruned
+
+
+def run_all_stores(**overrides) -> dict:
+    """One archiver pass over every store (or the single database). Returns {store: result}."""
+    global _last
+    if not _running.acquire(blocking=False):
+        raise RuntimeError("The archiver is already running")
+    try:
+        results = {}
+        for store in (stores.configured_stores() if stores.enabled() else [None]):
+            with stores.use_store(store):
+                results[store or "default"] = run(**overrides)
+        _last = {"ok": True, "stores": results, "finished_at": _utcnow().isoformat()}
+        return results
+    except Exception as exc:
+        _last = {"ok": False, "error": str(exc), "finished_at": _utcnow().isoformat()}
+        raise
+    finally:
+        _running.release()
+
+
+def is_running() -> bool:
+    return _running.locked()
+
+
+def status() -> dict:
+    return {"running": is_running(), "last": _last}
+
+
+# --- Restore ---
+
+def restore(db, sweet_id: int) -> models.Sweet:
+    """Brings a discontinued or archived sweet back into the catalog under its old id."""
+    sweet = db.get(Sweet, sweet_id)
+    if sweet is not None:
+        if sweet.discontinued_at is None:
+            raise RestoreError("A sweet with this id is in the catalog")
+        sweet.discontinued_at = None
+        # Restarted by models._track_out_of_stock if it has no stock, so the next pass keeps it
+        sweet.out_of_stock_since = None
+    else:
+        archived = db.scalars(
+            select(Archived).where(Archived.sweet_id == sweet_id).order_by(Archived.archive_id.desc()).limit(1)
+        ).first()
+        if archived is None:
+            raise LookupError(sweet_id)
+        fields = {name: getattr(archived, name) for name in COPIED}
+        sweet = Sweet(id=sweet_id, **{**fields, "discontinued_at": None, "out_of_stock_since": None})
+        db.add(sweet)
+        db.delete(archived)
+        if inventory.enabled():
+            db.flush()
+            inventory.initialize(db, sweet.id, sweet.quantity)
+    db.commit()
+    db.refresh(sweet)
+    return sweet
+
+
+# --- Background thread ---
+
+class Archiver:
+    """Runs ``run_all_stores`` every ``interval`` seconds in a daemon thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="sweet-archiver", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                run_all_stores()
+            except Exception:
+                logger.exception("Archiver run failed")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_archiver: Optional[Archiver] = None
+
+
+def start() -> None:
+    """Startup hook: starts this worker's archiver (unless ARCHIVE_INTERVAL_SECONDS=0)."""
+    global _archiver
+    if _archiver is None:
+        _archiver = Archiver(get_settings().archive_interval_seconds)
+    _archiver.start()
+
+
+def shutdown() -> None:
+    if _archiver is not None:
+        _archiver.stop()
@@ -0,0 +1,221 @@
+# backend/app/audit.py
+"""
+Audit trail of admin changes to the catalog, written off the request path.
+
+Creating, updating, deleting, restocking and restoring sweets records who did it and the
+before/after values of the fields that changed. Inserting that row inside the
+request would add a write to every admin call, so events go to an in-process
+bounded queue instead and a background thread batch-inserts them into
+``audit_log``:
+
+- The writer wakes on the first queued event, drains up to
+  ``AUDIT_BATCH_SIZE`` of them and inserts them in one ``executemany``.
+- When the queue is full, ``AUDIT_OVERFLOW`` decides: "drop" (default) never
+  slows an admin write and counts the lost event; "block" waits up to
+  ``AUDIT_BLOCK_TIMEOUT`` seconds for room first.
+- On shutdown the writer is stopped and whatever is still queued is written.
+- With ``AUDIT_BACKGROUND=false`` events are written inline (tests, scripts).
+
+Events are only recorded after the change committed, so a rolled back
+request leaves no audit row.
+"""
+import logging
+import os
+import queue
+import threading
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from . import database, models, stores
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+RESTOCK = "restock"
+RESTORE = "restore"
+
+AUDITED_FIELDS = ("name", "category", "price", "quantity", "image_url")
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, the way SQLite DateTime columns hand values back
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def sweet_fields(sweet: models.Sweet, fields: Iterable[str] = AUDITED_FIELDS) -> Dict[str, Any]:
+    return {field: getattr(sweet, field) for field in fields}
+
+
+def diff(before: Dict[str, Any], after: Dict[str, Any]):
+    """Keeps only the fields whose value changed: ({field: old}, {field: new})."""
+    changed = [field for field in after if before.get(field) != after[field]]
+    return {f: before.get(f) for f in changed}, {f: after[f] for f in changed}
+
+
+class AuditLog:
+    """Bounded queue of audit events plus the thread that writes them."""
+
+    def __init__(self, session_factory: Callable[[], Session] = None, max_queue: int = 10_000,
+                 batch_size: int = 500, overflow: str = "drop", block_timeout: float = 0.5,
+                 background: bool = True):
+        self._session_factory = session_factory or (lambda: database.SessionLocal())
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.background = background
+        # (store, event) pairs
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max_queue)
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    # --- Producer side (request threads) ---
+
+    def record(self, actor: models.User, action: str, sweet_id: int,
+               before: Optional[dict] = None, after: Optional[dict] = None) -> bool:
+        """Queues one event. Returns False if it was dropped under backpressure."""
+        event = {
+            "created_at": _utcnow(),
+            "actor_id": actor.id,
+            "actor_email": actor.email,
+            "action": action,
+            "sweet_id": sweet_id,
+            "before": before,
+            "after": after,
+        }
+        if not self.background:
+            self._write([event])
+            return True
+        # The writer thread has no request context: carry the store along
+        event = (stores.current_store(), event)
+
+        self._ensure_writer()
+        try:
+            if self.overflow == "block":
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Audit queue full, dropped %s of sweet %s by %s", action, sweet_id, actor.email)
+            return False
+
+    # --- Writer side ---
+
+    def _ensure_writer(self) -> None:
+        # A forked worker inherits the queue but not the thread: start its own
+        if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _next_batch(self, timeout: float = 0) -> List[tuple]:
+        try:
+            batch = [self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._next_batch(timeout=0.2)
+            if batch:
+                self._write_queued(batch)
+
+    def _write_queued(self, batch: List[tuple]) -> None:
+        by_store: Dict[Optional[str], List[dict]] = {}
+        for store, event in batch:
+            by_store.setdefault(store, []).append(event)
+        for store, events in by_store.items():
+            with stores.use_store(store):
+                self._write(events)
+
+    def _write(self, batch: List[dict]) -> None:
+        db = self._session_factory()
+        try:
+            db.execute(insert(models.AuditEntry), batch)
+            db.commit()
+            self.written += len(batch)
+        except Exception:
+            # Losing audit rows is bad, failing the writer thread is worse
+            db.rollback()
+            self.failed += len(batch)
+            logger.exception("Could not write %d audit events", len(batch))
+        finally:
+            db.close()
+
+    def flush(self) -> int:
+        """Writes everything queued so far from the calling thread."""
+        count = 0
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return count
+            self._write_queued(batch)
+            count += len(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stops the writer and writes what is left in the queue."""
+        self._stopping.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "background": self.background,
+            "writer_alive": self._thread is not None and self._thread.is_alive(),
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+_audit_log: Optional[AuditLog] = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_log() -> AuditLog:
+    """Creates the audit log on first use, once the settings are available."""
+    global _audit_log
+    if _audit_log is None:
+        with _audit_log_lock:
+            if _audit_log is None:
+                settings = get_settings()
+                _audit_log = AuditLog(
+                    max_queue=settings.audit_max_queue,
+                    batch_size=settings.audit_batch_size,
+                    overflow=settings.audit_overflow,
+                    block_timeout=settings.audit_block_timeout,
+                    background=settings.audit_background,
+                )
+    return _audit_log
+
+
+def shutdown() -> None:
+    """Shutdown hook: flushes the audit queue if one was created in this process."""
+    if _audit_log is not None:
+        _audit_log.shutdown()
@@ -1,22 +1,31 @@
 # backend/app/auth.py
-from passlib.context import CryptContext
-from datetime import datetime, timedelta, UTC 
-from jose import jwt
-from .config import settings
+from datetime import datetime, timedelta, UTC
+from functools import lru_cache
 
+from .config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt and python-jose are imported on first use rather than at
+# module import: they are among the slowest imports of the app (cold start).
+
+
+@lru_cache
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
+    from jose import jwt
+
+    settings = get_settings()
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
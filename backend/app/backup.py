@@ -0,0 +1,230 @@
+# backend/app/backup.py
+"""
+Online backups of the SQLite database, taken while the API keeps serving.
+
+Copying the file is unsafe while it is being written, so backups go through
+SQLite's online backup API (``sqlite3.Connection.backup``):
+
+- Pages are copied ``BACKUP_PAGES_PER_STEP`` at a time with a short sleep
+  (``BACKUP_STEP_SLEEP_MS``) between steps, so the source is only locked
+  briefly and purchases keep committing in between.
+- A commit from another connection makes SQLite restart the copy. If that
+  happens more than ``MAX_RESTARTS`` times (a busy shop and a large file),
+  the rest is copied in one step. In WAL mode, which the app uses for file
+  databases, that step only holds a read snapshot and does not block writers.
+- The copy is written under a temporary name, optionally gzipped, then
+  renamed, so a backup file is either complete or absent. The newest
+  ``BACKUP_KEEP`` backups are kept; older ones are deleted.
+- ``write_snapshot`` keeps an uncompressed copy at a fixed path. Point
+  ``DATABASE_READ_URL`` at it to serve catalog reads from it, or
+  ``BENCH_SNAPSHOT`` to run the benchmarks on production-shaped data.
+
+Triggered by ``POST /api/ops/backup`` (admin) or scripts/backup_db.py, which
+can also run on a schedule. See benchmarks/bench_backup.py for the effect on
+write latency.
+"""
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import List, Optional
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAX_RESTARTS = 3
+SUFFIX = ".db"
+GZIP_SUFFIX = ".db.gz"
+
+# One backup at a time per process
+_running = threading.Lock()
+_last: Optional[dict] = None
+
+
+class BackupError(Exception):
+    pass
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+@dataclass
+class BackupResult:
+    path: str
+    pages: int
+    steps: int
+    restarts: int
+    size_bytes: int
+    seconds: float
+    compressed: bool
+
+
+def sqlite_path(url: str) -> str:
+    """'sqlite:///./sweetshop.db?mode=ro' -> './sweetshop.db'"""
+    if not url.startswith("sqlite:///"):
+        raise BackupError("Online backups need a SQLite database")
+    path = url[len("sqlite:///"):].split("?", 1)[0]
+    if not path or path == ":memory:":
+        raise BackupError("Cannot back up an in-memory database")
+    return path
+
+
+def current_database_path() -> str:
+    """The database file of the current store (multi-store mode) or DATABASE_URL."""
+    from . import stores
+
+    store = stores.current_store()
+    return sqlite_path(stores.store_url(store) if store else get_settings().database_url)
+
+
+def copy_database(source_path: str, dest_path: str, pages_per_step: int = 256,
+                  step_sleep: float = 0.005) -> BackupResult:
+    """Copies a live SQLite database to ``dest_path`` with the online backup API."""
+    if not os.path.exists(source_path):
+        raise BackupError(f"Database file not found: {source_path}")
+
+    started = time.perf_counter()
+    stats = {"steps": 0, "restarts": 0, "pages": 0, "remaining": None}
+
+    def progress(status, remaining, total):
+        stats["steps"] += 1
+        stats["pages"] = total
+        if stats["remaining"] is not None and remaining > stats["remaining"]:
+            # The source changed under us and SQLite started over
+            stats["restarts"] += 1
+            if stats["restarts"] > MAX_RESTARTS:
+                raise _TooManyRestarts()
+        stats["remaining"] = remaining
+        if remaining and step_sleep:
+            # Let writers in between steps
+            time.sleep(step_sleep)
+
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(dest_path)
+        try:
+            try:
+                source.backup(target, pages=pages_per_step if pages_per_step > 0 else -1, progress=progress)
+            except _TooManyRestarts:
+                # Copy the rest from one consistent read snapshot
+                source.backup(target, pages=-1)
+                stats["steps"] += 1
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+    return BackupResult(dest_path, stats["pages"], stats["steps"], stats["restarts"],
+                        os.path.getsize(dest_path), time.perf_counter() - started, False)
+
+
+def compress(path: str) -> str:
+    """Gzips ``path`` next to itself and removes the original."""
+    gz_path = path + ".gz"
+    with open(path, "rb") as raw, gzip.open(gz_path + ".partial", "wb", compresslevel=6) as packed:
+        shutil.copyfileobj(raw, packed, 1024 * 1024)
+    os.replace(gz_path + ".partial", gz_path)
+    os.remove(path)
+    return gz_path
+
+
+def list_backups(dest_dir: str, prefix: str) -> List[str]:
+    """Backups named ``<prefix>-<timestamp>``, oldest first."""
+    if not os.path.isdir(dest_dir):
+        return []
+    names = [
+        name for name in os.listdir(dest_dir)
+        if name.startswith(prefix + "-") and name.endswith((SUFFIX, GZIP_SUFFIX))
+    ]
+    return [os.path.join(dest_dir, name) for name in sorted(names)]
+
+
+def prune(dest_dir: str, prefix: str, keep: int) -> List[str]:
+    """Deletes all but the newest ``keep`` backups; returns the deleted paths."""
+    backups = list_backups(dest_dir, prefix)
+    doomed = backups[:-keep] if keep > 0 else []
+    for path in doomed:
+        os.remove(path)
+    return doomed
+
+
+def run_backup(source_path: Optional[str] = None, dest_dir: Optional[str] = None,
+               prefix: Optional[str] = None, compressed: Optional[bool] = None,
+               keep: Optional[int] = None) -> BackupResult:
+    """Takes a timestamped backup into ``dest_dir`` and applies retention."""
+    from . import stores
+
+    settings = get_settings()
+    source_path = source_path or current_database_path()
+    dest_dir = dest_dir or settings.backup_dir
+    prefix = prefix or stores.current_store() or "sweetshop"
+    compressed = settings.backup_compress if compressed is None else compressed
+    keep = settings.backup_keep if keep is None else keep
+
+    if not _running.acquire(blocking=False):
+        raise BackupError("A backup is already running")
+    try:
+        os.makedirs(dest_dir, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        final = os.path.join(dest_dir, f"{prefix}-{stamp}{SUFFIX}")
+        partial = final + ".partial"
+        try:
+            result = copy_database(source_path, partial, settings.backup_pages_per_step,
+                                   settings.backup_step_sleep_ms / 1000)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        os.replace(partial, final)
+        result.path = final
+        if compressed:
+            result.path = compress(final)
+            result.size_bytes = os.path.getsize(result.path)
+            result.compressed = True
+        prune(dest_dir, prefix, keep)
+        return result
+    finally:
+        _running.release()
+
+
+def write_snapshot(snapshot_path: str, source_path: Optional[str] = None) -> BackupResult:
+    """
+    Refreshes a read-only copy at a fixed path, swapped in atomically.
+    Connections already open on the old copy keep reading it until closed.
+    """
+    settings = get_settings()
+    source_path = source_path or current_database_path()
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    os.makedirs(directory, exist_ok=True)
+    partial = snapshot_path + ".partial"
+    result = copy_database(source_path, partial, settings.backup_pages_per_step,
+                           settings.backup_step_sleep_ms / 1000)
+    os.replace(partial, snapshot_path)
+    result.path = snapshot_path
+    return result
+
+
+def is_running() -> bool:
+    return _running.locked()
+
+
+def run_and_record() -> None:
+    """Background-task entry point: runs a backup and remembers the outcome."""
+    global _last
+    try:
+        outcome = {"ok": True, **run_backup().__dict__}
+    except Exception as exc:
+        logger.exception("Backup failed")
+        outcome = {"ok": False, "error": str(exc)}
+    _last = {**outcome, "finished_at": datetime.now(UTC).isoformat()}
+
+
+def status() -> dict:
+    return {"running": is_running(), "last": _last}
@@ -0,0 +1,92 @@
+# backend/app/catalog_events.py
+"""
+Publishes committed changes of the sweets table to in-process listeners.
+
+In-memory indexes (autocomplete, caches, ...) subscribe here so they can be
+patched incrementally after every commit instead of being rebuilt from the
+database. Changes are collected at flush time and only delivered once the
+transaction commits; a rollback discards them.
+"""
+import logging
+from typing import Callable, Dict, Iterable, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# listener(upserted_rows, deleted_ids)
+Listener = Callable[[List[dict], List[int]], None]
+
+_listeners: List[Listener] = []
+
+_SWEET_COLUMNS = [column.key for column in models.Sweet.__table__.columns]
+
+
+def subscribe(listener: Listener) -> Listener:
+    """Registers a listener for committed sweet changes (usable as a decorator)."""
+    _listeners.append(listener)
+    return listener
+
+
+def snapshot(sweet: models.Sweet) -> dict:
+    """Returns the column values of a sweet as a plain dict."""
+    return {key: getattr(sweet, key) for key in _SWEET_COLUMNS}
+
+
+def _pending(session: Session) -> Dict[str, dict]:
+    return session.info.setdefault("catalog_changes", {"upserted": {}, "deleted": {}})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    if not _listeners:
+        return
+
+    changes = _pending(session)
+    for obj in session.new | session.dirty:
+        if isinstance(obj, models.Sweet):
+            if obj.discontinued_at is not None:
+                # Discontinued: out of the public catalog until restored
+                changes["upserted"].pop(obj.id, None)
+                changes["deleted"][obj.id] = True
+                continue
+            changes["deleted"].pop(obj.id, None)
+            changes["upserted"][obj.id] = snapshot(obj)
+    for obj in session.deleted:
+        if isinstance(obj, models.Sweet):
+            changes["upserted"].pop(obj.id, None)
+            changes["deleted"][obj.id] = True
+
+
+def mark_deleted(session: Session, sweet_ids: Iterable[int]) -> None:
+    """Publishes deletes made with Core statements (e.g. the archiver) on commit."""
+    if not _listeners:
+        return
+    changes = _pending(session)
+    for sweet_id in sweet_ids:
+        changes["upserted"].pop(sweet_id, None)
+        changes["deleted"][sweet_id] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    changes = session.info.pop("catalog_changes", None)
+    if not changes or not (changes["upserted"] or changes["deleted"]):
+        return
+
+    upserted = list(changes["upserted"].values())
+    deleted = list(changes["deleted"])
+    for listener in _listeners:
+        try:
+            listener(upserted, deleted)
+        except Exception:
+            # A broken index must never fail a request that already committed
+            logger.exception("Catalog listener %r failed", listener)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("catalog_changes", None)
@@ -0,0 +1,222 @@
+# backend/app/categories.py
+"""
+Categories as a dimension table with integer keys.
+
+``sweets.category`` used to be the only place a category lived: free text,
+filtered with ``ILIKE '%...%'`` (a scan of every row, since a leading
+wildcard cannot use the index), and "chocolate", "Chocolate " and
+"CHOCOLATE" were three different categories. Now:
+
+- ``categories`` holds one row per category: its display name and a unique
+  normalized ``key`` (case-folded, whitespace collapsed). ``sweets.category_id``
+  points at it and is indexed.
+- Every ORM write of a sweet links it (``_link_category``): the category is
+  looked up by key, created if new, and ``sweets.category`` is rewritten to
+  the category's name. That column stays as a denormalized copy, so responses
+  and every reader of it (suggester, columnar catalog, archive) are unchanged.
+- Search filters on ``category_id IN (...)``. ``?category_id=`` filters by id;
+  ``?category=`` is resolved in memory: an exact (normalized) name match gives
+  one id, otherwise every category whose name contains the text, as before.
+- ``CategoryMap`` keeps id <-> name of every category in the process (one per
+  store), reloaded after a commit that created a category, on an unknown
+  exact name at most once per ``MISS_RELOAD_SECONDS``, and every
+  ``CATEGORY_CACHE_SECONDS`` so other workers' new categories show up.
+- ``link_all`` creates and links categories for rows written without the ORM
+  (bulk loads), picking the most common spelling as the name.
+
+``GET /api/sweets/categories`` lists them, ids included.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, column, event, func, insert, inspect, select, table
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+
+from . import models, stores
+from .config import get_settings
+
+Category = models.Category
+
+# Unknown exact names reload the map at most this often
+MISS_RELOAD_SECONDS = 1.0
+
+
+def clean(name: str) -> str:
+    return " ".join(name.split())
+
+
+def normalize(name: str) -> str:
+    """'  Hard  candy' -> 'hard candy': the key categories are deduplicated on."""
+    return clean(name).casefold()
+
+
+class CategoryMap:
+    """id <-> name of every category, loaded from the database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}  # normalized key -> id
+        self._loaded_at: Optional[float] = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._names, self._ids, self._loaded_at = {}, {}, None
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def load(self, rows) -> None:
+        """Replaces the map with (id, name) rows."""
+        names = {category_id: name for category_id, name in rows}
+        ids = {normalize(name): category_id for category_id, name in names.items()}
+        with self._lock:
+            self._names, self._ids, self._loaded_at = names, ids, time.monotonic()
+
+    def reload(self, db) -> None:
+        self.load(db.execute(select(Category.id, Category.name)).all())
+
+    def ensure_loaded(self, db) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > get_settings().category_cache_seconds:
+            self.reload(db)
+
+    def name(self, category_id: int) -> Optional[str]:
+        return self._names.get(category_id)
+
+    def id_for(self, name: str) -> Optional[int]:
+        return self._ids.get(normalize(name))
+
+    def containing(self, text: str) -> List[int]:
+        needle = normalize(text)
+        return sorted(category_id for key, category_id in self._ids.items() if needle in key)
+
+    def items(self) -> List[Tuple[int, str]]:
+        return sorted(self._names.items(), key=lambda item: item[1].casefold())
+
+    def resolve(self, db, category: Optional[str] = None,
+                category_id: Optional[int] = None) -> Optional[List[int]]:
+        """Category ids a search keeps; None when it has no category filter."""
+        if not category and category_id is None:
+            return None
+        self.ensure_loaded(db)
+        if not category:
+            return [category_id]
+
+        exact = self.id_for(category)
+        if exact is None and time.monotonic() - (self._loaded_at or 0) > MISS_RELOAD_SECONDS:
+            # Maybe created by another worker since the last load
+            self.reload(db)
+            exact = self.id_for(category)
+        matches = [exact] if exact is not None else self.containing(category)
+        if category_id is not None:
+            matches = [match for match in matches if match == category_id]
+        return matches
+
+
+_maps = stores.PerStore(CategoryMap)
+
+
+def get_map() -> CategoryMap:
+    """The category map of the request's store (one per store in multi-store mode)."""
+    return _maps.get()
+
+
+def resolve(db, category: Optional[str] = None, category_id: Optional[int] = None) -> Optional[List[int]]:
+    return get_map().resolve(db, category, category_id)
+
+
+# --- Linking sweets to categories ---
+
+def ensure(connection, name: str) -> Tuple[int, str, bool]:
+    """(id, name, created) of the category called ``name`` in any spelling, created if new."""
+    key = normalize(name)
+    lookup = select(Category.id, Category.name).where(Category.key == key)
+    row = connection.execute(lookup).first()
+    created = False
+    if row is None:
+        # Another writer may create the same category at the same time: its
+        # row wins, and the savepoint keeps the sweet's transaction usable
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(Category).values(name=clean(name), key=key))
+            created = True
+        except IntegrityError:
+            pass
+        row = connection.execute(lookup).one()
+    return row.id, row.name, created
+
+
+@event.listens_for(models.Sweet, "before_insert")
+@event.listens_for(models.Sweet, "before_update")
+def _link_category(mapper, connection, sweet):
+    if sweet.category is None:
+        return
+    if sweet.category_id is not None and not inspect(sweet).attrs.category.history.has_changes():
+        return
+    category_id, name, created = ensure(connection, sweet.category)
+    session = object_session(sweet)
+    if created and session is not None:
+        # Reload this worker's map once the new category is committed
+        session.info["categories_changed"] = True
+    sweet.category_id, sweet.category = category_id, name
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_after_commit(session):
+    if session.info.pop("categories_changed", False):
+        get_map().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("categories_changed", None)
+
+
+# Lightweight tables: link_all runs on bare connections (bulk loads)
+_sweets = table("sweets", column("id"), column("category"), column("category_id"))
+_categories = table("categories", column("id"), column("name"), column("key"))
+
+
+def link_all(connection) -> int:
+    """
+    Links every sweet without a category id, creating the missing categories.
+    A new category is named after its most common spelling. Returns how many
+    sweets were linked.
+    """
+    spellings = connection.execute(
+        select(_sweets.c.category, func.count())
+        .where(_sweets.c.category_id.is_(None))
+        .group_by(_sweets.c.category)
+    ).all()
+    if not spellings:
+        return 0
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    for spelling, count in spellings:
+        counts[normalize(spelling)][spelling] += count
+
+    existing = {row.key: row.id for row in connection.execute(select(_categories.c.id, _categories.c.key))}
+    new = [
+        # Most common spelling, ties broken alphabetically
+        {"name": clean(min(counter, key=lambda s: (-counter[s], s))), "key": key}
+        for key, counter in counts.items() if key not in existing
+    ]
+    if new:
+        connection.execute(_categories.insert(), new)
+    categories = {row.key: (row.id, row.name)
+                  for row in connection.execute(select(_categories.c.id, _categories.c.name, _categories.c.key))}
+
+    updates = []
+    for key, counter in counts.items():
+        category_id, name = categories[key]
+        updates.extend({"spelling": spelling, "new_id": category_id, "new_name": name} for spelling in counter)
+    connection.execute(
+        _sweets.update()
+        .where(_sweets.c.category_id.is_(None), _sweets.c.category == bindparam("spelling"))
+        .values(category_id=bindparam("new_id"), category=bindparam("new_name")),
+        updates,
+    )
+    return sum(count for _, count in spellings)
@@ -0,0 +1,264 @@
+# backend/app/changefeed.py
+"""
+Catalog change feed: lets clients keep a local copy of the catalog current
+by downloading only what changed (``GET /api/sweets/changes?since=<version>``).
+
+- Every flush that inserts, updates or deletes a sweet appends one
+  ``sweet_changes`` row per sweet, in the same transaction. ``seq`` is the
+  catalog version. Writes that bypass the ORM (sharded purchases, see
+  app/inventory.py) call ``mark_changed``.
+- A client asks for the changes after its version and gets the current
+  state of every sweet changed since then, plus the ids of deleted ones
+  (tombstones), and the version to ask from next time. A sweet changed ten
+  times is sent once.
+- Compaction (every ``CHANGEFEED_COMPACT_SECONDS``, after a commit that
+  recorded changes) deletes rows superseded by a newer row for the same
+  sweet, and tombstones older than ``CHANGEFEED_RETENTION_HOURS``. The
+  highest dropped tombstone becomes the floor: a client whose version is
+  below it could miss a delete, so it is told to resync (410 Gone), i.e. to
+  download the full catalog again.
+
+Versions are assigned at flush. That matches commit order on SQLite, where
+one writer holds the lock from its first write until it commits.
+
+To start syncing, a client reads the version first (``GET /changes`` without
+``since``), then downloads the full catalog; changes in between are sent
+again on the first sync, which is harmless for upserts.
+
+Worker processes sync their in-memory indexes (suggester, columnar catalog)
+the same way through ``Follower``: ``catalog_events`` only reaches the
+worker that made a change, the feed reaches all of them.
+"""
+import logging
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from . import catalog_events, database, inventory, models, stores
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Change = models.SweetChange
+Floor = models.SweetChangeFloor
+
+# Per store: monotonic time of the last compaction check
+_last_compaction: Dict[Optional[str], float] = {}
+_compaction_lock = threading.Lock()
+
+
+class ResyncRequired(Exception):
+    """The requested version is older than what the change feed still covers."""
+
+    def __init__(self, version: int):
+        super().__init__(f"Resync required; current version is {version}")
+        self.version = version
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, the way SQLite DateTime columns hand values back
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _append(connection, changed: Iterable[int], deleted: Iterable[int]) -> None:
+    now = _utcnow()
+    rows = [{"sweet_id": sweet_id, "deleted": False, "changed_at": now} for sweet_id in changed]
+    rows += [{"sweet_id": sweet_id, "deleted": True, "changed_at": now} for sweet_id in deleted]
+    if rows:
+        connection.execute(insert(Change), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changes(session, flush_context):
+    changed, deleted = set(), set()
+    for obj in session.new | session.dirty:
+        if not isinstance(obj, models.Sweet):
+            continue
+        if obj not in session.new and not session.is_modified(obj, include_collections=False):
+            continue
+        # Discontinued sweets are gone as far as clients are concerned
+        (deleted if obj.discontinued_at is not None else changed).add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, models.Sweet):
+            deleted.add(obj.id)
+    if changed or deleted:
+        _append(session.connection(), changed - deleted, deleted)
+        session.info["changefeed_recorded"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop("changefeed_recorded", False):
+        compact_if_due()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("changefeed_recorded", None)
+
+
+def mark_changed(db: Session, sweet_id: int) -> None:
+    """Records a change made without touching the Sweet object (e.g. a Core UPDATE)."""
+    _append(db.connection(), [sweet_id], [])
+    db.info["changefeed_recorded"] = True
+
+
+def mark_deleted(db: Session, sweet_ids: Iterable[int]) -> None:
+    """Records deletes made with Core statements (e.g. the archiver)."""
+    _append(db.connection(), [], sweet_ids)
+    db.info["changefeed_recorded"] = True
+
+
+# --- Reading ---
+
+def floor(db: Session) -> int:
+    return db.scalar(select(Floor.seq).where(Floor.id == 1)) or 0
+
+
+def current_version(db: Session) -> int:
+    return max(db.scalar(select(func.max(Change.seq))) or 0, floor(db))
+
+
+def changes_since(db: Session, since: int, limit: int) -> dict:
+    """
+    Sweets changed after version ``since``, at most ``limit`` of them, oldest
+    change first, with live stock in sharded-inventory mode. Raises
+    ResyncRequired if ``since`` is below the floor (or ahead of the feed,
+    e.g. a client of a restored database).
+    """
+    version = current_version(db)
+    if since < floor(db) or since > version:
+        raise ResyncRequired(version)
+
+    rows = db.execute(
+        select(Change.sweet_id, func.max(Change.seq).label("seq"))
+        .where(Change.seq > since)
+        .group_by(Change.sweet_id)
+        .order_by(func.max(Change.seq))
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        # Resume after the last change sent; sweets changed again later come with their newer seq
+        version = rows[-1].seq
+
+    ids = [row.sweet_id for row in rows]
+    sweets = {
+        sweet.id: sweet
+        for sweet in db.scalars(
+            select(models.Sweet).where(models.Sweet.id.in_(ids), models.Sweet.discontinued_at.is_(None))
+        )
+    }
+    return {
+        "version": version,
+        "upserted": inventory.overlay_totals(db, [sweets[sweet_id] for sweet_id in ids if sweet_id in sweets]),
+        "deleted": [sweet_id for sweet_id in ids if sweet_id not in sweets],
+        "has_more": has_more,
+    }
+
+
+class Follower:
+    """
+    Keeps an in-memory index current with every worker's writes.
+
+    An index reads ``current_version`` before the rows it loads from, hands
+    it to ``follow_from`` once loaded, then calls ``catch_up`` on every use.
+    At most every ``CATALOG_SYNC_SECONDS`` the changes committed since are
+    read from the feed and passed to ``apply`` the way catalog_events
+    listeners get them. Re-applying this worker's own changes is harmless:
+    upserts carry the current state.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def follow_from(self, version: int) -> None:
+        self.version = version
+        self._checked_at = time.monotonic()
+
+    def reset(self) -> None:
+        self.version = None
+
+    def catch_up(self, db: Session, apply: Callable[[List[dict], List[int]], None]) -> bool:
+        """Returns False if the index must be reloaded instead (the feed was compacted past it)."""
+        settings = get_settings()
+        if self.version is None or time.monotonic() - self._checked_at < settings.catalog_sync_seconds:
+            # Loaded from rows handed in directly (nothing to follow), or checked recently
+            return True
+        if not self._lock.acquire(blocking=False):
+            # Another request is catching up; applying its pages out of order could undo newer ones
+            return True
+        try:
+            self._checked_at = time.monotonic()
+            while True:
+                try:
+                    page = changes_since(db, self.version, settings.changefeed_page_size)
+                except ResyncRequired:
+                    self.version = None
+                    return False
+                if page["upserted"] or page["deleted"]:
+                    apply([catalog_events.snapshot(sweet) for sweet in page["upserted"]], page["deleted"])
+                self.version = page["version"]
+                if not page["has_more"]:
+                    return True
+        finally:
+            self._lock.release()
+
+
+# --- Compaction ---
+
+def compact(db: Session, retention: timedelta) -> dict:
+    """Drops superseded rows, then tombstones older than ``retention`` (raising the floor)."""
+    newer = aliased(Change)
+    superseded = db.execute(
+        delete(Change).where(
+            select(newer.seq)
+            .where(newer.sweet_id == Change.sweet_id, newer.seq > Change.seq)
+            .correlate(Change)
+            .exists()
+        )
+    ).rowcount
+
+    cutoff = _utcnow() - retention
+    old_tombstones = (Change.deleted.is_(True), Change.changed_at < cutoff)
+    dropped_through = db.scalar(select(func.max(Change.seq)).where(*old_tombstones))
+    tombstones = 0
+    if dropped_through is not None:
+        tombstones = db.execute(delete(Change).where(*old_tombstones)).rowcount
+        row = db.get(Floor, 1)
+        if row is None:
+            db.add(Floor(id=1, seq=dropped_through, compacted_at=_utcnow()))
+        else:
+            row.seq = max(row.seq, dropped_through)
+            row.compacted_at = _utcnow()
+    db.commit()
+    return {"superseded": superseded, "tombstones": tombstones, "floor": floor(db)}
+
+
+def compact_if_due() -> None:
+    """Compacts the current store's feed if the last check was long enough ago."""
+    settings = get_settings()
+    store = stores.current_store()
+    now = time.monotonic()
+    with _compaction_lock:
+        last = _last_compaction.setdefault(store, now)
+        if now - last < settings.changefeed_compact_seconds:
+            return
+        _last_compaction[store] = now
+
+    db = database.SessionLocal()
+    try:
+        compact(db, timedelta(hours=settings.changefeed_retention_hours))
+    except Exception:
+        # Compaction runs after someone else's commit; it must never fail their request
+        db.rollback()
+        logger.exception("Change feed compaction failed")
+    finally:
+        db.close()
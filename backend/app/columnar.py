@@ -0,0 +1,292 @@
+# backend/app/columnar.py
+"""
+Columnar in-memory read engine for catalog search (CATALOG_ENGINE=columnar).
+
+The whole sweets table is mirrored into NumPy arrays (ids, prices,
+quantities, category codes) plus interned Python lists for the strings.
+A search then becomes a handful of vectorized boolean masks and one argsort
+instead of a SQL query that hydrates an ORM object per row:
+
+- price range / in-stock   -> comparisons on float/int arrays
+- category (substring)     -> matched against the small category vocabulary
+                              once, then ``np.isin`` on the int codes
+- name (substring)         -> ``str.find`` over one joined, lower-cased blob
+                              of all names, offsets mapped back with
+                              ``np.searchsorted``
+- sorting                  -> stable argsort on the selected rows
+
+In sharded-inventory mode the mirror holds the slot totals, as of the last
+load or change feed read (see app/inventory.py).
+
+The mirror is loaded on first use and patched through ``catalog_events``
+after every committed change (and from the change feed for other worker
+processes' changes): upserts overwrite a row in place or append to
+amortized-growth arrays, deletes leave a tombstone that is compacted away
+once enough accumulate. NumPy is an optional dependency, imported only when
+this engine is selected.
+"""
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import catalog_events, changefeed, inventory, models, stores
+
+_SEPARATOR = "\x00"
+# Compact when this share of rows are tombstones
+_COMPACT_RATIO = 0.25
+
+
+class ColumnarCatalog:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._follower = changefeed.Follower()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._size = 0
+            self._ids = np.empty(0, dtype=np.int64)
+            self._prices = np.empty(0, dtype=np.float64)
+            self._quantities = np.empty(0, dtype=np.int64)
+            self._categories = np.empty(0, dtype=np.int32)
+            self._alive = np.empty(0, dtype=bool)
+            self._names: List[str] = []
+            self._image_urls: List[Optional[str]] = []
+            self._positions: Dict[int, int] = {}
+            self._category_names: List[str] = []
+            self._category_codes: Dict[str, int] = {}
+            self._dead = 0
+            # Derived, rebuilt lazily after name changes
+            self._name_blob: Optional[str] = None
+            self._name_offsets = None
+            self._name_rank = None
+            self._follower.reset()
+            self.loaded = False
+
+    # --- Loading ---
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self.loaded and self._follower.catch_up(db, self.apply_changes):
+            return
+        # Read first: changes committed while the rows load are applied again on the next catch-up
+        version = changefeed.current_version(db)
+        rows = (
+            db.query(
+                models.Sweet.id, models.Sweet.name, models.Sweet.category,
+                models.Sweet.price, models.Sweet.quantity, models.Sweet.image_url,
+            )
+            .filter(models.Sweet.discontinued_at.is_(None))
+            .order_by(models.Sweet.id)
+            .all()
+        )
+        self.load(inventory.overlay_loaded(db, rows, 4))
+        self._follower.follow_from(version)
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        """Builds the columns from (id, name, category, price, quantity, image_url) rows."""
+        rows = list(rows)
+        with self._lock:
+            self.reset()
+            count = len(rows)
+            self._grow(count)
+            if count:
+                ids, names, categories, prices, quantities, image_urls = zip(*rows)
+                self._ids[:count] = ids
+                self._prices[:count] = prices
+                self._quantities[:count] = quantities
+                self._categories[:count] = [self._category_code(c) for c in categories]
+                self._alive[:count] = True
+                self._names = [sys.intern(n) for n in names]
+                self._image_urls = list(image_urls)
+                self._positions = {sweet_id: pos for pos, sweet_id in enumerate(ids)}
+            self._size = count
+            self.loaded = True
+
+    # --- Incremental maintenance ---
+
+    def apply_changes(self, upserted: List[dict], deleted: List[int]) -> None:
+        """catalog_events listener: patches the columns in place."""
+        with self._lock:
+            if not self.loaded:
+                return
+            for sweet_id in deleted:
+                pos = self._positions.pop(sweet_id, None)
+                if pos is not None and self._alive[pos]:
+                    self._alive[pos] = False
+                    self._dead += 1
+            for row in upserted:
+                self._upsert(row)
+            if self._dead > _COMPACT_RATIO * max(self._size, 1):
+                self._compact()
+
+    def _upsert(self, row: dict) -> None:
+        pos = self._positions.get(row["id"])
+        if pos is None:
+            pos = self._size
+            self._grow(pos + 1)
+            self._size += 1
+            self._names.append("")
+            self._image_urls.append(None)
+            self._positions[row["id"]] = pos
+        if self._names[pos] != row["name"]:
+            self._name_blob = self._name_rank = None
+        self._ids[pos] = row["id"]
+        self._prices[pos] = row["price"]
+        self._quantities[pos] = row["quantity"]
+        self._categories[pos] = self._category_code(row["category"])
+        self._alive[pos] = True
+        self._names[pos] = sys.intern(row["name"])
+        self._image_urls[pos] = row["image_url"]
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        for attr in ("_ids", "_prices", "_quantities", "_categories", "_alive"):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, attr, new)
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive[: self._size])
+        count = len(keep)
+        for attr in ("_ids", "_prices", "_quantities", "_categories", "_alive"):
+            array = getattr(self, attr)
+            array[:count] = array[keep]
+            array[count:] = 0
+        self._names = [self._names[i] for i in keep]
+        self._image_urls = [self._image_urls[i] for i in keep]
+        self._positions = {int(sweet_id): pos for pos, sweet_id in enumerate(self._ids[:count])}
+        self._size = count
+        self._dead = 0
+        self._name_blob = self._name_rank = None
+
+    def _category_code(self, name: str) -> int:
+        code = self._category_codes.get(name)
+        if code is None:
+            code = len(self._category_names)
+            self._category_codes[name] = code
+            self._category_names.append(sys.intern(name))
+        return code
+
+    # --- Derived name indexes ---
+
+    def _name_matches(self, needle: str):
+        """Positions whose name contains ``needle`` (case-insensitive)."""
+        if self._name_blob is None:
+            lowered = [name.lower() for name in self._names]
+            lengths = np.fromiter((len(n) + 1 for n in lowered), dtype=np.int64, count=len(lowered))
+            self._name_offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lowered) else lengths
+            self._name_blob = _SEPARATOR.join(lowered)
+
+        blob, hits = self._name_blob, []
+        start = blob.find(needle)
+        while start != -1:
+            hits.append(start)
+            start = blob.find(needle, start + 1)
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        positions = np.searchsorted(self._name_offsets, np.array(hits), side="right") - 1
+        return np.unique(positions)
+
+    def _name_ranks(self):
+        if self._name_rank is None:
+            order = np.argsort(np.array(self._names, dtype=object), kind="stable")
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self._name_rank = rank
+        return self._name_rank
+
+    # --- Queries ---
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        category: Optional[str] = None,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        sort: Optional[str] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        category_names: Optional[Iterable[str]] = None,
+    ) -> List[dict]:
+        with self._lock:
+            size = self._size
+            mask = self._alive[:size].copy()
+            if price_min is not None:
+                mask &= self._prices[:size] >= price_min
+            if price_max is not None:
+                mask &= self._prices[:size] <= price_max
+            if in_stock is not None:
+                mask &= (self._quantities[:size] > 0) == in_stock
+            if category:
+                needle = category.lower()
+                codes = [code for name, code in self._category_codes.items() if needle in name.lower()]
+                mask &= np.isin(self._categories[:size], codes)
+            if category_names is not None:
+                # Exact names, already resolved from the category map
+                codes = [self._category_codes[name] for name in category_names if name in self._category_codes]
+                mask &= np.isin(self._categories[:size], codes)
+
+            if q:
+                selected = self._name_matches(q.lower().replace(_SEPARATOR, ""))
+                selected = selected[mask[selected]]
+            else:
+                selected = np.flatnonzero(mask)
+
+            if sort:
+                descending = sort.startswith("-")
+                field = sort.lstrip("-")
+                if field == "name":
+                    keys = self._name_ranks()[selected]
+                elif field == "price":
+                    keys = self._prices[selected]
+                else:
+                    keys = self._quantities[selected]
+                selected = selected[np.argsort(-keys if descending else keys, kind="stable")]
+
+            end = None if limit is None else skip + limit
+            selected = selected[skip:end]
+            return [
+                {
+                    "id": int(self._ids[pos]),
+                    "name": self._names[pos],
+                    "category": self._category_names[self._categories[pos]],
+                    "price": float(self._prices[pos]),
+                    "quantity": int(self._quantities[pos]),
+                    "image_url": self._image_urls[pos],
+                }
+                for pos in selected.tolist()
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            arrays = (self._ids, self._prices, self._quantities, self._categories, self._alive)
+            return {
+                "loaded": self.loaded,
+                "rows": self._size - self._dead,
+                "tombstones": self._dead,
+                "categories": len(self._category_names),
+                "array_bytes": int(sum(a.nbytes for a in arrays)),
+            }
+
+
+_catalogs = stores.PerStore(ColumnarCatalog)
+
+
+def get_catalog() -> ColumnarCatalog:
+    """The catalog mirror of the request's store (one per store in multi-store mode)."""
+    return _catalogs.get()
+
+
+@catalog_events.subscribe
+def _apply_changes(upserted: List[dict], deleted: List[int]) -> None:
+    catalog = _catalogs.peek()
+    if catalog is not None:
+        catalog.apply_changes(upserted, deleted)
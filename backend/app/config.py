@@ -1,12 +1,106 @@
 import os
+from functools import lru_cache
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: str
+    # Optional read-only connection (e.g. a replica) for GET routes; defaults to database_url
+    database_read_url: Optional[str] = None
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
 
+    # Serving (see app/serve.py). WEB_CONCURRENCY unset = one worker per available CPU.
+    web_concurrency: Optional[int] = None
+    graceful_timeout: int = 30            # seconds to drain in-flight requests on shutdown
+    sqlite_busy_timeout_ms: int = 5000    # how long a writer waits for the SQLite lock
+    query_cache_size: int = 500           # compiled statements kept per engine (see app/queries.py)
+
+    # Admission control (see app/admission.py).
+    # The server-wide limit matches AnyIO's default worker thread pool (40),
+    # so admitted sync handlers never queue for a thread.
+    admission_enabled: bool = True
+    admission_max_concurrency: int = 40
+    admission_max_queue: int = 200
+    admission_queue_timeout: float = 2.0  # seconds a request may wait for a slot
+    admission_retry_after: int = 1        # seconds, sent in the Retry-After header
+    # Per-group limits, e.g. ADMISSION_ROUTE_LIMITS='{"browse": 24, "auth": 4}'
+    admission_route_limits: Dict[str, int] = {"browse": 24, "auth": 8}
+
+    # Sharded stock counters for hot items (see app/inventory.py); 1 = single row
+    inventory_slots: int = 1
+
+    # Read engine for GET /api/sweets/search: "sql" or "columnar" (NumPy, see app/columnar.py)
+    catalog_engine: str = "sql"
+    # In-memory indexes (suggester, columnar catalog) pick up other workers' writes this often
+    catalog_sync_seconds: float = 1.0
+
+    # Uploaded images (see app/images.py)
+    media_root: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "media")
+    image_max_bytes: int = 5 * 1024 * 1024
+    image_thumbnail_sizes: List[int] = [160, 480]
+
+    # Idempotency-Key support for write endpoints (see app/idempotency.py)
+    idempotency_ttl_seconds: int = 24 * 60 * 60
+    idempotency_cache_size: int = 10_000
+    idempotency_wait_timeout: float = 10.0  # how long a duplicate waits for the original
+
+    # Rotating refresh tokens (see app/refresh_tokens.py)
+    refresh_token_expire_days: int = 14
+
+    # "Popular right now" shelf (see app/popularity.py)
+    popular_capacity: int = 256              # sweets tracked, whatever the catalog size
+    popular_half_life_minutes: float = 60.0  # a purchase counts half as much after this long
+    popular_snapshot_seconds: int = 60       # how often the sketch is saved to the database
+
+    # Online SQLite backups (see app/backup.py)
+    backup_dir: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backups")
+    backup_keep: int = 7
+    backup_compress: bool = True
+    backup_pages_per_step: int = 256
+    backup_step_sleep_ms: float = 5.0
+
+    # On-demand request profiling (see app/profiling.py); nothing is installed when disabled
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # fraction of all requests profiled, besides admin requests
+    profiling_dir: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "profiles")
+
+    # Multi-store mode (see app/stores.py): one database per shop, e.g.
+    # STORE_DATABASE_URL='sqlite:///./stores/{store}.db' STORE_IDS='["north", "south"]'
+    store_database_url: Optional[str] = None
+    store_ids: List[str] = []
+    store_max_engines: int = 16
+    store_engine_idle_seconds: int = 600
+    store_fan_out_workers: int = 8
+
+    # Audit log of admin catalog changes (see app/audit.py)
+    audit_background: bool = True   # false = write each event inline
+    audit_max_queue: int = 10_000
+    audit_batch_size: int = 500
+    audit_overflow: str = "drop"    # queue full: "drop" the event or "block" up to audit_block_timeout
+    audit_block_timeout: float = 0.5
+
+    # Catalog change feed for delta sync (see app/changefeed.py)
+    changefeed_retention_hours: float = 7 * 24  # older tombstones are dropped; clients behind them resync
+    changefeed_compact_seconds: int = 60 * 60     # how often compaction may run
+    changefeed_page_size: int = 500
+
+    # Archive of discontinued and long out-of-stock sweets (see app/archive.py)
+    archive_interval_seconds: int = 600     # 0 = no background archiver
+    archive_batch_size: int = 500
+    archive_out_of_stock_days: float = 90   # 0 = only archive discontinued sweets
+    archive_batch_sleep_ms: float = 50
+
+    # Category id <-> name map kept in each worker (see app/categories.py)
+    category_cache_seconds: int = 300   # reload at least this often to see other workers' new categories
+
+    # Demand-based restock planner (see app/restock.py)
+    restock_history_days: int = 90        # sales window demand is estimated from
+    restock_lead_time_days: float = 7     # order to shelf
+    restock_cover_days: float = 14        # demand a restock should cover beyond the lead time
+    restock_service_z: float = 1.65       # safety stock in std devs of lead-time demand (~95% no stockout)
+
     # Calculate absolute path to .env file
     # (Current file is inside app/, so .env is in the parent directory 'backend/')
     model_config = SettingsConfigDict(
@@ -15,4 +109,17 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Returns the application settings, parsing the environment/.env once on
+    first use instead of at import time (keeps cold start cheap).
+    """
+    return Settings()
+
+
+def __getattr__(name):
+    # Backwards compatibility for `from app.config import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,23 +1,197 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, declarative_base # <-- Change import here
-from .config import settings
+import os
+import threading
 
-# SQLite needs "check_same_thread" set to False to work with FastAPI's async nature
-connect_args = {"check_same_thread": False} if "sqlite" in settings.database_url else {}
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from . import stores
+from .config import get_settings
+
+_engine = None
+_engine_pid = None
+_read_engine = None
+_read_engine_pid = None
+
+
+def _create_engine(url=None, read_only=False):
+    settings = get_settings()
+    url = url or settings.database_url
+    is_sqlite = "sqlite" in url
+    # SQLite needs "check_same_thread" set to False to work with FastAPI's async nature
+    connect_args = {"check_same_thread": False} if is_sqlite else {}
+    engine = create_engine(url, connect_args=connect_args, query_cache_size=settings.query_cache_size)
+    # Deferred import: queries imports the models, which import this module
+    from . import queries
+    queries.track(engine)
+
+    if is_sqlite and ":memory:" not in url:
+        @event.listens_for(engine, "connect")
+        def _configure_sqlite(dbapi_connection, connection_record):
+            # Several worker processes share one file: WAL lets readers run
+            # alongside the single writer, and busy_timeout makes a writer wait
+            # for the lock instead of failing with "database is locked".
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            if read_only:
+                # Refuse writes at the connection level too
+                cursor.execute("PRAGMA query_only=ON")
+            cursor.close()
+
+    return engine
+
+
+def get_engine():
+    """
+    Creates the engine on first use rather than at import time, so importing
+    the app doesn't need the settings or a database connection yet.
+
+    The engine belongs to the process that created it: a worker forked from a
+    parent that already had one (e.g. gunicorn --preload) builds its own
+    instead of sharing the parent's pooled connections.
+
+    In multi-store mode a request for a store gets that store's engine.
+    """
+    global _engine, _engine_pid
+    store = stores.current_store()
+    if store is not None:
+        return stores.get_registry().get(store)
+    if _engine is None or _engine_pid != os.getpid():
+        if _engine is not None:
+            # Inherited across fork: forget the parent's connections without closing them
+            _engine.dispose(close=False)
+        _engine = _create_engine()
+        _engine_pid = os.getpid()
+    return _engine
+
+
+def get_read_engine():
+    """
+    Engine for read-only sessions: DATABASE_READ_URL (e.g. a replica) if set,
+    otherwise the primary engine. Per process, like get_engine().
+    """
+    global _read_engine, _read_engine_pid
+    read_url = get_settings().database_read_url
+    if not read_url or stores.current_store() is not None:
+        return get_engine()
+    if _read_engine is None or _read_engine_pid != os.getpid():
+        if _read_engine is not None:
+            _read_engine.dispose(close=False)
+        _read_engine = _create_engine(read_url, read_only=True)
+        _read_engine_pid = os.getpid()
+    return _read_engine
+
+
+def dispose_engine():
+    """Closes pooled connections (called on shutdown, after requests drained)."""
+    global _engine, _engine_pid, _read_engine, _read_engine_pid
+    if _engine is not None and _engine_pid == os.getpid():
+        _engine.dispose()
+    if _read_engine is not None and _read_engine_pid == os.getpid():
+        _read_engine.dispose()
+    _engine = _engine_pid = None
+    _read_engine = _read_engine_pid = None
+
+
+class _LazySessionmaker(sessionmaker):
+    """A sessionmaker that binds to its engine getter when a session is created."""
+
+    def __init__(self, *args, engine_getter=None, **kw):
+        super().__init__(*args, **kw)
+        self.engine_getter = engine_getter
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            local_kw.setdefault("bind", (self.engine_getter or get_engine)())
+        return super().__call__(**local_kw)
+
+
+class ReadOnlySession(Session):
+    """
+    A session for GET routes: never flushes (no autoflush before each query,
+    no unit-of-work pass on commit) and refuses pending changes.
+    """
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise InvalidRequestError("Read-only session cannot write")
 
-engine = create_engine(
-    settings.database_url, connect_args=connect_args
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+# Loaded objects stay usable after the session ends; nothing is written anyway
+ReadSessionLocal = _LazySessionmaker(
+    class_=ReadOnlySession, autoflush=False, expire_on_commit=False, engine_getter=get_read_engine
+)
 
 Base = declarative_base()
 
+
+def __getattr__(name):
+    # Backwards compatibility for `from app.database import engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazySession:
+    """
+    Stands in for a Session and only opens the real one on first use, so a
+    request answered from memory (cache, suggester, auth failure) never
+    checks a connection out of the pool.
+    """
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._session = None
+
+    @property
+    def touched(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+# Requests served vs. requests that never opened their session
+_usage_lock = threading.Lock()
+_usage = {"requests": 0, "untouched": 0, "read_only": 0}
+
+
+def _count_request(db: LazySession, read_only: bool):
+    with _usage_lock:
+        _usage["requests"] += 1
+        _usage["untouched"] += not db.touched
+        _usage["read_only"] += read_only
+
+
+def session_stats() -> dict:
+    with _usage_lock:
+        return dict(_usage)
+
+
 # Dependency: This is used in every API endpoint to get a DB session
 def get_db():
-    db = SessionLocal()
+    db = LazySession(lambda: SessionLocal())
+    try:
+        yield db
+    finally:
+        db.close()
+        _count_request(db, read_only=False)
+
+
+# Dependency for GET routes that only read: a ReadOnlySession, possibly on a replica
+def get_read_db():
+    db = LazySession(lambda: ReadSessionLocal())
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        _count_request(db, read_only=True)
\ No newline at end of file
@@ -1,10 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
-from app import database, models, schemas
-from app.config import settings
+from app import database, models, queries, schemas, stores
+from app.config import get_settings
 
 # This tells FastAPI that the client should send the token in the Authorization header
 # and where to go to get a token if they don't have one.
@@ -17,6 +16,10 @@ def get_current_user(
     """
     Decodes the JWT token and retrieves the corresponding user from the database.
     """
+    # Deferred import: python-jose is slow to import (cold start)
+    from jose import JWTError, jwt
+
+    settings = get_settings()
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -30,12 +33,16 @@ def get_current_user(
         
         if email is None:
             raise credentials_exception
+
+        # The same email may be registered in another store: a token only works in its own
+        if payload.get("store") != stores.current_store():
+            raise credentials_exception
             
     except JWTError:
         raise credentials_exception
     
     # 2. Find the user in the DB
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = queries.user_by_email(db, email)
     
     if user is None:
         raise credentials_exception
@@ -0,0 +1,91 @@
+# backend/app/encoding.py
+"""
+Sparse fieldsets and compact encodings for catalog list responses.
+
+- ``?fields=id,name,price,quantity`` selects only those columns in SQL (see
+  ``queries.search_rows`` / ``queries.list_rows``) and in the response. ``id``
+  is always included.
+- The ``Accept`` header picks the layout:
+
+  - ``application/json`` (default): a list of objects, as before.
+  - ``application/vnd.sweetshop.columns+json``: one array per field,
+    ``{"id": [1, 2], "name": ["Barfi", "Peda"]}``, so field names are sent
+    once instead of once per row.
+  - ``application/msgpack``: the same column layout as MessagePack (needs
+    the optional ``msgpack`` package; without it JSON is served).
+
+Without ``fields`` and with plain JSON, responses are unchanged. See
+benchmarks/bench_encoding.py for payload sizes and encode times.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import Response
+
+JSON = "application/json"
+COLUMNS_JSON = "application/vnd.sweetshop.columns+json"
+MSGPACK = "application/msgpack"
+MSGPACK_ALIASES = (MSGPACK, "application/x-msgpack")
+
+# Field order of SweetResponse rows
+SWEET_FIELDS = ("id", "name", "category", "price", "quantity", "image_url")
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """'name, price' -> ('id', 'name', 'price'); None when no fieldset was asked for."""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested - set(SWEET_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    requested.add("id")
+    return tuple(name for name in SWEET_FIELDS if name in requested)
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """The first supported media type listed in ``accept``; JSON otherwise."""
+    if not accept:
+        return JSON
+    for part in accept.split(","):
+        media_type = part.split(";", 1)[0].strip().lower()
+        if media_type == COLUMNS_JSON:
+            return COLUMNS_JSON
+        if media_type in MSGPACK_ALIASES and _msgpack() is not None:
+            return MSGPACK
+        if media_type in (JSON, "application/*", "*/*"):
+            return JSON
+    return JSON
+
+
+def select_fields(items: Iterable[Any], fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Rows restricted to ``fields`` from dicts or Sweet objects."""
+    return [
+        {name: item[name] for name in fields} if isinstance(item, dict)
+        else {name: getattr(item, name) for name in fields}
+        for item in items
+    ]
+
+
+def to_columns(rows: List[Dict[str, Any]], fields: Tuple[str, ...]) -> Dict[str, list]:
+    return {name: [row[name] for row in rows] for name in fields}
+
+
+def encode(rows: List[Dict[str, Any]], fields: Tuple[str, ...], media_type: str) -> bytes:
+    if media_type == MSGPACK:
+        return _msgpack().packb(to_columns(rows, fields), use_bin_type=True)
+    payload = to_columns(rows, fields) if media_type == COLUMNS_JSON else rows
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def render(rows: List[Dict[str, Any]], fields: Tuple[str, ...], media_type: str) -> Response:
+    # Vary: the same URL is served in several encodings
+    return Response(encode(rows, fields, media_type), media_type=media_type, headers={"Vary": "Accept"})
@@ -0,0 +1,333 @@
+# backend/app/idempotency.py
+"""
+Idempotency-Key support for write endpoints.
+
+Mobile clients retry purchases and restocks on timeouts. When a write request
+carries an ``Idempotency-Key`` header, the first response for that key is
+stored and every retry gets it back without running auth, the handler or a
+single query against the sweets table.
+
+- Keys are scoped to the caller's Authorization header, method, store and path.
+- The first request claims the key with a pending row in ``idempotency_keys``.
+  Duplicates arriving while it runs wait for it (an in-process event, or
+  polling the row when the original runs in another worker) instead of
+  executing twice.
+- Completed responses live in an in-memory LRU in front of the table.
+- Server errors (5xx) release the key so the client can retry for real.
+- Rows older than the TTL are purged periodically.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from . import database, models, stores
+from .config import get_settings
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+IDEMPOTENT_PREFIXES = ("/api/sweets",)
+
+# How often (seconds) the expired-row purge may run
+PURGE_INTERVAL = 300
+# A pending claim older than this is assumed abandoned (crashed worker)
+ABANDONED_AFTER = timedelta(minutes=5)
+# Poll interval while the original runs in another process
+POLL_INTERVAL = 0.05
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, the way SQLite DateTime columns hand values back
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code: Optional[int]
+    content_type: Optional[str]
+    body: bytes
+    created_at: datetime
+
+    @property
+    def pending(self) -> bool:
+        return self.status_code is None
+
+
+class ResponseCache:
+    """Thread-safe LRU of completed responses with a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            record = self._entries.get(key)
+            if record is None:
+                return None
+            if _utcnow() - record.created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return record
+
+    def put(self, key: str, record: StoredResponse) -> None:
+        with self._lock:
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# --- Database store (sync, called through the thread pool) ---
+
+def _to_stored(row: models.IdempotencyKey) -> StoredResponse:
+    return StoredResponse(row.request_hash, row.status_code, row.content_type, row.body or b"", row.created_at)
+
+
+def claim(key: str, request_hash: str) -> Optional[StoredResponse]:
+    """Claims ``key`` for this request. Returns None if claimed, else the existing record."""
+    db = database.SessionLocal()
+    try:
+        db.add(models.IdempotencyKey(key=key, request_hash=request_hash, created_at=_utcnow()))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+
+        row = db.get(models.IdempotencyKey, key)
+        if row is None:
+            # Released between our insert and the lookup; let the caller retry
+            return StoredResponse(request_hash, None, None, b"", _utcnow())
+        expired = _utcnow() - row.created_at > timedelta(seconds=get_settings().idempotency_ttl_seconds)
+        abandoned = row.status_code is None and _utcnow() - row.created_at > ABANDONED_AFTER
+        if expired or abandoned:
+            row.request_hash = request_hash
+            row.status_code = row.content_type = row.body = None
+            row.created_at = _utcnow()
+            db.commit()
+            return None
+        return _to_stored(row)
+    finally:
+        db.close()
+
+
+def complete(key: str, status_code: int, content_type: Optional[str], body: bytes) -> None:
+    db = database.SessionLocal()
+    try:
+        row = db.get(models.IdempotencyKey, key)
+        if row is not None:
+            row.status_code = status_code
+            row.content_type = content_type
+            row.body = body
+            db.commit()
+    finally:
+        db.close()
+
+
+def release(key: str) -> None:
+    db = database.SessionLocal()
+    try:
+        db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key == key).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def purge_expired() -> int:
+    cutoff = _utcnow() - timedelta(seconds=get_settings().idempotency_ttl_seconds)
+    db = database.SessionLocal()
+    try:
+        deleted = db.query(models.IdempotencyKey).filter(models.IdempotencyKey.created_at < cutoff).delete()
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+# --- Middleware ---
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware replaying stored responses for repeated keys."""
+
+    def __init__(self, app, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+        self._in_flight: Dict[str, asyncio.Event] = {}
+        self._last_purge = time.monotonic()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in WRITE_METHODS
+            or not scope["path"].startswith(IDEMPOTENT_PREFIXES)
+        ):
+            return await self.app(scope, receive, send)
+
+        client_key = _header(scope, HEADER)
+        if client_key is None:
+            return await self.app(scope, receive, send)
+        if not client_key or len(client_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(status_code=400, content={"detail": "Invalid Idempotency-Key header"})
+            return await response(scope, receive, send)
+
+        body = await _read_body(receive)
+        key = hashlib.sha256(
+            b"\n".join([_header(scope, b"authorization") or b"", scope["method"].encode(),
+                        (stores.current_store() or "").encode(), scope["path"].encode(), client_key])
+        ).hexdigest()
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        deadline = time.monotonic() + get_settings().idempotency_wait_timeout
+        while True:
+            record = self.cache.get(key)
+            if record is not None:
+                return await self._replay(record, request_hash, scope, receive, send)
+
+            event = self._in_flight.get(key)
+            if event is not None:
+                # Same key already executing in this process: wait for it
+                try:
+                    await asyncio.wait_for(event.wait(), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    return await self._still_running(scope, receive, send)
+                continue
+
+            event = self._in_flight[key] = asyncio.Event()
+            try:
+                record = await run_in_threadpool(claim, key, request_hash)
+            except BaseException:
+                self._finish(key)
+                raise
+            if record is None:
+                break
+
+            self._finish(key)
+            if not record.pending:
+                self.cache.put(key, record)
+                continue
+            # The original is running in another worker process: poll for it
+            if time.monotonic() >= deadline:
+                return await self._still_running(scope, receive, send)
+            await asyncio.sleep(POLL_INTERVAL)
+
+        try:
+            await self._execute(key, request_hash, body, scope, receive, send)
+        finally:
+            self._finish(key)
+        await self._maybe_purge()
+
+    def _finish(self, key: str) -> None:
+        event = self._in_flight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    async def _execute(self, key, request_hash, body, scope, receive, send):
+        replayed_body = False
+
+        async def receive_once():
+            nonlocal replayed_body
+            if not replayed_body:
+                replayed_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        content_type = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_once, capture)
+        except BaseException:
+            await run_in_threadpool(release, key)
+            raise
+
+        if status_code >= 500:
+            await run_in_threadpool(release, key)
+            return
+        record = StoredResponse(request_hash, status_code, content_type, b"".join(chunks), _utcnow())
+        await run_in_threadpool(complete, key, record.status_code, record.content_type, record.body)
+        self.cache.put(key, record)
+
+    async def _replay(self, record: StoredResponse, request_hash, scope, receive, send):
+        if record.request_hash != request_hash:
+            response = JSONResponse(
+                status_code=422,
+                content={"detail": "Idempotency-Key was already used for a different request"},
+            )
+            return await response(scope, receive, send)
+
+        headers = [(b"idempotent-replayed", b"true"), (b"content-length", str(len(record.body)).encode())]
+        if record.content_type:
+            headers.append((b"content-type", record.content_type.encode("latin-1")))
+        await send({"type": "http.response.start", "status": record.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": record.body})
+
+    async def _still_running(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=409,
+            content={"detail": "A request with this Idempotency-Key is still in progress"},
+            headers={"Retry-After": "1"},
+        )
+        return await response(scope, receive, send)
+
+    async def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        await run_in_threadpool(purge_expired)
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    settings = get_settings()
+    return ResponseCache(settings.idempotency_cache_size, settings.idempotency_ttl_seconds)
@@ -0,0 +1,137 @@
+# backend/app/images.py
+"""
+Content-addressed image storage on local disk.
+
+Uploaded files are stored under their SHA-256: the same bytes always map to
+the same path, and a path's content never changes. That makes the URLs safe
+to cache forever (browsers and CDNs) and deduplicates repeated uploads.
+
+    <media_root>/ab/ab12...ef.png         original
+    <media_root>/ab/ab12...ef_160.png     thumbnail, longest side 160px
+
+Thumbnails are generated once, at upload time, when Pillow is installed
+(optional dependency). Without it only the original is stored.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from .config import get_settings
+
+URL_PREFIX = "/media"
+
+# Served file names: <sha256>[_<size>].<ext>
+FILENAME_PATTERN = re.compile(r"^[0-9a-f]{64}(_\d+)?\.(png|jpg|gif|webp)$")
+
+MEDIA_TYPES = {"png": "image/png", "jpg": "image/jpeg", "gif": "image/gif", "webp": "image/webp"}
+_PIL_FORMATS = {"png": "PNG", "jpg": "JPEG", "gif": "GIF", "webp": "WEBP"}
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+@dataclass
+class StoredImage:
+    sha256: str
+    extension: str
+    thumbnails: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def url(self) -> str:
+        return f"{URL_PREFIX}/{self.sha256}.{self.extension}"
+
+
+def sniff_extension(data: bytes) -> Optional[str]:
+    """Detects the image type from its magic bytes (never trust the upload's name)."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def media_root() -> str:
+    return get_settings().media_root
+
+
+def path_for(filename: str) -> str:
+    return os.path.join(media_root(), filename[:2], filename)
+
+
+def _write_once(filename: str, data: bytes) -> None:
+    """Writes a content-addressed file atomically; existing files are left alone."""
+    path = path_for(filename)
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _thumbnails(data: bytes, extension: str, sizes) -> Dict[int, bytes]:
+    try:
+        from PIL import Image
+    except ImportError:
+        return {}
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+        rendered = {}
+        with Image.open(io.BytesIO(data)) as image:
+            for size in sizes:
+                if max(image.size) <= size:
+                    continue  # never upscale; the original is small enough
+                thumb = image.copy()
+                thumb.thumbnail((size, size))
+                if extension == "jpg" and thumb.mode not in ("RGB", "L"):
+                    thumb = thumb.convert("RGB")
+                out = io.BytesIO()
+                thumb.save(out, format=_PIL_FORMATS[extension])
+                rendered[size] = out.getvalue()
+        return rendered
+    except Exception as exc:
+        raise InvalidImage("Uploaded file is not a readable image") from exc
+
+
+def store(data: bytes) -> StoredImage:
+    """Stores an uploaded image (and its thumbnails) under its content hash."""
+    settings = get_settings()
+    if len(data) > settings.image_max_bytes:
+        raise InvalidImage(f"Image larger than {settings.image_max_bytes} bytes")
+    extension = sniff_extension(data)
+    if extension is None:
+        raise InvalidImage("Unsupported image type (use PNG, JPEG, GIF or WebP)")
+
+    digest = hashlib.sha256(data).hexdigest()
+    stored = StoredImage(digest, extension)
+
+    existing = {size: f"{digest}_{size}.{extension}" for size in settings.image_thumbnail_sizes}
+    if os.path.exists(path_for(f"{digest}.{extension}")):
+        # Already uploaded: thumbnails were rendered the first time
+        for size, filename in existing.items():
+            if os.path.exists(path_for(filename)):
+                stored.thumbnails[size] = f"{URL_PREFIX}/{filename}"
+        return stored
+
+    for size, thumb in _thumbnails(data, extension, settings.image_thumbnail_sizes).items():
+        _write_once(existing[size], thumb)
+        stored.thumbnails[size] = f"{URL_PREFIX}/{existing[size]}"
+    # Original last: its presence marks the upload (and thumbnails) as complete
+    _write_once(f"{digest}.{extension}", data)
+    return stored
@@ -0,0 +1,206 @@
+# backend/app/inventory.py
+"""
+Sharded stock counters for hot items (optional, INVENTORY_SLOTS > 1).
+
+Normally every purchase of a sweet decrements the same ``sweets.quantity``
+row, so during a promotion all buyers of one item queue on one row lock. In
+sharded mode a sweet's stock is split across N rows of ``sweet_stock_slots``:
+
+- A purchase starts at a random slot and decrements the first one that still
+  has stock with a conditional ``UPDATE ... WHERE quantity > 0`` (no read
+  first, so no lost updates). Concurrent buyers mostly hit different rows.
+- When a purchase finds an empty slot, half of the fullest slot is moved into
+  it, so stock does not get stranded in a few slots.
+- Reads sum the slots (one grouped query per response) and overlay the total
+  on ``Sweet.quantity``; ``sweets.quantity`` is refreshed on admin writes
+  and when a purchase sells the sweet out (so ``out_of_stock_since`` starts
+  and the archiver sees it), not on every purchase: that would bring back
+  the hot row.
+
+This helps databases with row-level locking (e.g. PostgreSQL). SQLite has a
+single database-wide write lock, so it gains little there; see
+benchmarks/bench_inventory.py.
+"""
+import random
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import models
+from .config import get_settings
+
+Slot = models.SweetStockSlot
+
+
+def slot_count() -> int:
+    return get_settings().inventory_slots
+
+
+def enabled() -> bool:
+    return slot_count() > 1
+
+
+def split(quantity: int, slots: int) -> List[int]:
+    """Spreads ``quantity`` as evenly as possible: split(10, 4) -> [3, 3, 2, 2]"""
+    base, extra = divmod(max(quantity, 0), slots)
+    return [base + (1 if i < extra else 0) for i in range(slots)]
+
+
+def initialize(db: Session, sweet_id: int, quantity: int) -> None:
+    """(Re)splits a sweet's stock across the configured number of slots."""
+    db.query(Slot).filter(Slot.sweet_id == sweet_id).delete()
+    db.add_all(
+        Slot(sweet_id=sweet_id, slot=i, quantity=q)
+        for i, q in enumerate(split(quantity, slot_count()))
+    )
+    db.flush()
+
+
+def forget(db: Session, sweet_id: int) -> None:
+    db.query(Slot).filter(Slot.sweet_id == sweet_id).delete()
+
+
+def _slot_quantities(db: Session, sweet_id: int) -> Dict[int, int]:
+    return dict(db.query(Slot.slot, Slot.quantity).filter(Slot.sweet_id == sweet_id).all())
+
+
+def _ensure_slots(db: Session, sweet: models.Sweet) -> int:
+    """Sweets created before sharding was enabled get their slots on first use."""
+    count = db.query(func.count(Slot.slot)).filter(Slot.sweet_id == sweet.id).scalar()
+    if count == 0:
+        initialize(db, sweet.id, sweet.quantity)
+        count = slot_count()
+    return count
+
+
+def _take_one(db: Session, sweet_id: int, slot: int) -> bool:
+    result = db.execute(
+        update(Slot)
+        .where(Slot.sweet_id == sweet_id, Slot.slot == slot, Slot.quantity > 0)
+        .values(quantity=Slot.quantity - 1)
+    )
+    return result.rowcount == 1
+
+
+def rebalance(db: Session, sweet_id: int, empty_slot: int) -> bool:
+    """Moves half of the fullest slot into ``empty_slot``. Returns False if all are empty."""
+    fullest = (
+        db.query(Slot.slot, Slot.quantity)
+        .filter(Slot.sweet_id == sweet_id, Slot.quantity > 1)
+        .order_by(Slot.quantity.desc())
+        .first()
+    )
+    if fullest is None:
+        return False
+    moved = fullest.quantity // 2
+    taken = db.execute(
+        update(Slot)
+        .where(Slot.sweet_id == sweet_id, Slot.slot == fullest.slot, Slot.quantity >= moved)
+        .values(quantity=Slot.quantity - moved)
+    ).rowcount
+    if taken:
+        db.execute(
+            update(Slot)
+            .where(Slot.sweet_id == sweet_id, Slot.slot == empty_slot)
+            .values(quantity=Slot.quantity + moved)
+        )
+    return bool(taken)
+
+
+def purchase(db: Session, sweet: models.Sweet, amount: int = 1) -> Optional[int]:
+    """
+    Takes ``amount`` units from the sweet's slots. Returns the remaining total,
+    or None if there isn't enough stock (nothing is taken then).
+    """
+    slots = _ensure_slots(db, sweet)
+    taken = 0
+    start = random.randrange(slots)
+    misses = 0
+    while taken < amount and misses < slots:
+        slot = (start + taken + misses) % slots
+        if _take_one(db, sweet.id, slot):
+            taken += 1
+            continue
+        # Empty slot: refill it from the fullest one and retry it once
+        if rebalance(db, sweet.id, slot) and _take_one(db, sweet.id, slot):
+            taken += 1
+            continue
+        misses += 1
+
+    if taken < amount:
+        db.rollback()
+        return None
+    remaining = total(db, sweet.id)
+    if remaining == 0:
+        # Sold out: flushed with the purchase, starting the out-of-stock clock
+        sweet.quantity = 0
+    return remaining
+
+
+def restock(db: Session, sweet: models.Sweet, amount: int) -> int:
+    """Spreads ``amount`` over the slots and refreshes the cached total."""
+    slots = _ensure_slots(db, sweet)
+    for slot, extra in enumerate(split(amount, slots)):
+        if extra:
+            db.execute(
+                update(Slot)
+                .where(Slot.sweet_id == sweet.id, Slot.slot == slot)
+                .values(quantity=Slot.quantity + extra)
+            )
+    sweet.quantity = total(db, sweet.id)
+    return sweet.quantity
+
+
+def total(db: Session, sweet_id: int) -> int:
+    return db.query(func.coalesce(func.sum(Slot.quantity), 0)).filter(Slot.sweet_id == sweet_id).scalar()
+
+
+def totals(db: Session, sweet_ids: Iterable[int]) -> Dict[int, int]:
+    ids = list(sweet_ids)
+    if not ids:
+        return {}
+    rows = (
+        db.query(Slot.sweet_id, func.sum(Slot.quantity))
+        .filter(Slot.sweet_id.in_(ids))
+        .group_by(Slot.sweet_id)
+        .all()
+    )
+    return dict(rows)
+
+
+def all_totals(db: Session) -> Dict[int, int]:
+    """Stock of every sweet with slots, in one grouped scan (the restock planner reads the whole catalog)."""
+    return dict(db.query(Slot.sweet_id, func.sum(Slot.quantity)).group_by(Slot.sweet_id).all())
+
+
+def overlay_loaded(db: Session, rows: Iterable[tuple], position: int) -> List[tuple]:
+    """Slot totals in place of the quantity at ``position`` of whole-catalog (id, ...) rows."""
+    rows = [tuple(row) for row in rows]
+    if not enabled():
+        return rows
+    live = all_totals(db)
+    return [row[:position] + (live[row[0]],) + row[position + 1:] if row[0] in live else row for row in rows]
+
+
+def overlay_rows(db: Session, rows: List[dict]) -> List[dict]:
+    """overlay_totals for plain rows (sparse fieldsets); only if they have a quantity."""
+    if not enabled() or not rows or "quantity" not in rows[0]:
+        return rows
+    live = totals(db, (row["id"] for row in rows))
+    for row in rows:
+        if row["id"] in live:
+            row["quantity"] = live[row["id"]]
+    return rows
+
+
+def overlay_totals(db: Session, sweets: List[models.Sweet]) -> List[models.Sweet]:
+    """Shows live slot totals in ``Sweet.quantity`` without marking the rows dirty."""
+    if not enabled() or not sweets:
+        return sweets
+    live = totals(db, (s.id for s in sweets))
+    for sweet in sweets:
+        if sweet.id in live:
+            set_committed_value(sweet, "quantity", live[sweet.id])
+    return sweets
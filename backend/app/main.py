@@ -1,29 +1,90 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .config import settings
-from .routers import auth, sweets
-
-app = FastAPI(title="Sweet Shop API")
-
-# Configure CORS (Cross-Origin Resource Sharing)
-# This allows our React frontend (running on a different port) to talk to the backend
-origins = [
-    "http://localhost:5173", # Vite default port
-    "http://localhost:3000", # Common React port
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+from . import admission, archive, audit, database, idempotency, popularity, stores
+from .config import get_settings
+from .routers import archive as archive_routes, audit as audit_routes, auth, media, ops, sweets
+from .routers import stores as store_routes
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    archive.start()
+    yield
+    # Shutdown runs after the server stopped accepting and drained in-flight
+    # requests: stop the archiver, write queued audit events, save the
+    # popularity sketch, then close this worker's pooled DB connections cleanly.
+    archive.shutdown()
+    audit.shutdown()
+    popularity.save()
+    database.dispose_engine()
+    stores.dispose_engines()
+
+
+def add_middleware(app: FastAPI) -> None:
+    """
+    Installs the middleware stack. Runs when the app first handles a request
+    (or its lifespan), not at import: settings, and the .env file behind
+    them, are only read then (cold start).
+    """
+    settings = get_settings()
+
+    # Admission control / load shedding. Added before CORS so it runs inside it
+    # (the last middleware added is the outermost) and 503s still carry CORS headers.
+    if settings.admission_enabled:
+        app.add_middleware(admission.AdmissionMiddleware, controller=admission.get_controller())
+
+    # Idempotency-Key replay runs outside admission control: a retry answered
+    # from the stored response never waits for (or takes) a worker slot.
+    app.add_middleware(idempotency.IdempotencyMiddleware, cache=idempotency.get_response_cache())
+
+    # Store selection runs outside everything that touches the database, so
+    # idempotency claims and admission-controlled handlers see the request's store.
+    app.add_middleware(stores.StoreMiddleware)
+
+    # Configure CORS (Cross-Origin Resource Sharing)
+    # This allows our React frontend (running on a different port) to talk to the backend
+    origins = [
+        "http://localhost:5173", # Vite default port
+        "http://localhost:3000", # Common React port
+    ]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # On-demand profiling. Installed last: it wraps every route of the app and
+    # its middleware sits outermost, so admission queueing counts towards a request.
+    if settings.profiling_enabled:
+        from . import profiling
+
+        profiling.install(app)
+
+
+class SweetShopAPI(FastAPI):
+    def build_middleware_stack(self):
+        # Starlette builds the stack once, on the first call into the app
+        if not getattr(self.state, "middleware_added", False):
+            self.state.middleware_added = True
+            add_middleware(self)
+        return super().build_middleware_stack()
+
+
+app = SweetShopAPI(title="Sweet Shop API", lifespan=lifespan)
 
 # Include routers with /api prefix
 app.include_router(auth.router)
 app.include_router(sweets.router)
-
+app.include_router(ops.router)
+app.include_router(media.router)
+app.include_router(audit_routes.router)
+app.include_router(store_routes.router)
+app.include_router(archive_routes.router)
 
 @app.get("/")
 def read_root():
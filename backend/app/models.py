@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, LargeBinary, ForeignKey, JSON, event
 from .database import Base
 
 class User(Base):
@@ -14,13 +16,187 @@ class User(Base):
 
 
 
+class Category(Base):
+    """One sweet category; ``key`` is the normalized name spellings are deduplicated on (see app/categories.py)."""
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    key = Column(String, unique=True, index=True, nullable=False)
+
+
 class Sweet(Base):
     __tablename__ = "sweets"
+    # Ids are never reused: an archived sweet is restored under its old id
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
-    category = Column(String, index=True, nullable=False)
+    # Name of the category, kept in step with category_id on every ORM write
+    # (see app/categories.py); filters use the integer key.
+    category = Column(String, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True, nullable=True)
     price = Column(Float, nullable=False)
     quantity = Column(Integer, default=0, nullable=False)
     # Optional: image_url for frontend visualization
-    image_url = Column(String, nullable=True)
\ No newline at end of file
+    image_url = Column(String, nullable=True)
+    # Exact price in integer cents. Being backfilled online (see app/online_migration.py);
+    # until that finishes it may be NULL on old rows, so reads still use `price`.
+    price_cents = Column(Integer, nullable=True)
+    # Soft delete: discontinued sweets are hidden at once and moved to sweets_archive
+    # by the archiver (see app/archive.py), as are sweets out of stock for too long.
+    discontinued_at = Column(DateTime, nullable=True)
+    out_of_stock_since = Column(DateTime, nullable=True)
+
+
+def price_to_cents(price: float) -> int:
+    """Rounds half up; must match the SQL used by the price_cents backfill."""
+    return int(price * 100 + 0.5)
+
+
+# Dual-write during the transition: every ORM write of `price` also sets `price_cents`
+@event.listens_for(Sweet, "before_insert")
+@event.listens_for(Sweet, "before_update")
+def _sync_price_cents(mapper, connection, sweet):
+    if sweet.price is not None:
+        sweet.price_cents = price_to_cents(sweet.price)
+
+
+@event.listens_for(Sweet, "before_insert")
+@event.listens_for(Sweet, "before_update")
+def _track_out_of_stock(mapper, connection, sweet):
+    if sweet.quantity is not None and sweet.quantity <= 0:
+        if sweet.out_of_stock_since is None:
+            sweet.out_of_stock_since = datetime.now(UTC).replace(tzinfo=None)
+    else:
+        sweet.out_of_stock_since = None
+
+
+class SweetStockSlot(Base):
+    """One counter slot of a sweet's stock in sharded-inventory mode (see app/inventory.py)."""
+    __tablename__ = "sweet_stock_slots"
+
+    sweet_id = Column(Integer, ForeignKey("sweets.id", ondelete="CASCADE"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    quantity = Column(Integer, default=0, nullable=False)
+
+
+class IdempotencyKey(Base):
+    """First response stored for an Idempotency-Key (see app/idempotency.py)."""
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of (Authorization header, method, path, client key)
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    # NULL while the original request is still executing
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, index=True, nullable=False)
+
+
+class OnlineMigration(Base):
+    """Checkpoint of a chunked online backfill (see app/online_migration.py)."""
+    __tablename__ = "online_migrations"
+
+    name = Column(String, primary_key=True)
+    # Highest key processed so far; the next chunk starts after it
+    last_key = Column(Integer, nullable=True)
+    rows_done = Column(Integer, default=0, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class RefreshToken(Base):
+    """A server-side refresh token, stored hashed (see app/refresh_tokens.py)."""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    # sha256 of the token handed to the client
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    # All tokens rotated from the same login share a family
+    family_id = Column(String, index=True, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    # Store the token was issued in (multi-store mode); only redeemable there
+    store = Column(String, nullable=True)
+
+
+class PopularSweet(Base):
+    """Snapshot of one counter of the popularity sketch (see app/popularity.py)."""
+    __tablename__ = "popular_sweets"
+
+    sweet_id = Column(Integer, ForeignKey("sweets.id", ondelete="CASCADE"), primary_key=True)
+    # Time-decayed purchase count and its Space-Saving error bound, as of updated_at
+    count = Column(Float, nullable=False)
+    error = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class AuditEntry(Base):
+    """One admin change to the catalog (see app/audit.py)."""
+    __tablename__ = "audit_log"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, index=True, nullable=False)
+    # Not foreign keys: the trail outlives deleted users and sweets
+    actor_id = Column(Integer, index=True, nullable=False)
+    actor_email = Column(String, nullable=False)
+    action = Column(String, nullable=False)  # create, update, delete, restock
+    sweet_id = Column(Integer, index=True, nullable=False)
+    # Changed fields only: {field: old value} / {field: new value}
+    before = Column(JSON, nullable=True)
+    after = Column(JSON, nullable=True)
+
+
+class SweetChange(Base):
+    """One entry of the catalog change feed (see app/changefeed.py)."""
+    __tablename__ = "sweet_changes"
+    # AUTOINCREMENT: seq must never be reused, even after compaction deleted the newest rows
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True)
+    # Not a foreign key: tombstones outlive the sweet
+    sweet_id = Column(Integer, index=True, nullable=False)
+    deleted = Column(Boolean, default=False, nullable=False)
+    changed_at = Column(DateTime, index=True, nullable=False)
+
+
+class SweetChangeFloor(Base):
+    """Highest seq dropped by change feed compaction; clients behind it must resync."""
+    __tablename__ = "sweet_change_floor"
+
+    id = Column(Integer, primary_key=True)
+    seq = Column(Integer, nullable=False)
+    compacted_at = Column(DateTime, nullable=False)
+
+
+class ArchivedSweet(Base):
+    """A sweet moved out of the hot table by the archiver (see app/archive.py)."""
+    __tablename__ = "sweets_archive"
+
+    # Own key: a sweet archived, restored and archived again has two rows
+    archive_id = Column(Integer, primary_key=True)
+    sweet_id = Column(Integer, index=True, nullable=False)
+    name = Column(String, index=True, nullable=False)
+    category = Column(String, nullable=False)
+    price = Column(Float, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    image_url = Column(String, nullable=True)
+    price_cents = Column(Integer, nullable=True)
+    discontinued_at = Column(DateTime, nullable=True)
+    out_of_stock_since = Column(DateTime, nullable=True)
+    reason = Column(String, nullable=False)  # discontinued, out_of_stock
+    archived_at = Column(DateTime, index=True, nullable=False)
+
+
+class SweetDailySales(Base):
+    """Units of a sweet sold per UTC day: the purchase ledger the restock planner reads (see app/sales.py)."""
+    __tablename__ = "sweet_daily_sales"
+
+    sweet_id = Column(Integer, primary_key=True)
+    day = Column(Integer, primary_key=True)  # days since 1970-01-01
+    units = Column(Integer, default=0, nullable=False)
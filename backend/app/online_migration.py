@@ -0,0 +1,242 @@
+# backend/app/online_migration.py
+"""
+Chunked, resumable, throttled backfills for schema changes on big tables.
+
+A plain Alembic data migration rewrites the whole table in one transaction,
+holding the write lock until it is done. Instead, an online change goes:
+
+1. expand:   a migration adds the new column as nullable (cheap), and the
+             app dual-writes it from then on (e.g. models._sync_price_cents);
+2. backfill: existing rows are filled in small key-range chunks, each in its
+             own short transaction, so API writes interleave between chunks;
+3. contract: a later migration switches reads over / adds constraints.
+
+Progress is checkpointed in ``online_migrations`` after every chunk, so an
+interrupted backfill resumes where it stopped. Throttling is a pause plus a
+duty cycle: with ``duty_cycle=0.5`` the backfill sleeps at least as long as
+each chunk took, using at most half of the database's time.
+
+An Alembic migration runs its backfill from a frozen copy of this loop in
+the revision file (see alembic/versions/bca1563380f0_*), not by importing
+this module: the migration must keep doing the same thing as the app
+changes. It checkpoints the same way, so the CLI can resume it.
+
+From the command line (resume, or run a backfill the migration skipped)::
+
+    python -m app.online_migration status
+    python -m app.online_migration run sweets_price_cents --chunk-size 2000 --duty-cycle 0.5
+"""
+import argparse
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+_progress_table = models.OnlineMigration.__table__
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """``UPDATE <table> SET <assignments>`` for every row matching ``pending``."""
+    name: str
+    table: str
+    assignments: str
+    pending: str
+    key: str = "id"
+
+
+@dataclass
+class BackfillProgress:
+    name: str
+    rows_done: int = 0
+    rows_pending: int = 0
+    last_key: Optional[int] = None
+    chunks: int = 0
+    elapsed: float = 0.0
+    finished: bool = False
+
+    @property
+    def rate(self) -> float:
+        return self.rows_done / self.elapsed if self.elapsed else 0.0
+
+    def describe(self) -> str:
+        eta = (self.rows_pending / self.rate) if self.rate else 0.0
+        state = "done" if self.finished else f"{self.rows_pending} left, ETA {eta:.0f} s"
+        return (f"{self.name}: {self.rows_done} rows in {self.chunks} chunks "
+                f"({self.rate:.0f} rows/s, last key {self.last_key}), {state}")
+
+
+# Integer-cent prices. CAST truncates, so "+ 0.5" rounds half up exactly like
+# models.price_to_cents, which the ORM dual-write uses.
+PRICE_CENTS = Backfill(
+    name="sweets_price_cents",
+    table="sweets",
+    assignments="price_cents = CAST(price * 100 + 0.5 AS INTEGER)",
+    pending="price_cents IS NULL",
+)
+
+BACKFILLS = {backfill.name: backfill for backfill in (PRICE_CENTS,)}
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, the way SQLite DateTime columns hand values back
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _load_checkpoint(connection: Connection, name: str):
+    return connection.execute(
+        _progress_table.select().where(_progress_table.c.name == name)
+    ).first()
+
+
+def _save_checkpoint(connection: Connection, progress: BackfillProgress, total_done: int) -> None:
+    now = _utcnow()
+    values = {
+        "last_key": progress.last_key,
+        "rows_done": total_done,
+        "updated_at": now,
+        "finished_at": now if progress.finished else None,
+    }
+    updated = connection.execute(
+        _progress_table.update().where(_progress_table.c.name == progress.name).values(**values)
+    )
+    if updated.rowcount == 0:
+        connection.execute(_progress_table.insert().values(name=progress.name, started_at=now, **values))
+
+
+def _transaction(connection: Connection):
+    """A short transaction per chunk, unless the connection already commits per statement (AUTOCOMMIT)."""
+    if connection.in_transaction():
+        return contextlib.nullcontext()
+    return connection.begin()
+
+
+def count_pending(connection: Connection, backfill: Backfill) -> int:
+    return connection.execute(
+        text(f"SELECT COUNT(*) FROM {backfill.table} WHERE {backfill.pending}")
+    ).scalar()
+
+
+def run_backfill(
+    connection: Connection,
+    backfill: Backfill,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause: float = 0.0,
+    duty_cycle: float = 1.0,
+    max_chunks: Optional[int] = None,
+    on_progress: Optional[Callable[[BackfillProgress], None]] = None,
+) -> BackfillProgress:
+    """
+    Runs (or resumes) a backfill, one committed key-range chunk at a time.
+
+    ``connection`` must not be inside a transaction (or must be in
+    AUTOCOMMIT mode); every chunk is committed before the next one starts.
+    ``max_chunks`` stops early (the next call resumes), which is handy for
+    maintenance windows and tests.
+    """
+    if not 0 < duty_cycle <= 1:
+        raise ValueError("duty_cycle must be in (0, 1]")
+
+    progress = BackfillProgress(backfill.name)
+    with _transaction(connection):
+        checkpoint = _load_checkpoint(connection, backfill.name)
+        previously_done = checkpoint.rows_done if checkpoint else 0
+        if checkpoint is not None and checkpoint.finished_at is not None:
+            progress.finished = True
+            progress.rows_done, progress.last_key = checkpoint.rows_done, checkpoint.last_key
+            return progress
+        progress.last_key = checkpoint.last_key if checkpoint else None
+        progress.rows_pending = count_pending(connection, backfill)
+
+    key, table = backfill.key, backfill.table
+    # Upper bound of the next chunk: the chunk_size-th key after the last one
+    next_bound = text(
+        f"SELECT {key} FROM {table} WHERE {key} > :last ORDER BY {key} LIMIT 1 OFFSET :offset"
+    )
+    started = time.perf_counter()
+    while max_chunks is None or progress.chunks < max_chunks:
+        chunk_started = time.perf_counter()
+        last = progress.last_key if progress.last_key is not None else -(2 ** 63)
+        with _transaction(connection):
+            upper = connection.execute(next_bound, {"last": last, "offset": chunk_size - 1}).scalar()
+            if upper is None:
+                upper = connection.execute(text(f"SELECT MAX({key}) FROM {table}")).scalar()
+            if upper is None or upper <= last:
+                progress.finished = True
+            else:
+                updated = connection.execute(
+                    text(f"UPDATE {table} SET {backfill.assignments} "
+                         f"WHERE {key} > :last AND {key} <= :upper AND ({backfill.pending})"),
+                    {"last": last, "upper": upper},
+                )
+                progress.rows_done += updated.rowcount
+                progress.rows_pending = max(progress.rows_pending - updated.rowcount, 0)
+                progress.last_key = upper
+                progress.chunks += 1
+            _save_checkpoint(connection, progress, previously_done + progress.rows_done)
+
+        progress.elapsed = time.perf_counter() - started
+        if progress.finished:
+            break
+        if on_progress is not None:
+            on_progress(progress)
+        # Throttle: leave the database to the app between chunks
+        busy = time.perf_counter() - chunk_started
+        time.sleep(max(pause, busy * (1 - duty_cycle) / duty_cycle))
+
+    if progress.finished:
+        logger.info("Backfill finished: %s", progress.describe())
+    if on_progress is not None:
+        on_progress(progress)
+    return progress
+
+
+def main(argv=None):
+    from .database import get_engine
+
+    parser = argparse.ArgumentParser(description="Run or inspect online backfills")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="show every backfill and its progress")
+    run = commands.add_parser("run", help="run or resume a backfill")
+    run.add_argument("name", choices=sorted(BACKFILLS))
+    run.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    run.add_argument("--pause", type=float, default=0.0, help="minimum seconds between chunks")
+    run.add_argument("--duty-cycle", type=float, default=1.0, help="max share of time spent writing")
+    run.add_argument("--max-chunks", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with get_engine().connect() as connection:
+        if args.command == "status":
+            for name, backfill in BACKFILLS.items():
+                with connection.begin():
+                    checkpoint = _load_checkpoint(connection, name)
+                    pending = count_pending(connection, backfill)
+                state = "not started" if checkpoint is None else (
+                    f"finished {checkpoint.finished_at:%Y-%m-%d %H:%M}" if checkpoint.finished_at
+                    else f"in progress, last key {checkpoint.last_key}"
+                )
+                done = checkpoint.rows_done if checkpoint else 0
+                print(f"{name}: {state}, {done} rows done, {pending} pending")
+            return
+
+        run_backfill(
+            connection, BACKFILLS[args.name],
+            chunk_size=args.chunk_size, pause=args.pause,
+            duty_cycle=args.duty_cycle, max_chunks=args.max_chunks,
+            on_progress=lambda p: print(f"--> {p.describe()}"),
+        )
+
+
+if __name__ == "__main__":
+    main()
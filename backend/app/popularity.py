@@ -0,0 +1,305 @@
+# backend/app/popularity.py
+"""
+"Popular right now": a time-decayed Space-Saving sketch over purchases.
+
+Ranking the catalog with ``GROUP BY`` over purchase history on every page
+view is far too expensive, so purchases feed a fixed-size in-memory summary
+instead:
+
+- Space-Saving keeps at most ``POPULAR_CAPACITY`` counters however large the
+  catalog is. An unmonitored sweet takes over the smallest counter and
+  inherits its count as its error bound, so every sweet that is truly in the
+  top-k is monitored.
+- Decay is "forward": a purchase at time t adds 2^((t - landmark) / half-life)
+  instead of 1, so older purchases shrink relative to new ones without ever
+  touching the other counters. A purchase of a monitored sweet is one dict
+  update; the landmark moves (one pass over the counters) only every
+  ``RENORMALIZE_AFTER`` half-lives.
+- The smallest counter is found through a lazily maintained heap: stale heap
+  entries are only fixed up when a counter has to be evicted.
+- At most every ``POPULAR_SNAPSHOT_SECONDS`` (and on shutdown) the purchases
+  recorded since the last snapshot are merged into ``popular_sweets``, per
+  sweet: stored counts are decayed to now and the new purchases added. The
+  table is reloaded on first use, so a restart keeps the shelf.
+
+Each worker process keeps its own sketch of the purchases it served; with
+requests spread across workers that is a uniform sample of the traffic.
+Every worker merges its own purchases into the same table, so it holds the
+whole traffic and a restarted worker starts from everyone's counts.
+"""
+import heapq
+import logging
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import catalog_events, database, models, stores
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Move the landmark once weights grow past 2^RENORMALIZE_AFTER (floats stay exact enough)
+RENORMALIZE_AFTER = 64
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, the way SQLite DateTime columns hand values back
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class DecayedSpaceSaving:
+    """Top-k heavy hitters with exponential time decay, in O(capacity) memory."""
+
+    def __init__(self, capacity: int, half_life: float, clock=time.time):
+        self.capacity = capacity
+        self.half_life = half_life
+        self._clock = clock
+        self._landmark = clock()
+        # item -> [count, error], both scaled to the landmark
+        self._counters: Dict[int, List[float]] = {}
+        # (count, item) with possibly stale counts; fixed up lazily on eviction
+        self._heap: List[Tuple[float, int]] = []
+
+    def _weight(self, now: float) -> float:
+        return 2.0 ** ((now - self._landmark) / self.half_life)
+
+    def _renormalize(self, now: float) -> None:
+        scale = 1.0 / self._weight(now)
+        for counter in self._counters.values():
+            counter[0] *= scale
+            counter[1] *= scale
+        self._landmark = now
+        self._heap = [(counter[0], item) for item, counter in self._counters.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_smallest(self) -> Tuple[int, List[float]]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            counter = self._counters.get(item)
+            if counter is None:
+                continue  # discarded item
+            if counter[0] != count:
+                heapq.heappush(self._heap, (counter[0], item))
+                continue
+            return item, self._counters.pop(item)
+
+    def add(self, item: int, amount: float = 1.0, now: Optional[float] = None) -> None:
+        now = self._clock() if now is None else now
+        if (now - self._landmark) / self.half_life > RENORMALIZE_AFTER:
+            self._renormalize(now)
+        increment = amount * self._weight(now)
+
+        counter = self._counters.get(item)
+        if counter is not None:
+            counter[0] += increment
+            return
+        if len(self._counters) < self.capacity:
+            self._counters[item] = [increment, 0.0]
+        else:
+            _, smallest = self._pop_smallest()
+            self._counters[item] = [smallest[0] + increment, smallest[0]]
+        heapq.heappush(self._heap, (self._counters[item][0], item))
+
+    def discard(self, item: int) -> None:
+        # Its heap entry is skipped when it surfaces
+        self._counters.pop(item, None)
+
+    def top(self, limit: int, now: Optional[float] = None) -> List[Tuple[int, float, float]]:
+        """Returns up to ``limit`` (item, decayed count, error bound), largest first."""
+        now = self._clock() if now is None else now
+        scale = 1.0 / self._weight(now)
+        best = heapq.nlargest(limit, self._counters.items(), key=lambda pair: (pair[1][0], -pair[0]))
+        return [(item, count * scale, error * scale) for item, (count, error) in best]
+
+    def items(self, now: Optional[float] = None) -> List[Tuple[int, float, float]]:
+        return self.top(len(self._counters), now)
+
+    def load(self, rows: List[Tuple[int, float, float]], now: Optional[float] = None) -> None:
+        """Replaces the counters with (item, count, error) values as of ``now``."""
+        now = self._clock() if now is None else now
+        self._landmark = now
+        best = heapq.nlargest(self.capacity, rows, key=lambda row: row[1])
+        self._counters = {item: [count, error] for item, count, error in best}
+        self._heap = [(counter[0], item) for item, counter in self._counters.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class PopularityTracker:
+    """Thread-safe sketch of recent purchases, persisted to ``popular_sweets``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        settings = get_settings()
+        with self._lock:
+            self.sketch = DecayedSpaceSaving(
+                settings.popular_capacity, settings.popular_half_life_minutes * 60
+            )
+            self.loaded = False
+            # Purchases not merged into popular_sweets yet, weighted relative
+            # to _unsaved_since the way the sketch weighs them to its landmark
+            self._unsaved: Dict[int, float] = {}
+            self._removed: Set[int] = set()
+            self._unsaved_since = time.time()
+            self._last_snapshot = time.monotonic()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._unsaved or self._removed)
+
+    # --- Persistence ---
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self.loaded:
+            return
+        rows = db.query(models.PopularSweet).all()
+        now = _utcnow()
+        half_life = self.sketch.half_life
+        decayed = []
+        for row in rows:
+            # Age the saved counters by the downtime
+            factor = 2.0 ** (-max((now - row.updated_at).total_seconds(), 0.0) / half_life)
+            decayed.append((row.sweet_id, row.count * factor, row.error * factor))
+        with self._lock:
+            if self.loaded:
+                return
+            # Purchases recorded before the load are kept on top of the snapshot
+            pending = self.sketch.items()
+            self.sketch.load(decayed)
+            for item, count, _ in pending:
+                self.sketch.add(item, count)
+            self.loaded = True
+
+    def snapshot(self, db: Session, unsaved: Dict[int, float], removed: Set[int], since: float) -> int:
+        """
+        Merges purchases (weighted relative to ``since``) and removed sweets
+        into ``popular_sweets``; the caller commits. Returns the rows kept.
+        """
+        half_life = self.sketch.half_life
+        now = _utcnow()
+        rows = {row.sweet_id: row for row in db.query(models.PopularSweet)}
+        counts = {}
+        for sweet_id, row in rows.items():
+            if sweet_id not in removed:
+                factor = 2.0 ** (-max((now - row.updated_at).total_seconds(), 0.0) / half_life)
+                counts[sweet_id] = [row.count * factor, row.error * factor]
+        scale = 2.0 ** ((since - time.time()) / half_life)
+        for sweet_id, amount in unsaved.items():
+            counts.setdefault(sweet_id, [0.0, 0.0])[0] += amount * scale
+
+        # Workers track different sweets: keep the table as small as a sketch
+        kept = dict(heapq.nlargest(self.sketch.capacity, counts.items(), key=lambda pair: pair[1][0]))
+        for sweet_id, row in rows.items():
+            if sweet_id not in kept:
+                db.delete(row)
+        for sweet_id, (count, error) in kept.items():
+            row = rows.get(sweet_id)
+            if row is None:
+                db.add(models.PopularSweet(sweet_id=sweet_id, count=count, error=error, updated_at=now))
+            else:
+                row.count, row.error, row.updated_at = count, error, now
+        return len(kept)
+
+    def snapshot_if_due(self) -> None:
+        if not self.dirty or time.monotonic() - self._last_snapshot < get_settings().popular_snapshot_seconds:
+            return
+        self.save()
+
+    def save(self) -> None:
+        """Snapshots in a session of its own (after a purchase, and on shutdown)."""
+        if not self.loaded or not self.dirty:
+            return
+        with self._lock:
+            taken = self._unsaved, self._removed, self._unsaved_since
+            self._unsaved, self._removed, self._unsaved_since = {}, set(), time.time()
+            self._last_snapshot = time.monotonic()
+        db = database.SessionLocal()
+        try:
+            # Read and write in one transaction: if another worker merged in
+            # between, SQLite refuses the write instead of losing its counts
+            self.snapshot(db, *taken)
+            db.commit()
+        except Exception:
+            # The shelf is a best-effort view; never fail a purchase over it
+            db.rollback()
+            self._give_back(*taken)
+            logger.exception("Could not snapshot popular sweets")
+        finally:
+            db.close()
+
+    def _give_back(self, unsaved: Dict[int, float], removed: Set[int], since: float) -> None:
+        """Returns what a failed snapshot took, so the next one retries it."""
+        with self._lock:
+            scale = 2.0 ** ((since - self._unsaved_since) / self.sketch.half_life)
+            for sweet_id, amount in unsaved.items():
+                if sweet_id not in self._removed:
+                    self._unsaved[sweet_id] = self._unsaved.get(sweet_id, 0.0) + amount * scale
+            self._removed |= removed
+
+    # --- Updates and queries ---
+
+    def record(self, sweet_id: int, amount: int = 1) -> None:
+        now = time.time()
+        half_life = self.sketch.half_life
+        with self._lock:
+            self.sketch.add(sweet_id, amount, now)
+            if (now - self._unsaved_since) / half_life > RENORMALIZE_AFTER:
+                # Unsaved for long: move the reference like the sketch moves its landmark
+                scale = 2.0 ** ((self._unsaved_since - now) / half_life)
+                self._unsaved = {item: value * scale for item, value in self._unsaved.items()}
+                self._unsaved_since = now
+            weight = 2.0 ** ((now - self._unsaved_since) / half_life)
+            self._unsaved[sweet_id] = self._unsaved.get(sweet_id, 0.0) + amount * weight
+
+    def apply_changes(self, upserted: List[dict], deleted: List[int]) -> None:
+        """catalog_events listener: deleted sweets leave the shelf."""
+        if not deleted:
+            return
+        with self._lock:
+            for sweet_id in deleted:
+                self.sketch.discard(sweet_id)
+                self._unsaved.pop(sweet_id, None)
+                self._removed.add(sweet_id)
+
+    def top(self, limit: int) -> List[Tuple[int, float]]:
+        with self._lock:
+            return [(item, count) for item, count, _ in self.sketch.top(limit)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "tracked": len(self.sketch),
+                "capacity": self.sketch.capacity,
+                "half_life_seconds": self.sketch.half_life,
+            }
+
+
+# One tracker per store in multi-store mode, created on first use once the settings are available
+_trackers = stores.PerStore(PopularityTracker)
+
+
+def get_tracker() -> PopularityTracker:
+    return _trackers.get()
+
+
+@catalog_events.subscribe
+def _apply_changes(upserted: List[dict], deleted: List[int]) -> None:
+    tracker = _trackers.peek()
+    if tracker is not None:
+        tracker.apply_changes(upserted, deleted)
+
+
+def save() -> None:
+    """Shutdown hook: persists every sketch created in this process, each to its store."""
+    for store, tracker in _trackers.items():
+        with stores.use_store(store):
+            tracker.save()
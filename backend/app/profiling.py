@@ -0,0 +1,281 @@
+# backend/app/profiling.py
+"""
+On-demand request profiling (PROFILING_ENABLED=true).
+
+A request is profiled when an admin asks for it, with an ``X-Profile: 1``
+header or a ``?profile=1`` query parameter (the bearer token must carry the
+``is_admin`` claim), or for a random ``PROFILING_SAMPLE_RATE`` fraction of
+all traffic. For each profiled request, ``PROFILING_DIR`` receives:
+
+- ``<id>.json``: method, path, status, total time, time in the endpoint
+  function, and SQL time, broken down per statement (count and total ms).
+- ``<id>.html`` (pyinstrument, if installed) or ``<id>.pstats`` (cProfile)
+  for the endpoint function. Open .pstats with snakeviz or
+  ``python -m pstats``.
+
+The response carries ``X-Profile-Id`` so the artifacts are easy to find.
+
+When profiling is disabled nothing is installed: no middleware, no SQL
+event listeners, no endpoint wrappers. When it is enabled, a request that
+is not profiled costs one header scan, a random number and a context
+variable lookup per SQL statement.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"x-profile"
+QUERY_FLAG = "profile"
+TRUE_VALUES = ("1", "true", "yes")
+SQL_TEXT_LIMIT = 300
+
+_active: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("profile", default=None)
+
+
+def _pyinstrument():
+    try:
+        import pyinstrument
+    except ImportError:
+        return None
+    return pyinstrument
+
+
+class RequestProfile:
+    """Timings collected for one profiled request (from any thread it uses)."""
+
+    def __init__(self, method: str, path: str, reason: str):
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.status_code: Optional[int] = None
+        self.total_s = 0.0
+        self.endpoint_s = 0.0
+        self.sql_s = 0.0
+        self.sql_count = 0
+        # statement -> [count, seconds]
+        self.statements: Dict[str, list] = {}
+        self.endpoint_report: Optional[tuple] = None  # (extension, data)
+        self._lock = threading.Lock()
+
+    def add_sql(self, statement: str, seconds: float) -> None:
+        key = " ".join(statement.split())[:SQL_TEXT_LIMIT]
+        with self._lock:
+            self.sql_count += 1
+            self.sql_s += seconds
+            entry = self.statements.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def summary(self) -> dict:
+        statements = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status_code": self.status_code,
+            "total_ms": round(self.total_s * 1000, 3),
+            "endpoint_ms": round(self.endpoint_s * 1000, 3),
+            "sql_ms": round(self.sql_s * 1000, 3),
+            "sql_count": self.sql_count,
+            "statements": [
+                {"sql": sql, "count": count, "total_ms": round(seconds * 1000, 3)}
+                for sql, (count, seconds) in statements
+            ],
+        }
+
+    def write(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.id)
+        if self.endpoint_report is not None:
+            extension, data = self.endpoint_report
+            mode = "w" if isinstance(data, str) else "wb"
+            with open(f"{base}.{extension}", mode) as f:
+                f.write(data)
+        with open(f"{base}.json", "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+# --- Endpoint profiling ---
+
+def _profile_call(profile: RequestProfile, call):
+    """Runs ``call()`` under pyinstrument or cProfile and keeps the report."""
+    started = time.perf_counter()
+    pyinstrument = _pyinstrument()
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler(interval=0.0005)
+        profiler.start()
+        try:
+            return call()
+        finally:
+            profiler.stop()
+            profile.endpoint_s += time.perf_counter() - started
+            profile.endpoint_report = ("html", profiler.output_html())
+
+    import cProfile
+    import marshal
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return call()
+    finally:
+        profiler.disable()
+        profile.endpoint_s += time.perf_counter() - started
+        profiler.create_stats()
+        profile.endpoint_report = ("pstats", marshal.dumps(profiler.stats))
+
+
+def wrap_endpoint(endpoint):
+    """Profiles the endpoint function in whatever thread FastAPI runs it."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def profiled_async(*args, **kwargs):
+            profile = _active.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            # Coroutines interleave with other requests; time them only
+            started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.endpoint_s += time.perf_counter() - started
+        return profiled_async
+
+    @functools.wraps(endpoint)
+    def profiled(*args, **kwargs):
+        profile = _active.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        return _profile_call(profile, lambda: endpoint(*args, **kwargs))
+    return profiled
+
+
+# --- SQL timing ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active.get()
+    if profile is not None and conn.info.get("profile_started"):
+        profile.add_sql(statement, time.perf_counter() - conn.info["profile_started"].pop())
+
+
+# --- Selection and middleware ---
+
+def _is_admin_token(authorization: bytes) -> bool:
+    from jose import JWTError, jwt
+
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    settings = get_settings()
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except JWTError:
+        return False
+    return bool(payload.get("is_admin"))
+
+
+def _requested(scope) -> Optional[bytes]:
+    """Returns the Authorization header if the request asks to be profiled."""
+    flag = authorization = None
+    for name, value in scope["headers"]:
+        if name == HEADER:
+            flag = value.decode("latin-1").lower()
+        elif name == b"authorization":
+            authorization = value
+    if flag is None and QUERY_FLAG.encode() in scope.get("query_string", b""):
+        values = parse_qs(scope["query_string"].decode("latin-1")).get(QUERY_FLAG)
+        flag = values[-1].lower() if values else None
+    if flag in TRUE_VALUES and authorization:
+        return authorization
+    return None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware deciding which requests to profile."""
+
+    def __init__(self, app, sample_rate: float, directory: str):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.directory = directory
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        reason = None
+        authorization = _requested(scope)
+        if authorization is not None and _is_admin_token(authorization):
+            reason = "requested"
+        elif self.sample_rate and random.random() < self.sample_rate:
+            reason = "sampled"
+        if reason is None:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"], reason)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _active.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.total_s = time.perf_counter() - started
+            _active.reset(token)
+            try:
+                await run_in_threadpool(profile.write, self.directory)
+            except OSError:
+                logger.exception("Could not write profile %s", profile.id)
+
+
+def install(app) -> None:
+    """Wires profiling into ``app`` (after its routes are included); only when PROFILING_ENABLED is set."""
+    from fastapi.routing import APIRoute
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if getattr(app.state, "profiling_installed", False):
+        return
+    app.state.profiling_installed = True
+
+    settings = get_settings()
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            # FastAPI looks the endpoint up on the dependant at call time
+            route.dependant.call = wrap_endpoint(route.dependant.call)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.profiling_sample_rate,
+        directory=settings.profiling_dir,
+    )
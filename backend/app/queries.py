@@ -0,0 +1,204 @@
+# backend/app/queries.py
+"""
+Prebuilt statements for the hot queries.
+
+``db.query(Sweet).filter(Sweet.id == sweet_id).first()`` costs Python time
+on every request twice over: building the expression, then walking it to
+compute the cache key SQLAlchemy uses to find the already compiled SQL. The
+statements here are built once, with bound parameters in place of the
+values. A statement memoizes its cache key, so executing it again goes
+straight to the engine's compiled cache (``QUERY_CACHE_SIZE`` entries).
+
+- ``sweet_by_id``, ``sweets_by_ids``, ``list_sweets``, ``user_by_email``
+- ``search_sweets``: one statement per filter shape (which filters are set,
+  the sort, whether there is an offset or limit). Up to ``MAX_SHAPES`` are
+  kept; past that, new shapes are built per call. A category filter is
+  resolved to category ids in memory first (see app/categories.py) and
+  matched on the indexed ``category_id``. In sharded-inventory mode the
+  stock filter and sort use the live slot totals (see app/inventory.py).
+- ``search_rows`` / ``list_rows``: the same with only some columns selected
+  (sparse fieldsets, see app/encoding.py), returned as plain dicts.
+
+``stats()`` (``GET /api/ops/queries``) reports how often a shape was reused
+and, for engines passed to ``track()``, how often SQL came from the compiled
+cache. See benchmarks/bench_queries.py for the per-request savings.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, select
+
+from . import categories, inventory, models
+
+Sweet = models.Sweet
+
+# Discontinued sweets are out of the catalog (see app/archive.py)
+ON_SALE = Sweet.discontinued_at.is_(None)
+
+SWEET_BY_ID = select(Sweet).where(Sweet.id == bindparam("sweet_id"), ON_SALE).limit(1)
+SWEETS_BY_IDS = select(Sweet).where(Sweet.id.in_(bindparam("ids", expanding=True)), ON_SALE)
+LIST_SWEETS = select(Sweet).where(ON_SALE).offset(bindparam("skip")).limit(bindparam("limit"))
+USER_BY_EMAIL = select(models.User).where(models.User.email == bindparam("email")).limit(1)
+
+# sort: price, name or quantity; a leading "-" sorts descending
+SEARCH_SORTS = {
+    "price": Sweet.price,
+    "name": Sweet.name,
+    "quantity": Sweet.quantity,
+}
+
+# Sharded stock: purchases only decrement the slots, so sweets.quantity is
+# stale. Sweets without slots yet (see inventory._ensure_slots) keep theirs.
+SLOT_STOCK = func.coalesce(
+    select(func.sum(models.SweetStockSlot.quantity))
+    .where(models.SweetStockSlot.sweet_id == Sweet.id)
+    .correlate(Sweet)
+    .scalar_subquery(),
+    Sweet.quantity,
+)
+
+# Filter shapes x fieldsets; enough for every shape the routes can produce in practice
+MAX_SHAPES = 4096
+
+_search_statements: Dict[tuple, object] = {}
+_list_statements: Dict[tuple, object] = {}
+
+_stats_lock = threading.Lock()
+_stats = {"shape_hits": 0, "shape_misses": 0, "compiled_hits": 0, "compiled_misses": 0, "uncached": 0}
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def sweet_by_id(db, sweet_id: int) -> Optional[models.Sweet]:
+    return db.scalars(SWEET_BY_ID, {"sweet_id": sweet_id}).first()
+
+
+def sweets_by_ids(db, ids: List[int]) -> List[models.Sweet]:
+    return db.scalars(SWEETS_BY_IDS, {"ids": ids}).all()
+
+
+def list_sweets(db, skip: int, limit: int) -> List[models.Sweet]:
+    return db.scalars(LIST_SWEETS, {"skip": skip, "limit": limit}).all()
+
+
+def user_by_email(db, email: str) -> Optional[models.User]:
+    return db.scalars(USER_BY_EMAIL, {"email": email}).first()
+
+
+def _entities(columns: Optional[Tuple[str, ...]]) -> tuple:
+    return (Sweet,) if columns is None else tuple(getattr(Sweet, name) for name in columns)
+
+
+def _cached(cache: Dict[tuple, object], shape: tuple, build):
+    stmt = cache.get(shape)
+    if stmt is not None:
+        _count("shape_hits")
+        return stmt
+    _count("shape_misses")
+    stmt = build(shape)
+    if len(cache) < MAX_SHAPES:
+        # Two threads may both build a shape; either statement will do
+        stmt = cache.setdefault(shape, stmt)
+    return stmt
+
+
+def list_rows(db, columns: Tuple[str, ...], skip: int, limit: int) -> List[dict]:
+    """Like list_sweets, selecting only ``columns``."""
+    stmt = _cached(_list_statements, columns, lambda shape: select(*_entities(shape)).where(ON_SALE)
+                   .offset(bindparam("skip")).limit(bindparam("limit")))
+    return [dict(row) for row in db.execute(stmt, {"skip": skip, "limit": limit}).mappings()]
+
+
+def _build_search(shape: tuple):
+    has_q, has_category, has_min, has_max, in_stock, sort, has_skip, has_limit, columns, sharded = shape
+    stock = SLOT_STOCK if sharded else Sweet.quantity
+    stmt = select(*_entities(columns)).where(ON_SALE)
+    if has_q:
+        # ILIKE is case-insensitive (sqlite supports it natively or via lower())
+        stmt = stmt.where(Sweet.name.ilike(bindparam("q")))
+    if has_category:
+        stmt = stmt.where(Sweet.category_id.in_(bindparam("category_ids", expanding=True)))
+    if has_min:
+        stmt = stmt.where(Sweet.price >= bindparam("price_min"))
+    if has_max:
+        stmt = stmt.where(Sweet.price <= bindparam("price_max"))
+    if in_stock is not None:
+        stmt = stmt.where(stock > 0 if in_stock else stock <= 0)
+    if sort:
+        column = stock if sort.lstrip("-") == "quantity" else SEARCH_SORTS[sort.lstrip("-")]
+        stmt = stmt.order_by(column.desc() if sort.startswith("-") else column, Sweet.id)
+    if has_skip:
+        stmt = stmt.offset(bindparam("skip"))
+    if has_limit:
+        stmt = stmt.limit(bindparam("limit"))
+    return stmt
+
+
+def search_statement(q: Optional[str] = None, category_ids: Optional[List[int]] = None,
+                     price_min: Optional[float] = None, price_max: Optional[float] = None,
+                     in_stock: Optional[bool] = None, sort: Optional[str] = None,
+                     skip: int = 0, limit: Optional[int] = None,
+                     columns: Optional[Tuple[str, ...]] = None) -> Tuple[object, dict]:
+    """The prebuilt statement for this combination of filters (and columns), and its parameters."""
+    reads_stock = in_stock is not None or (sort or "").lstrip("-") == "quantity"
+    shape = (bool(q), category_ids is not None, price_min is not None, price_max is not None,
+             in_stock, sort or None, bool(skip), limit is not None, columns,
+             reads_stock and inventory.enabled())
+    stmt = _cached(_search_statements, shape, _build_search)
+
+    params = {"q": f"%{q}%", "category_ids": category_ids, "price_min": price_min,
+              "price_max": price_max, "skip": skip, "limit": limit}
+    used = {"q": shape[0], "category_ids": shape[1], "price_min": shape[2], "price_max": shape[3],
+            "skip": shape[6], "limit": shape[7]}
+    return stmt, {name: value for name, value in params.items() if used[name]}
+
+
+def search_sweets(db, category: Optional[str] = None, category_id: Optional[int] = None,
+                  **filters) -> List[models.Sweet]:
+    category_ids = categories.resolve(db, category, category_id)
+    stmt, params = search_statement(category_ids=category_ids, **filters)
+    return db.scalars(stmt, params).all()
+
+
+def search_rows(db, columns: Tuple[str, ...], category: Optional[str] = None,
+                category_id: Optional[int] = None, **filters) -> List[dict]:
+    """Like search_sweets, selecting only ``columns``."""
+    category_ids = categories.resolve(db, category, category_id)
+    stmt, params = search_statement(category_ids=category_ids, columns=columns, **filters)
+    return [dict(row) for row in db.execute(stmt, params).mappings()]
+
+
+# --- Compiled cache statistics ---
+
+def _record_cache_use(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        return
+    # The markers live on the dialect (sqlalchemy.engine.default), not the context
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is context.dialect.CACHE_HIT:
+        _count("compiled_hits")
+    elif cache_hit is context.dialect.CACHE_MISS:
+        _count("compiled_misses")
+    else:
+        _count("uncached")
+
+
+def track(engine) -> None:
+    """Counts compiled-cache hits and misses for statements run on ``engine``."""
+    if not event.contains(engine, "before_cursor_execute", _record_cache_use):
+        event.listen(engine, "before_cursor_execute", _record_cache_use)
+
+
+def stats() -> dict:
+    with _stats_lock:
+        snapshot = dict(_stats)
+    shapes = snapshot["shape_hits"] + snapshot["shape_misses"]
+    compiled = snapshot["compiled_hits"] + snapshot["compiled_misses"]
+    snapshot["search_shapes"] = len(_search_statements)
+    snapshot["list_shapes"] = len(_list_statements)
+    snapshot["shape_hit_rate"] = round(snapshot["shape_hits"] / shapes, 4) if shapes else None
+    snapshot["compiled_hit_rate"] = round(snapshot["compiled_hits"] / compiled, 4) if compiled else None
+    return snapshot
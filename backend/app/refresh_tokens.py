@@ -0,0 +1,132 @@
+# backend/app/refresh_tokens.py
+"""
+Rotating refresh tokens, stored hashed on the server.
+
+Logging in costs a bcrypt verify (~0.25 s of CPU by design). Instead of
+re-posting credentials whenever the short-lived access token expires,
+clients trade their refresh token for a new access token:
+
+- The token is 256 random bits, so a plain SHA-256 is enough to store it
+  safely; a refresh is one indexed lookup, not a password hash.
+- Every refresh rotates the token: the old one is revoked and a new one
+  from the same family is issued.
+- Presenting an already-rotated token means it was copied, so the whole
+  family is revoked (the thief and the user both have to log in again).
+- Logout revokes the family; a password change revokes all of the user's
+  tokens.
+- In multi-store mode a token records its store and is only redeemable
+  there, like the access tokens it is traded for.
+"""
+import hashlib
+import secrets
+from datetime import UTC, datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models, stores
+from .config import get_settings
+
+RefreshToken = models.RefreshToken
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, the way SQLite DateTime columns hand values back
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def hash_token(raw: str) -> str:
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _lookup(db: Session, raw: str) -> Optional[models.RefreshToken]:
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.token_hash == hash_token(raw), RefreshToken.store == stores.current_store())
+        .first()
+    )
+
+
+def issue(db: Session, user: models.User, family_id: Optional[str] = None) -> str:
+    """Creates a refresh token for ``user`` and returns the raw value (shown once)."""
+    raw = secrets.token_urlsafe(32)
+    now = _utcnow()
+    db.add(RefreshToken(
+        user_id=user.id,
+        token_hash=hash_token(raw),
+        family_id=family_id or secrets.token_hex(16),
+        created_at=now,
+        expires_at=now + timedelta(days=get_settings().refresh_token_expire_days),
+        store=stores.current_store(),
+    ))
+    return raw
+
+
+def rotate(db: Session, raw: str) -> Optional[Tuple[models.User, str]]:
+    """
+    Exchanges a refresh token for a new one. Returns (user, new raw token),
+    or None if the token is unknown, expired, revoked or its user inactive.
+    The caller commits.
+    """
+    now = _utcnow()
+    # Check and revoke in one statement, before anything is read: of two
+    # refreshes racing with the same token only one revokes it, the other
+    # sees it revoked and is treated as reuse
+    revoked = (
+        db.query(RefreshToken)
+        .filter(
+            RefreshToken.token_hash == hash_token(raw),
+            RefreshToken.store == stores.current_store(),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    )
+    token = _lookup(db, raw)
+    if token is None:
+        return None
+    if revoked != 1:
+        # Not expired, so already revoked (token.revoked_at may be stale in this session)
+        if token.expires_at > now:
+            # Reuse of a rotated token: assume it leaked and end the whole session
+            revoke_family(db, token.family_id)
+            db.commit()
+        return None
+    user = db.get(models.User, token.user_id)
+    if user is None or not user.is_active:
+        db.rollback()
+        return None
+    return user, issue(db, user, family_id=token.family_id)
+
+
+def revoke_family(db: Session, family_id: str) -> int:
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: _utcnow()}, synchronize_session=False)
+    )
+
+
+def revoke(db: Session, raw: str) -> bool:
+    """Logout: revokes the session the token belongs to."""
+    token = _lookup(db, raw)
+    if token is None:
+        return False
+    revoke_family(db, token.family_id)
+    return True
+
+
+def revoke_all(db: Session, user_id: int) -> int:
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: _utcnow()}, synchronize_session=False)
+    )
+
+
+def purge_expired(db: Session) -> int:
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.expires_at <= _utcnow())
+        .delete(synchronize_session=False)
+    )
@@ -0,0 +1,49 @@
+# backend/app/routers/archive.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app import archive, audit, database, models, schemas, dependencies, inventory
+
+router = APIRouter(
+    prefix="/api/archive",
+    tags=["Archive"]
+)
+
+
+# 1. Browse Archived Sweets (Admin Only)
+# URL: /api/archive/sweets?q=...&skip=0&limit=50
+# Newest first. Discontinued sweets show up here once the archiver ran.
+@router.get("/sweets", response_model=List[schemas.ArchivedSweetResponse])
+def read_archived_sweets(
+    q: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(database.get_db),
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    query = db.query(models.ArchivedSweet)
+    if q:
+        query = query.filter(models.ArchivedSweet.name.ilike(f"%{q}%"))
+
+    return query.order_by(models.ArchivedSweet.archive_id.desc()).offset(skip).limit(limit).all()
+
+
+# 2. Restore a Sweet (Admin Only)
+# Brings a discontinued or archived sweet back into the catalog under its old id.
+@router.post("/sweets/{sweet_id}/restore", response_model=schemas.SweetResponse)
+def restore_sweet(
+    sweet_id: int,
+    db: Session = Depends(database.get_db),
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    try:
+        sweet = archive.restore(db, sweet_id)
+    except archive.RestoreError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Sweet not found in the archive")
+
+    sweet = inventory.overlay_totals(db, [sweet])[0]
+    audit.get_audit_log().record(admin, audit.RESTORE, sweet_id, after=audit.sweet_fields(sweet))
+    return sweet
@@ -0,0 +1,36 @@
+# backend/app/routers/audit.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app import database, models, schemas, dependencies
+
+router = APIRouter(
+    prefix="/api/audit",
+    tags=["Audit"]
+)
+
+
+# 1. Browse the Audit Trail (Admin Only)
+# URL: /api/audit?sweet_id=...&actor=...&action=...&skip=0&limit=50
+# Newest first. Events are written in the background, so the last few
+# may show up a moment after the change.
+@router.get("/", response_model=List[schemas.AuditEntryResponse])
+def read_audit_log(
+    sweet_id: Optional[int] = None,
+    actor: Optional[str] = None,
+    action: Optional[str] = Query(None, pattern="^(create|update|delete|restock|restore)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(database.get_db),
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    query = db.query(models.AuditEntry)
+    if sweet_id is not None:
+        query = query.filter(models.AuditEntry.sweet_id == sweet_id)
+    if actor:
+        query = query.filter(models.AuditEntry.actor_email == actor)
+    if action:
+        query = query.filter(models.AuditEntry.action == action)
+
+    return query.order_by(models.AuditEntry.id.desc()).offset(skip).limit(limit).all()
@@ -1,10 +1,10 @@
 # backend/app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app import database, models, schemas, auth
+from app import database, models, queries, schemas, auth, dependencies, refresh_tokens, stores
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from app.config import settings  # Add this import
+from app.config import get_settings
 
 router = APIRouter(
     prefix="/api/auth",
@@ -14,7 +14,7 @@ router = APIRouter(
 @router.post("/register", response_model=schemas.UserResponse)
 def register(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
     # 1. Check if email already exists
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+    db_user = queries.user_by_email(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -34,10 +34,24 @@ def register(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
 
 
 
+def issue_tokens(user: models.User, refresh_token: str) -> dict:
+    access_token_expires = timedelta(minutes=get_settings().access_token_expire_minutes)
+    access_token = auth.create_access_token(
+        data={
+            "sub": user.email, 
+            "is_admin": user.is_admin,  # <--- ADD THIS LINE
+            # Users live in each store's database: the token is only valid in its store
+            "store": stores.current_store(),
+        }, 
+        expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
 @router.post("/login", response_model=schemas.Token)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
     # 1. Find user by email (OAuth2Form uses 'username' field for email)
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
+    user = queries.user_by_email(db, form_data.username)
     
     # 2. Check user and password
     if not user or not auth.verify_password(form_data.password, user.hashed_password):
@@ -47,13 +61,49 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = auth.create_access_token(
-        data={
-            "sub": user.email, 
-            "is_admin": user.is_admin  # <--- ADD THIS LINE
-        }, 
-        expires_delta=access_token_expires
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    # 3. Start a refresh-token session, so the client need not log in again soon
+    refresh_tokens.purge_expired(db)
+    refresh_token = refresh_tokens.issue(db, user)
+    db.commit()
+    return issue_tokens(user, refresh_token)
+
+
+# Trade a refresh token for a new access token (and a new refresh token).
+# A SHA-256 lookup instead of a bcrypt verify.
+@router.post("/refresh", response_model=schemas.Token)
+def refresh(body: schemas.RefreshRequest, db: Session = Depends(database.get_db)):
+    rotated = refresh_tokens.rotate(db, body.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = rotated
+    db.commit()
+    return issue_tokens(user, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: schemas.RefreshRequest, db: Session = Depends(database.get_db)):
+    # Unknown tokens are ignored: logging out twice is not an error
+    refresh_tokens.revoke(db, body.refresh_token)
+    db.commit()
+    return None
+
+
+@router.post("/change-password", response_model=schemas.Token)
+def change_password(
+    body: schemas.PasswordChange,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(dependencies.get_current_active_user)
+):
+    if not auth.verify_password(body.current_password, current_user.hashed_password):
+        raise HTTPException(status_code=400, detail="Incorrect password")
+
+    current_user.hashed_password = auth.get_password_hash(body.new_password)
+    # Sign out every other session; this one continues with a fresh token
+    refresh_tokens.revoke_all(db, current_user.id)
+    refresh_token = refresh_tokens.issue(db, current_user)
+    db.commit()
+    return issue_tokens(current_user, refresh_token)
@@ -0,0 +1,53 @@
+# backend/app/routers/media.py
+import os
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse
+
+from app import dependencies, images, models, schemas
+from app.config import get_settings
+
+router = APIRouter(tags=["Media"])
+
+# Content-addressed files never change, so clients may cache them forever
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+# 1. Upload Image (Admin Only)
+@router.post(
+    "/api/images",
+    response_model=schemas.ImageUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def upload_image(
+    file: UploadFile = File(...),
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    # Read one byte past the limit so oversized uploads are detected without reading them whole
+    data = file.file.read(get_settings().image_max_bytes + 1)
+    try:
+        stored = images.store(data)
+    except images.InvalidImage as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return {"url": stored.url, "sha256": stored.sha256, "thumbnails": stored.thumbnails}
+
+
+# 2. Serve Image (Public)
+@router.get("/media/{filename}", include_in_schema=False)
+def get_image(filename: str, request: Request):
+    if not images.FILENAME_PATTERN.match(filename):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{filename.rsplit(".", 1)[0]}"'
+    headers = {"Cache-Control": IMMUTABLE_CACHE, "ETag": etag}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = images.path_for(filename)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # FileResponse streams the file in chunks (and honours Range requests)
+    extension = filename.rsplit(".", 1)[1]
+    return FileResponse(path, media_type=images.MEDIA_TYPES[extension], headers=headers)
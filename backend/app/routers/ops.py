@@ -0,0 +1,67 @@
+# backend/app/routers/ops.py
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+
+from app import admission, archive, audit, backup, database, dependencies, models, queries
+
+# Operational metrics for monitoring. These routes bypass admission control
+# so they keep answering while the API is shedding load.
+router = APIRouter(
+    prefix="/api/ops",
+    tags=["Operations"]
+)
+
+
+@router.get("/admission")
+def admission_stats():
+    return admission.get_controller().stats()
+
+
+@router.get("/audit")
+def audit_stats():
+    return audit.get_audit_log().stats()
+
+
+@router.get("/db")
+def db_stats():
+    return database.session_stats()
+
+
+@router.get("/queries")
+def query_stats():
+    return queries.stats()
+
+
+# Online backup of the database (Admin Only). Runs after the response is
+# sent; poll GET /api/ops/backup for the outcome.
+@router.post("/backup", status_code=status.HTTP_202_ACCEPTED)
+def start_backup(
+    background_tasks: BackgroundTasks,
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    if backup.is_running():
+        raise HTTPException(status_code=409, detail="A backup is already running")
+    background_tasks.add_task(backup.run_and_record)
+    return {"message": "Backup started"}
+
+
+@router.get("/backup")
+def backup_status(admin: models.User = Depends(dependencies.get_current_admin)):
+    return backup.status()
+
+
+# Archive discontinued and long out-of-stock sweets now (Admin Only),
+# instead of waiting for the background archiver. Poll GET /api/ops/archive.
+@router.post("/archive", status_code=status.HTTP_202_ACCEPTED)
+def start_archive(
+    background_tasks: BackgroundTasks,
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    if archive.is_running():
+        raise HTTPException(status_code=409, detail="The archiver is already running")
+    background_tasks.add_task(archive.run_all_stores)
+    return {"message": "Archiver started"}
+
+
+@router.get("/archive")
+def archive_status(admin: models.User = Depends(dependencies.get_current_admin)):
+    return archive.status()
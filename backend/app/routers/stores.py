@@ -0,0 +1,66 @@
+# backend/app/routers/stores.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app import inventory, models, queries, schemas, dependencies, stores
+
+# Cross-store admin reports (multi-store mode, see app/stores.py). Each query
+# runs against every store's database in parallel and the results are merged.
+router = APIRouter(
+    prefix="/api/stores",
+    tags=["Stores"]
+)
+
+
+def require_multi_store():
+    if not stores.enabled():
+        raise HTTPException(status_code=404, detail="Multi-store mode is not enabled")
+
+
+# 1. Per-Store Summary (Admin Only)
+@router.get("/", response_model=List[schemas.StoreSummary])
+def store_summaries(
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    require_multi_store()
+
+    def summarize(db: Session):
+        on_sale = db.query(models.Sweet).filter(models.Sweet.discontinued_at.is_(None)).all()
+        sweets = inventory.overlay_totals(db, on_sale)
+        return len(sweets), sum(s.quantity for s in sweets), sum(s.price * s.quantity for s in sweets)
+
+    return [
+        {"store": store, "sweets": count, "units": units, "stock_value": round(value, 2)}
+        for store, (count, units, value) in stores.fan_out(summarize).items()
+    ]
+
+
+# 2. Search Every Store (Admin Only)
+# URL: /api/stores/sweets/search?q=...&category=...&limit=...
+# Same filters as /api/sweets/search, run in each store; merged by name, then store.
+@router.get("/sweets/search", response_model=List[schemas.StoreSweet])
+def search_all_stores(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    require_multi_store()
+
+    def search(db: Session):
+        # Each store returns its own first `limit` rows; the merge keeps the overall first `limit`
+        sweets = queries.search_sweets(db, q=q, category=category, sort="name", limit=limit)
+        return [
+            schemas.SweetResponse.model_validate(sweet).model_dump()
+            for sweet in inventory.overlay_totals(db, sweets)
+        ]
+
+    merged = [
+        {**sweet, "store": store}
+        for store, found in stores.fan_out(search).items()
+        for sweet in found
+    ]
+    # The order each store sorted in (sort=name: by name, then id)
+    merged.sort(key=lambda sweet: (sweet["name"], sweet["store"], sweet["id"]))
+    return merged[:limit]
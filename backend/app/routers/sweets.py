@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
+from datetime import UTC, datetime
 from typing import List
 from typing import Optional
 
-from app import database, models, schemas, dependencies
+from app import audit, categories, changefeed, database, encoding, models, schemas, dependencies, inventory, popularity, queries, sales, suggest
+from app.config import get_settings
 
 router = APIRouter(
     prefix="/api/sweets",
@@ -19,8 +21,12 @@ def create_sweet(
 ):
     new_sweet = models.Sweet(**sweet.model_dump())
     db.add(new_sweet)
+    if inventory.enabled():
+        db.flush()
+        inventory.initialize(db, new_sweet.id, new_sweet.quantity)
     db.commit()
     db.refresh(new_sweet)
+    audit.get_audit_log().record(admin, audit.CREATE, new_sweet.id, after=audit.sweet_fields(new_sweet))
     return new_sweet
 
 # 2. Update Sweet (Admin Only)
@@ -31,17 +37,26 @@ def update_sweet(
     db: Session = Depends(database.get_db),
     admin: models.User = Depends(dependencies.get_current_admin)
 ):
-    sweet = db.query(models.Sweet).filter(models.Sweet.id == sweet_id).first()
+    sweet = queries.sweet_by_id(db, sweet_id)
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
     
     # Update fields that are provided
     update_data = sweet_update.model_dump(exclude_unset=True)
+    previous = audit.sweet_fields(inventory.overlay_totals(db, [sweet])[0], update_data)
     for key, value in update_data.items():
         setattr(sweet, key, value)
-        
+
+    if inventory.enabled() and "quantity" in update_data:
+        # An explicit quantity replaces the stock: re-split it across the slots
+        inventory.initialize(db, sweet.id, sweet.quantity)
+
     db.commit()
     db.refresh(sweet)
+    # As stored: the category is rewritten to its canonical name on flush
+    before, after = audit.diff(previous, audit.sweet_fields(inventory.overlay_totals(db, [sweet])[0], update_data))
+    if after:
+        audit.get_audit_log().record(admin, audit.UPDATE, sweet.id, before=before, after=after)
     return sweet
 
 # 3. Delete Sweet (Admin Only)
@@ -51,12 +66,16 @@ def delete_sweet(
     db: Session = Depends(database.get_db),
     admin: models.User = Depends(dependencies.get_current_admin)
 ):
-    sweet = db.query(models.Sweet).filter(models.Sweet.id == sweet_id).first()
+    sweet = queries.sweet_by_id(db, sweet_id)
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
         
-    db.delete(sweet)
+    before = audit.sweet_fields(inventory.overlay_totals(db, [sweet])[0])
+    # Discontinued, not deleted: the archiver moves it out of the table later
+    # and admins can restore it until then (see app/archive.py)
+    sweet.discontinued_at = datetime.now(UTC).replace(tzinfo=None)
     db.commit()
+    audit.get_audit_log().record(admin, audit.DELETE, sweet_id, before=before)
     return None
 
 # 4. Restock Sweet (Admin Only)
@@ -67,55 +86,106 @@ def restock_sweet(
     db: Session = Depends(database.get_db),
     admin: models.User = Depends(dependencies.get_current_admin)
 ):
-    sweet = db.query(models.Sweet).filter(models.Sweet.id == sweet_id).first()
+    sweet = queries.sweet_by_id(db, sweet_id)
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
     
     if restock.amount <= 0:
         raise HTTPException(status_code=400, detail="Restock amount must be positive")
 
-    sweet.quantity += restock.amount
+    if inventory.enabled():
+        inventory.restock(db, sweet, restock.amount)
+    else:
+        sweet.quantity += restock.amount
     db.commit()
     db.refresh(sweet)
+    audit.get_audit_log().record(
+        admin, audit.RESTOCK, sweet.id,
+        before={"quantity": sweet.quantity - restock.amount}, after={"quantity": sweet.quantity}
+    )
     return sweet
 
 
+def catalog_format(
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. id,name,price,quantity"),
+    accept: Optional[str] = Header(None),
+):
+    """Sparse fieldset and encoding of a catalog list (see app/encoding.py); None = plain JSON of everything."""
+    # Plain JSON too: a shared cache must not hand it to a msgpack client (encoding.render sets its own)
+    response.headers["Vary"] = "Accept"
+    try:
+        columns = encoding.parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    media_type = encoding.negotiate(accept)
+    if columns is None and media_type == encoding.JSON:
+        return None
+    return columns or encoding.SWEET_FIELDS, media_type
+
+
 # 5. Search Sweets (Public)
-# URL: /api/sweets/search?q=...&category=...
+# URL: /api/sweets/search?q=...&category=...&in_stock=true&sort=-price&skip=0&limit=20
+# category: an exact name (any case) or else part of one; category_id: by id.
+# sort: price, name or quantity; a leading "-" sorts descending.
+# fields=id,name,... selects fewer columns; Accept picks a compact encoding.
 @router.get("/search", response_model=List[schemas.SweetResponse])
 def search_sweets(
     q: Optional[str] = None,
     category: Optional[str] = None,
+    category_id: Optional[int] = None,
     price_min: Optional[float] = None,
     price_max: Optional[float] = None,
-    db: Session = Depends(database.get_db)
+    in_stock: Optional[bool] = None,
+    sort: Optional[str] = Query(None, pattern="^-?(price|name|quantity)$"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    output: Optional[tuple] = Depends(catalog_format),
+    db: Session = Depends(database.get_read_db)
 ):
-    query = db.query(models.Sweet)
-    
-    if q:
-        # ILIKE is case-insensitive (sqlite supports it natively or via lower())
-        query = query.filter(models.Sweet.name.ilike(f"%{q}%"))
-    
-    if category:
-        query = query.filter(models.Sweet.category.ilike(f"%{category}%"))
-        
-    if price_min is not None:
-        query = query.filter(models.Sweet.price >= price_min)
-        
-    if price_max is not None:
-        query = query.filter(models.Sweet.price <= price_max)
-        
-    return query.all()
+    if get_settings().catalog_engine == "columnar":
+        # Vectorized scan over an in-memory mirror of the catalog
+        from app import columnar
+
+        catalog = columnar.get_catalog()
+        catalog.ensure_loaded(db)
+        # Same category resolution as SQL, matched on the names the catalog holds
+        category_ids = categories.resolve(db, category, category_id)
+        names = None if category_ids is None else [categories.get_map().name(i) for i in category_ids]
+        sweets = inventory.overlay_rows(
+            db, catalog.search(q, None, price_min, price_max, in_stock, sort, skip, limit, category_names=names)
+        )
+        if output is None:
+            return sweets
+        columns, media_type = output
+        return encoding.render(encoding.select_fields(sweets, columns), columns, media_type)
+
+    # Prebuilt statement per filter combination: no query building or cache key walk per request
+    filters = dict(q=q, category=category, category_id=category_id, price_min=price_min,
+                   price_max=price_max, in_stock=in_stock, sort=sort, skip=skip, limit=limit)
+    if output is None:
+        return inventory.overlay_totals(db, queries.search_sweets(db, **filters))
+
+    # Only the requested columns are selected, as plain rows
+    columns, media_type = output
+    rows = inventory.overlay_rows(db, queries.search_rows(db, columns, **filters))
+    return encoding.render(rows, columns, media_type)
 
 # 6. List All Sweets (Public)
 @router.get("/", response_model=List[schemas.SweetResponse])
 def read_sweets(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(database.get_db)
+    output: Optional[tuple] = Depends(catalog_format),
+    db: Session = Depends(database.get_read_db)
 ):
-    sweets = db.query(models.Sweet).offset(skip).limit(limit).all()
-    return sweets
+    if output is None:
+        sweets = queries.list_sweets(db, skip, limit)
+        return inventory.overlay_totals(db, sweets)
+
+    columns, media_type = output
+    rows = inventory.overlay_rows(db, queries.list_rows(db, columns, skip, limit))
+    return encoding.render(rows, columns, media_type)
 
 
 
@@ -128,17 +198,153 @@ def purchase_sweet(
 ):
     # 1. Lock the row (Optional for SQLite, but good practice in Postgres: with_for_update())
     # For this Kata, simple retrieval is fine.
-    sweet = db.query(models.Sweet).filter(models.Sweet.id == sweet_id).first()
+    sweet = queries.sweet_by_id(db, sweet_id)
     
     if not sweet:
         raise HTTPException(status_code=404, detail="Sweet not found")
+
+    # Sharded mode: decrement one of the sweet's counter slots, not the hot row
+    if inventory.enabled():
+        remaining = inventory.purchase(db, sweet)
+        if remaining is None:
+            raise HTTPException(status_code=400, detail="Out of stock")
+        # The slots are updated with Core statements, which the change feed does not see
+        changefeed.mark_changed(db, sweet.id)
+        sales.record(db, sweet.id)
+        db.commit()
+        record_purchase(db, sweet.id)
+        return {"message": "Purchase successful", "remaining_quantity": remaining}
     
     # 2. Check Inventory
     if sweet.quantity < 1:
         raise HTTPException(status_code=400, detail="Out of stock")
     
-    # 3. Decrement & Save
+    # 3. Decrement & Save (with today's sales in the ledger the restock planner reads)
     sweet.quantity -= 1
+    sales.record(db, sweet.id)
     db.commit()
+    record_purchase(db, sweet.id)
     
-    return {"message": "Purchase successful", "remaining_quantity": sweet.quantity}
\ No newline at end of file
+    return {"message": "Purchase successful", "remaining_quantity": sweet.quantity}
+
+
+def record_purchase(db: Session, sweet_id: int):
+    # Feed the "popular right now" sketch: O(1), no extra query after the first load
+    tracker = popularity.get_tracker()
+    tracker.ensure_loaded(db)
+    tracker.record(sweet_id)
+    tracker.snapshot_if_due()
+
+
+# 8. Suggest Sweets (Public)
+# URL: /api/sweets/suggest?prefix=...&limit=...
+# Served from an in-memory prefix index, cheap enough to call on every keystroke.
+@router.get("/suggest", response_model=List[schemas.SweetSuggestion])
+def suggest_sweets(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(database.get_read_db)
+):
+    suggester = suggest.get_suggester()
+    suggester.ensure_loaded(db)
+    return suggester.suggest(prefix, limit)
+
+
+# 9. Popular Right Now (Public)
+# URL: /api/sweets/popular?limit=...
+# Read from an in-memory time-decayed sketch of purchases, not from a GROUP BY.
+@router.get("/popular", response_model=List[schemas.PopularSweet])
+def popular_sweets(
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(database.get_read_db)
+):
+    tracker = popularity.get_tracker()
+    tracker.ensure_loaded(db)
+    ranked = tracker.top(limit)
+    if not ranked:
+        return []
+
+    sweets = queries.sweets_by_ids(db, [sweet_id for sweet_id, _ in ranked])
+    by_id = {sweet.id: sweet for sweet in inventory.overlay_totals(db, sweets)}
+    return [
+        {**schemas.SweetResponse.model_validate(by_id[sweet_id]).model_dump(), "score": round(score, 3)}
+        for sweet_id, score in ranked
+        if sweet_id in by_id
+    ]
+
+
+# 10. Catalog Changes (Public)
+# URL: /api/sweets/changes?since=<version>&limit=...
+# Delta sync: only the sweets changed since the client's version. Without
+# `since`, returns the current version (read it before a full download).
+# 410 Gone when `since` is older than the feed keeps: download everything again.
+@router.get("/changes", response_model=schemas.CatalogChanges)
+def catalog_changes(
+    since: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    db: Session = Depends(database.get_read_db)
+):
+    if since is None:
+        return {"version": changefeed.current_version(db), "upserted": [], "deleted": [], "has_more": False}
+    try:
+        changes = changefeed.changes_since(db, since, limit or get_settings().changefeed_page_size)
+    except changefeed.ResyncRequired as exc:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Resync required",
+            headers={"X-Catalog-Version": str(exc.version)},
+        )
+    return changes
+
+
+# 11. Categories (Public)
+# URL: /api/sweets/categories
+# Every category with its id, for ?category_id= filters. Served from memory.
+@router.get("/categories", response_model=List[schemas.CategoryResponse])
+def read_categories(db: Session = Depends(database.get_read_db)):
+    category_map = categories.get_map()
+    category_map.ensure_loaded(db)
+    return [{"id": category_id, "name": name} for category_id, name in category_map.items()]
+
+
+# 12. Restock Plan (Admin Only)
+# URL: /api/sweets/restock-plan?limit=...
+# Suggested restock amounts from each sweet's demand over the purchase
+# ledger, most urgent first (see app/restock.py).
+@router.get("/restock-plan", response_model=schemas.RestockPlan)
+def restock_plan(
+    limit: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(database.get_read_db),
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    from app import restock
+
+    return restock.plan(db, limit)
+
+
+# 13. Apply a Restock Plan (Admin Only)
+# Body: {"items": [{"sweet_id": 1, "amount": 24}, ...]}, e.g. an edited plan;
+# without items, the current plan's suggestions. One transaction for all.
+@router.post("/restock-plan/apply", response_model=schemas.RestockPlanApplied)
+def apply_restock_plan(
+    body: Optional[schemas.RestockPlanApply] = None,
+    db: Session = Depends(database.get_db),
+    admin: models.User = Depends(dependencies.get_current_admin)
+):
+    from app import restock
+
+    if body is None or body.items is None:
+        amounts = {item["sweet_id"]: item["suggested_amount"] for item in restock.plan(db)["items"]}
+    else:
+        if any(line.amount <= 0 for line in body.items):
+            raise HTTPException(status_code=400, detail="Restock amount must be positive")
+        if len({line.sweet_id for line in body.items}) != len(body.items):
+            raise HTTPException(status_code=400, detail="Each sweet may appear only once")
+        amounts = {line.sweet_id: line.amount for line in body.items}
+
+    restocked, skipped = restock.apply(db, amounts)
+    log = audit.get_audit_log()
+    for sweet_id, before, after in restocked:
+        log.record(admin, audit.RESTOCK, sweet_id, before={"quantity": before}, after={"quantity": after})
+    return {"restocked": len(restocked), "units": sum(amounts[sweet_id] for sweet_id, _, _ in restocked),
+            "skipped": skipped}
@@ -0,0 +1,57 @@
+# backend/app/sales.py
+"""
+Purchase ledger: units sold per sweet per UTC day.
+
+Every purchase adds to its sweet's row for today (``sweet_daily_sales``,
+keyed by sweet and day) inside the purchase's own transaction, so the
+ledger never counts a rolled back sale. One row per sweet and day instead
+of one per purchase keeps a year of history for a large catalog small, and
+lets SQLite aggregate it in one indexed pass: ``demand_totals`` returns the
+units, the sum of squared daily units and the first day with sales of every
+sweet, all the restock planner needs (see app/restock.py).
+
+The planner only reads the last ``RESTOCK_HISTORY_DAYS``. The archiver (see
+app/archive.py) deletes older days once a day, and the rows of the sweets
+it archives.
+"""
+import time
+from typing import List, Tuple
+
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from . import models
+
+Sales = models.SweetDailySales
+
+
+def today() -> int:
+    """Days since 1970-01-01 (UTC)."""
+    return int(time.time() // 86400)
+
+
+def record(db: Session, sweet_id: int, units: int = 1) -> None:
+    """Adds ``units`` sold today to the ledger (in the caller's transaction)."""
+    stmt = insert(Sales).values(sweet_id=sweet_id, day=today(), units=units)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[Sales.sweet_id, Sales.day],
+        set_={"units": Sales.units + stmt.excluded.units},
+    ))
+
+
+def demand_totals(db: Session, since_day: int) -> List[Tuple[int, int, int, int]]:
+    """(sweet_id, units, sum of squared daily units, first day) per sweet with sales since ``since_day``."""
+    return db.execute(
+        select(Sales.sweet_id, func.sum(Sales.units), func.sum(Sales.units * Sales.units), func.min(Sales.day))
+        .where(Sales.day >= since_day)
+        .group_by(Sales.sweet_id)
+        .order_by(Sales.sweet_id)
+    ).all()
+
+
+def prune(db: Session, before_day: int, batch_size: int) -> int:
+    """Deletes up to ``batch_size`` ledger rows older than ``before_day``; the caller commits."""
+    rowid = literal_column("rowid")
+    old = select(rowid).select_from(Sales.__table__).where(Sales.day < before_day).limit(batch_size)
+    return db.connection().execute(delete(Sales.__table__).where(rowid.in_(old.scalar_subquery()))).rowcount
@@ -1,6 +1,7 @@
 # backend/app/schemas.py
 from pydantic import BaseModel, EmailStr, ConfigDict # <-- Import ConfigDict
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 # Base schema for shared data
 class UserBase(BaseModel):
     email: EmailStr
@@ -25,6 +26,16 @@ class UserResponse(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
 
 
 
@@ -56,4 +67,99 @@ class SweetResponse(SweetBase):
 
 # Add to backend/app/schemas.py
 class SweetRestock(BaseModel):
-    amount: int
\ No newline at end of file
+    amount: int
+
+
+class CategoryResponse(BaseModel):
+    id: int      # use as ?category_id= in searches
+    name: str
+
+
+class SweetSuggestion(BaseModel):
+    text: str
+    kind: str   # "name" or "category"
+    score: int  # Units in stock behind this suggestion
+
+
+class PopularSweet(SweetResponse):
+    score: float  # Recent purchases, each counting half as much per half-life of age
+
+
+class CatalogChanges(BaseModel):
+    version: int                   # pass as ?since= next time
+    upserted: List[SweetResponse]  # current state of sweets created or changed since
+    deleted: List[int]             # ids of sweets deleted since
+    has_more: bool                 # more changes after `version`: ask again right away
+
+
+class ArchivedSweetResponse(SweetBase):
+    sweet_id: int
+    reason: str                 # "discontinued" or "out_of_stock"
+    archived_at: datetime
+    discontinued_at: Optional[datetime] = None
+    out_of_stock_since: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ImageUploadResponse(BaseModel):
+    url: str                    # use as Sweet.image_url
+    sha256: str
+    thumbnails: Dict[int, str]  # longest side in px -> url
+
+
+class AuditEntryResponse(BaseModel):
+    id: int
+    created_at: datetime
+    actor_id: int
+    actor_email: str
+    action: str
+    sweet_id: int
+    before: Optional[Dict[str, Any]] = None
+    after: Optional[Dict[str, Any]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StoreSummary(BaseModel):
+    store: str
+    sweets: int
+    units: int          # items in stock
+    stock_value: float  # sum of price * quantity
+
+
+class StoreSweet(SweetResponse):
+    store: str
+
+
+class RestockPlanItem(BaseModel):
+    sweet_id: int
+    name: str
+    quantity: int            # on hand
+    daily_demand: float      # units per day over the history window
+    reorder_point: int       # restock at or below this
+    suggested_amount: int    # brings the stock up to the order-up-to level
+    days_of_stock: float     # left at the current demand
+
+
+class RestockPlan(BaseModel):
+    history_days: int
+    lead_time_days: float
+    cover_days: float
+    sweets_considered: int
+    items: List[RestockPlanItem]  # most urgent first
+
+
+class RestockLine(BaseModel):
+    sweet_id: int
+    amount: int
+
+
+class RestockPlanApply(BaseModel):
+    items: Optional[List[RestockLine]] = None  # None: apply the current plan's suggestions
+
+
+class RestockPlanApplied(BaseModel):
+    restocked: int
+    units: int
+    skipped: List[int]  # not found or discontinued
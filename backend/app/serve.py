@@ -0,0 +1,73 @@
+# backend/app/serve.py
+"""
+Production entry point: ``python -m app.serve``.
+
+Runs uvicorn with one worker process per available CPU (respecting CPU
+affinity and the container's cgroup CPU quota), unless WEB_CONCURRENCY or
+--workers says otherwise.
+
+- Each worker creates its own engine after it starts (see database.get_engine),
+  and SQLite is opened in WAL mode with a busy timeout so several worker
+  processes can write to the same file.
+- In-memory indexes (autocomplete, columnar search) are per worker; each
+  follows the others' writes through the change feed every
+  CATALOG_SYNC_SECONDS (see changefeed.Follower).
+- SIGHUP to the supervisor restarts workers one by one (graceful reload).
+- SIGTERM/SIGINT stop accepting connections, let in-flight requests finish
+  for up to GRACEFUL_TIMEOUT seconds, then close DB connections.
+"""
+import argparse
+import math
+import os
+
+import uvicorn
+
+from .config import get_settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may actually use."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+
+    # Container CPU quota (cgroup v2), e.g. "200000 100000" means 2 CPUs
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+
+    return max(cpus, 1)
+
+
+def default_workers() -> int:
+    return get_settings().web_concurrency or available_cpus()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Sweet Shop API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per available CPU")
+    parser.add_argument("--reload", action="store_true", help="development auto-reload (single worker)")
+    args = parser.parse_args(argv)
+
+    workers = 1 if args.reload else (args.workers or default_workers())
+    print(f"--> Starting Sweet Shop API on {args.host}:{args.port} with {workers} worker(s)")
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        reload=args.reload,
+        timeout_graceful_shutdown=get_settings().graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# backend/app/stores.py
+"""
+Multi-store mode: one database per shop location, routed per request.
+
+With a single database every shop shares one file and (on SQLite) one write
+lock. Setting ``STORE_DATABASE_URL`` to a template such as
+``sqlite:///./stores/{store}.db`` together with ``STORE_IDS`` gives every
+store its own database:
+
+- A request names its store with an ``X-Store-Id`` header or a
+  ``/stores/{store}`` path prefix (``/stores/north/api/sweets`` is
+  ``/api/sweets`` of store "north"). ``StoreMiddleware`` puts it in a context
+  variable, and ``database.get_engine()`` hands out that store's engine, so
+  routes and components opening their own sessions need no changes.
+  Requests without a store use ``DATABASE_URL`` as before.
+- Engines are created on first use and kept in a small registry: at most
+  ``STORE_MAX_ENGINES`` stay open, and one idle for longer than
+  ``STORE_ENGINE_IDLE_SECONDS`` is disposed when another store is opened.
+- In-memory indexes (suggester, columnar catalog, popularity) keep one
+  instance per store through ``PerStore``.
+- ``fan_out`` runs a query against every store in parallel, for cross-store
+  admin reports (see app/routers/stores.py).
+- Migrations: ``alembic -x store=<id> upgrade head`` migrates one store,
+  ``python scripts/migrate_stores.py`` all of them.
+"""
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from .config import get_settings
+
+HEADER = b"x-store-id"
+PATH_PREFIX = "/stores/"
+STORE_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+_current: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("store", default=None)
+
+
+def enabled() -> bool:
+    return bool(get_settings().store_database_url)
+
+
+def configured_stores() -> List[str]:
+    return list(get_settings().store_ids)
+
+
+def is_known(store: str) -> bool:
+    return bool(STORE_ID_PATTERN.match(store)) and store in get_settings().store_ids
+
+
+def store_url(store: str) -> str:
+    return get_settings().store_database_url.format(store=store)
+
+
+def current_store() -> Optional[str]:
+    """The store of the request (or ``use_store`` block) being served, if any."""
+    return _current.get()
+
+
+@contextmanager
+def use_store(store: Optional[str]):
+    token = _current.set(store)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+# --- Engines ---
+
+class EngineRegistry:
+    """Per-store engines, created lazily; idle and least recently used ones are disposed."""
+
+    def __init__(self, max_engines: int, idle_seconds: float):
+        self.max_engines = max_engines
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        # store -> [engine, last used (monotonic)], least recently used first
+        self._engines: "OrderedDict[str, list]" = OrderedDict()
+        self._pid = os.getpid()
+
+    def get(self, store: str):
+        from .database import _create_engine
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Inherited across fork: forget the parent's connections without closing them
+                for engine, _ in self._engines.values():
+                    engine.dispose(close=False)
+                self._engines.clear()
+                self._pid = os.getpid()
+
+            now = time.monotonic()
+            entry = self._engines.get(store)
+            if entry is not None:
+                entry[1] = now
+                self._engines.move_to_end(store)
+                return entry[0]
+
+            engine = _create_engine(store_url(store))
+            self._engines[store] = [engine, now]
+            self._evict(now)
+            return engine
+
+    def _evict(self, now: float) -> None:
+        # Disposing only drops pooled connections; sessions still using one finish normally
+        for store, (engine, last_used) in list(self._engines.items())[:-1]:
+            if len(self._engines) > self.max_engines or now - last_used > self.idle_seconds:
+                engine.dispose()
+                del self._engines[store]
+
+    def open_stores(self) -> List[str]:
+        with self._lock:
+            return list(self._engines)
+
+    def dispose_all(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                for engine, _ in self._engines.values():
+                    engine.dispose()
+            self._engines.clear()
+
+
+_registry: Optional[EngineRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> EngineRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                settings = get_settings()
+                _registry = EngineRegistry(settings.store_max_engines, settings.store_engine_idle_seconds)
+    return _registry
+
+
+def dispose_engines() -> None:
+    """Shutdown hook: closes every open store engine."""
+    if _registry is not None:
+        _registry.dispose_all()
+
+
+# --- Per-store in-memory state ---
+
+class PerStore:
+    """One instance of ``factory()`` per store, plus one for requests without a store."""
+
+    def __init__(self, factory: Callable[[], Any], default: Any = None):
+        self._factory = factory
+        self._default = default
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def peek(self) -> Any:
+        """The current store's instance, or None if it was never created."""
+        store = current_store()
+        return self._default if store is None else self._instances.get(store)
+
+    def get(self) -> Any:
+        instance = self.peek()
+        if instance is not None:
+            return instance
+        store = current_store()
+        with self._lock:
+            if store is None:
+                if self._default is None:
+                    self._default = self._factory()
+                return self._default
+            if store not in self._instances:
+                self._instances[store] = self._factory()
+            return self._instances[store]
+
+    def items(self) -> List[Tuple[Optional[str], Any]]:
+        with self._lock:
+            pairs = [(None, self._default)] if self._default is not None else []
+            return pairs + list(self._instances.items())
+
+
+# --- Cross-store queries ---
+
+def fan_out(query: Callable, store_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Runs ``query(db)`` against every store in parallel, each with a session
+    of its own. Returns {store: result} in store order.
+    """
+    from . import database
+
+    ids = list(configured_stores() if store_ids is None else store_ids)
+    if not ids:
+        return {}
+
+    def run(store):
+        with use_store(store):
+            db = database.SessionLocal()
+            try:
+                return query(db)
+            finally:
+                db.close()
+
+    workers = min(len(ids), get_settings().store_fan_out_workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="store-fan-out") as pool:
+        return dict(zip(ids, pool.map(run, ids)))
+
+
+# --- Middleware ---
+
+class StoreMiddleware:
+    """Pure ASGI middleware selecting the store from the path prefix or header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled():
+            return await self.app(scope, receive, send)
+
+        store = None
+        path = scope["path"]
+        if path.startswith(PATH_PREFIX):
+            store, _, rest = path[len(PATH_PREFIX):].partition("/")
+            scope = dict(scope, path="/" + rest, raw_path=("/" + rest).encode())
+        else:
+            for name, value in scope["headers"]:
+                if name == HEADER:
+                    store = value.decode("latin-1")
+                    break
+
+        if store is None:
+            return await self.app(scope, receive, send)
+        if not is_known(store):
+            response = JSONResponse(status_code=404, content={"detail": "Unknown store"})
+            return await response(scope, receive, send)
+
+        with use_store(store):
+            await self.app(scope, receive, send)
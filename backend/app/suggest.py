@@ -0,0 +1,279 @@
+# backend/app/suggest.py
+"""
+In-memory prefix suggester for search-as-you-type.
+
+Names and categories are normalized (case-folded, accents stripped) and every
+word start is stored in one sorted array of keys, so a keystroke is a binary
+search plus a scan of the matching range instead of an ``ilike`` table scan.
+Each suggestion is weighted by the stock it represents.
+
+The index is loaded from the database on first use and then patched through
+``catalog_events`` after every committed sweet change, and from the change
+feed for changes committed by other worker processes.
+"""
+import bisect
+import heapq
+import sys
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import catalog_events, changefeed, inventory, models, stores
+
+NAME = "name"
+CATEGORY = "category"
+
+# Sorts after every character a normalized prefix can contain
+_PREFIX_END = "\U0010ffff"
+
+# Prefixes matching more than HOT_RANGE keys (one or two letters, common
+# words) keep their top HOT_LIMIT entries cached for up to HOT_TTL seconds
+HOT_RANGE = 1000
+HOT_LIMIT = 50
+HOT_TTL = 5.0
+HOT_MAX_PREFIXES = 4096
+
+
+def normalize(text: str) -> str:
+    """Case-folds, strips accents and collapses whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def _word_starts(normalized: str) -> List[str]:
+    """'dark chocolate bar' -> ['dark chocolate bar', 'chocolate bar', 'bar']"""
+    keys = [normalized]
+    for i, ch in enumerate(normalized):
+        if ch == " ":
+            keys.append(normalized[i + 1:])
+    return keys
+
+
+def _rank(entry: "_Entry"):
+    return (-entry.weight, entry.text.casefold(), entry.kind)
+
+
+class _Entry:
+    """One suggestion: a distinct normalized name or category."""
+    __slots__ = ("text", "kind", "weight", "count", "keys")
+
+    def __init__(self, text: str, kind: str, keys: List[str]):
+        self.text = text
+        self.kind = kind
+        self.weight = 0
+        self.count = 0
+        self.keys = keys
+
+
+class Suggester:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Parallel sorted arrays: word-start keys and the entry each belongs to
+        self._keys: List[str] = []
+        self._refs: List[_Entry] = []
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        # sweet_id -> (name key, category key, weight) of what the sweet contributed
+        self._sweets: Dict[int, Tuple[str, str, int]] = {}
+        # prefix -> (computed_at, top HOT_LIMIT entries)
+        self._hot: Dict[str, Tuple[float, List[_Entry]]] = {}
+        self._follower = changefeed.Follower()
+        self.loaded = False
+
+    # --- Loading ---
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self.loaded and self._follower.catch_up(db, self.apply_changes):
+            return
+        # Read first: changes committed while the rows load are applied again on the next catch-up
+        version = changefeed.current_version(db)
+        rows = db.query(
+            models.Sweet.id, models.Sweet.name, models.Sweet.category, models.Sweet.quantity
+        ).filter(models.Sweet.discontinued_at.is_(None)).all()
+        self.load(inventory.overlay_loaded(db, rows, 3))
+        self._follower.follow_from(version)
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        """Builds the index from (id, name, category, quantity) rows in one sort."""
+        with self._lock:
+            self._entries = {}
+            self._sweets = {}
+            for sweet_id, name, category, quantity in rows:
+                self._contribute(sweet_id, name, category, quantity)
+
+            pairs = sorted(
+                ((key, entry) for entry in self._entries.values() for key in entry.keys),
+                key=lambda pair: pair[0],
+            )
+            self._keys = [key for key, _ in pairs]
+            self._refs = [entry for _, entry in pairs]
+            self._hot = {}
+            self.loaded = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._keys, self._refs = [], []
+            self._entries, self._sweets, self._hot = {}, {}, {}
+            self._follower.reset()
+            self.loaded = False
+
+    # --- Incremental maintenance ---
+
+    def apply_changes(self, upserted: List[dict], deleted: List[int]) -> None:
+        """catalog_events listener: patches the index without a rebuild."""
+        with self._lock:
+            if not self.loaded:
+                # Nothing to patch; the first load reads the committed state anyway
+                return
+            for sweet_id in deleted:
+                self._withdraw(sweet_id)
+            for row in upserted:
+                previous = self._sweets.get(row["id"])
+                name_key, category_key = normalize(row["name"] or ""), normalize(row["category"] or "")
+                if previous and previous[:2] == (name_key, category_key):
+                    # Stock-only change (purchase, restock): reweigh in place
+                    self._reweigh(row["id"], max(row["quantity"] or 0, 0))
+                    continue
+                self._withdraw(row["id"])
+                entries = self._contribute(row["id"], row["name"], row["category"], row["quantity"])
+                for entry in entries:
+                    if entry.count == 1:
+                        self._insert_keys(entry)
+
+    def _reweigh(self, sweet_id: int, weight: int) -> None:
+        name_key, category_key, previous_weight = self._sweets[sweet_id]
+        for kind, key in ((NAME, name_key), (CATEGORY, category_key)):
+            entry = self._entries.get((kind, key))
+            if entry is not None:
+                entry.weight += weight - previous_weight
+        self._sweets[sweet_id] = (name_key, category_key, weight)
+
+    def _contribute(self, sweet_id, name, category, quantity) -> List[_Entry]:
+        weight = max(quantity or 0, 0)
+        touched = []
+        keys = []
+        for kind, text in ((NAME, name), (CATEGORY, category)):
+            key = normalize(text or "")
+            keys.append(key)
+            if not key:
+                continue
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                entry = _Entry(text, kind, _word_starts(key))
+                self._entries[(kind, key)] = entry
+            entry.weight += weight
+            entry.count += 1
+            touched.append(entry)
+        self._sweets[sweet_id] = (keys[0], keys[1], weight)
+        return touched
+
+    def _withdraw(self, sweet_id: int) -> None:
+        previous = self._sweets.pop(sweet_id, None)
+        if previous is None:
+            return
+        name_key, category_key, weight = previous
+        for kind, key in ((NAME, name_key), (CATEGORY, category_key)):
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                continue
+            entry.weight -= weight
+            entry.count -= 1
+            if entry.count == 0:
+                del self._entries[(kind, key)]
+                self._remove_keys(entry)
+
+    def _insert_keys(self, entry: _Entry) -> None:
+        self._invalidate_hot(entry)
+        for key in entry.keys:
+            i = bisect.bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._refs.insert(i, entry)
+
+    def _remove_keys(self, entry: _Entry) -> None:
+        self._invalidate_hot(entry)
+        for key in entry.keys:
+            i = bisect.bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                if self._refs[i] is entry:
+                    del self._keys[i]
+                    del self._refs[i]
+                    break
+                i += 1
+
+    # --- Queries ---
+
+    def _invalidate_hot(self, entry: _Entry) -> None:
+        if not self._hot:
+            return
+        for key in entry.keys:
+            for length in range(1, len(key) + 1):
+                self._hot.pop(key[:length], None)
+
+    def _top(self, lo: int, hi: int, limit: int) -> List[_Entry]:
+        matches = {id(entry): entry for entry in self._refs[lo:hi]}.values()
+        return heapq.nsmallest(limit, matches, key=_rank)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Returns up to ``limit`` names/categories starting with ``prefix``, heaviest first."""
+        key = normalize(prefix)
+        if not key:
+            return []
+        with self._lock:
+            now = time.monotonic()
+            cached = self._hot.get(key)
+            if cached is not None and now - cached[0] <= HOT_TTL and limit <= HOT_LIMIT:
+                # Added/removed entries drop the cache at once; pure weight
+                # changes are re-ranked here and picked up fully after HOT_TTL
+                best = sorted(cached[1], key=_rank)[:limit]
+            else:
+                lo = bisect.bisect_left(self._keys, key)
+                hi = bisect.bisect_left(self._keys, key + _PREFIX_END, lo)
+                if hi - lo > HOT_RANGE and limit <= HOT_LIMIT:
+                    top = self._top(lo, hi, HOT_LIMIT)
+                    if len(self._hot) >= HOT_MAX_PREFIXES:
+                        self._hot.pop(next(iter(self._hot)))
+                    self._hot[key] = (now, top)
+                    best = top[:limit]
+                else:
+                    best = self._top(lo, hi, limit)
+            return [{"text": e.text, "kind": e.kind, "score": e.weight} for e in best]
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "sweets": len(self._sweets),
+            "entries": len(self._entries),
+            "keys": len(self._keys),
+            "memory_bytes": self.memory_bytes(),
+        }
+
+    def memory_bytes(self) -> int:
+        """Approximate heap footprint of the index structures."""
+        with self._lock:
+            size = sys.getsizeof(self._keys) + sys.getsizeof(self._refs)
+            size += sum(sys.getsizeof(key) for key in self._keys)
+            size += sys.getsizeof(self._entries) + sys.getsizeof(self._sweets)
+            for entry in self._entries.values():
+                # Full-text keys are shared with the sorted array, count them once
+                size += sys.getsizeof(entry) + sys.getsizeof(entry.keys)
+            size += len(self._sweets) * sys.getsizeof((0, "", 0))
+            return size
+
+
+suggester = Suggester()
+# One index per store in multi-store mode; `suggester` serves requests without one
+_suggesters = stores.PerStore(Suggester, default=suggester)
+
+
+def get_suggester() -> Suggester:
+    return _suggesters.get()
+
+
+@catalog_events.subscribe
+def _apply_changes(upserted: List[dict], deleted: List[int]) -> None:
+    index = _suggesters.peek()
+    if index is not None:
+        index.apply_changes(upserted, deleted)
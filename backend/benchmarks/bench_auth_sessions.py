@@ -0,0 +1,100 @@
+# backend/benchmarks/bench_auth_sessions.py
+"""
+Server CPU spent keeping users signed in: re-login vs refresh tokens.
+
+Measures the CPU time (process time, not wall time) of one
+``POST /api/auth/login`` and one ``POST /api/auth/refresh`` through the
+full app stack on a temporary SQLite file, then applies them to a session
+pattern: a user stays active for ``--session-hours``, and the client must
+renew its access token every ACCESS_TOKEN_EXPIRE_MINUTES.
+
+- before: every renewal is a login (bcrypt verify)
+- after:  one login, then refreshes (SHA-256 lookup + rotation)
+
+Run from the 'backend' folder (same .env as the app):
+    python -m benchmarks.bench_auth_sessions --session-hours 8 --samples 30
+"""
+import argparse
+import math
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.config import get_settings
+from app.database import Base
+from app.main import app
+
+FORM = {"content-type": "application/x-www-form-urlencoded"}
+
+
+def cpu_ms(call) -> float:
+    start = time.process_time()
+    call()
+    return (time.process_time() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--session-hours", type=float, default=8.0)
+    parser.add_argument("--users", type=int, default=1000, help="daily active users, for the totals")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'auth.db')}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(bind=engine)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[database.get_db] = override_get_db
+        try:
+            with TestClient(app) as client:
+                client.post("/api/auth/register", json={"email": "bench@test.com", "password": "hunter22"})
+                credentials = {"username": "bench@test.com", "password": "hunter22"}
+
+                def do_login():
+                    assert client.post("/api/auth/login", data=credentials, headers=FORM).status_code == 200
+
+                refresh_token = client.post("/api/auth/login", data=credentials, headers=FORM).json()["refresh_token"]
+
+                def do_refresh():
+                    nonlocal refresh_token
+                    response = client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+                    assert response.status_code == 200
+                    refresh_token = response.json()["refresh_token"]
+
+                login_ms = statistics.median(cpu_ms(do_login) for _ in range(args.samples))
+                refresh_ms = statistics.median(cpu_ms(do_refresh) for _ in range(args.samples))
+        finally:
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+    expire_minutes = get_settings().access_token_expire_minutes
+    renewals = max(1, math.ceil(args.session_hours * 60 / expire_minutes))
+    before = renewals * login_ms
+    after = login_ms + (renewals - 1) * refresh_ms
+
+    print(f"CPU per request (median of {args.samples}): login {login_ms:.2f} ms, refresh {refresh_ms:.2f} ms "
+          f"({login_ms / refresh_ms:.0f}x cheaper)")
+    print(f"session: {args.session_hours:g} h with {expire_minutes} min access tokens = {renewals} token renewals")
+    print(f"  re-login every time:  {before:8.1f} ms CPU per user-session")
+    print(f"  login + refreshes:    {after:8.1f} ms CPU per user-session "
+          f"({100 * (1 - after / before):.0f}% less)")
+    print(f"  for {args.users:,} daily users: {before * args.users / 1000:.0f} s -> "
+          f"{after * args.users / 1000:.0f} s of server CPU per day")
+
+
+if __name__ == "__main__":
+    main()
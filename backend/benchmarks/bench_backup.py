@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_backup.py
+"""
+Write latency while an online backup runs.
+
+A writer thread buys random sweets (``UPDATE ... SET quantity = quantity - 1``,
+one transaction each) on a generated catalog in WAL mode, the way the app
+configures file databases. Its commit latency is measured in three phases:
+
+- idle:    no backup running
+- stepped: backups back to back, BACKUP_PAGES_PER_STEP pages per step
+- one-step: backups back to back, whole file in one step (pages=-1)
+
+Run from the 'backend' folder (same .env as the app):
+    python -m benchmarks.bench_backup --sweets 200000 --duration 5 --pages 256
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from app import backup
+from benchmarks.datagen import DatasetSpec, build
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000 if values else 0.0
+
+
+def measure(path: str, sweets: int, duration: float, backup_pages=None, sleep_ms: float = 5.0, dest=None):
+    latencies = []
+    backups = {"count": 0, "restarts": 0, "seconds": []}
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        rng = random.Random(7)
+        while not stop.is_set():
+            start = time.perf_counter()
+            conn.execute("UPDATE sweets SET quantity = quantity - 1 WHERE id = ?", (rng.randint(1, sweets),))
+            conn.commit()
+            latencies.append(time.perf_counter() - start)
+
+    def backer():
+        while not stop.is_set():
+            result = backup.copy_database(path, dest, backup_pages, sleep_ms / 1000)
+            backups["count"] += 1
+            backups["restarts"] += result.restarts
+            backups["seconds"].append(result.seconds)
+            os.remove(dest)
+
+    threads = [threading.Thread(target=writer)]
+    if backup_pages is not None:
+        threads.append(threading.Thread(target=backer))
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    return {
+        "writes_per_s": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "backups": backups["count"],
+        "restarts": backups["restarts"],
+        "backup_s": statistics.median(backups["seconds"]) if backups["seconds"] else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sweets", type=int, default=100_000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--pages", type=int, default=256, help="pages per backup step")
+    parser.add_argument("--sleep-ms", type=float, default=5.0, help="pause between steps")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "live.db")
+        build(path, DatasetSpec(sweets=args.sweets, users=10))
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+        size_mb = os.path.getsize(path) / 1e6
+        dest = os.path.join(tmp, "copy.db")
+
+        print(f"{args.sweets:,} sweets ({size_mb:.0f} MB), {args.duration:g}s per phase, "
+              f"{args.pages} pages/step, {args.sleep_ms:g} ms between steps")
+        print(f"{'phase':>9} {'writes/s':>9} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} "
+              f"{'backups':>8} {'restarts':>9} {'backup s':>9}")
+        for name, pages in (("idle", None), ("stepped", args.pages), ("one-step", -1)):
+            r = measure(path, args.sweets, args.duration, pages, args.sleep_ms, dest)
+            print(f"{name:>9} {r['writes_per_s']:>9.0f} {r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} "
+                  f"{r['max_ms']:>7.2f} {r['backups']:>8} {r['restarts']:>9} {r['backup_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_catalog_engine.py
+"""
+Search latency of the SQL engine vs the columnar (NumPy) engine.
+
+Both engines answer the same filter mix over the same synthetic catalog the
+way GET /api/sweets/search runs them: the SQL one with the app's prebuilt
+statements (app/queries.py) against a temporary SQLite file, the columnar one
+from memory. Both resolve a category filter to category ids first.
+
+Run from the 'backend' folder (needs numpy):
+    python -m benchmarks.bench_catalog_engine --sweets 1000000
+
+1M sweets (the default) is the catalog size the columnar engine targets;
+pass a smaller ``--sweets`` for a quick run.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import categories, models, queries
+from app.columnar import ColumnarCatalog
+from app.database import Base
+from benchmarks.bench_suggest import make_rows, percentile
+
+QUERIES = [
+    {"price_min": 2.0, "price_max": 2.5},
+    {"category": "gum", "in_stock": True},
+    {"price_max": 1.0, "sort": "-quantity", "limit": 20},
+    {"q": "truffle 99"},
+    {"category": "mint", "price_min": 4.0, "sort": "price", "limit": 50},
+]
+
+
+def columnar_search(db, catalog, category=None, **filters):
+    """Same category resolution as routers.sweets.search_sweets (columnar engine)."""
+    category_ids = categories.resolve(db, category)
+    names = None if category_ids is None else [categories.get_map().name(i) for i in category_ids]
+    return catalog.search(category_names=names, **filters)
+
+
+def time_queries(run, repeat):
+    results = {}
+    for params in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = len(run(**params))
+            samples.append((time.perf_counter() - start) * 1000)
+        results[repr(params)] = (count, samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sweets", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    rows = [
+        (sweet_id, name, category, round(rng.uniform(0.1, 5.0), 2), quantity, None)
+        for sweet_id, name, category, quantity in make_rows(args.sweets)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(models.Sweet), [
+                {"id": i, "name": n, "category": c, "price": p, "quantity": q, "image_url": u}
+                for i, n, c, p, q, u in rows
+            ])
+            # Bulk rows skip the ORM hook that links categories
+            categories.link_all(conn)
+        db = sessionmaker(bind=engine)()
+
+        catalog = ColumnarCatalog()
+        start = time.perf_counter()
+        catalog.load(rows)
+        print(f"catalog: {args.sweets:,} sweets, columnar load {time.perf_counter() - start:.2f} s, "
+              f"{catalog.stats()['array_bytes'] / 1024 / 1024:.1f} MiB of arrays")
+        catalog.search(q="warm-up", sort="name")  # builds the name blob and rank once
+
+        sql = time_queries(lambda **p: queries.search_sweets(db, **p), args.repeat)
+        columnar = time_queries(lambda **p: columnar_search(db, catalog, **p), args.repeat)
+        db.close()
+        engine.dispose()
+
+    print(f"{'query':<70} {'rows':>8} {'sql p50':>10} {'columnar p50':>13} {'speedup':>8}")
+    for key, (count, sql_samples) in sql.items():
+        col_count, col_samples = columnar[key]
+        assert count == col_count, f"engines disagree on {key}: {count} vs {col_count}"
+        sql_ms, col_ms = statistics.median(sql_samples), statistics.median(col_samples)
+        print(f"{key:<70} {count:>8,} {sql_ms:>8.1f}ms {col_ms:>11.1f}ms {sql_ms / col_ms:>7.1f}x")
+    print(f"p99 over all queries: sql {percentile([s for _, v in sql.values() for s in v], 99):.1f} ms, "
+          f"columnar {percentile([s for _, v in columnar.values() for s in v], 99):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
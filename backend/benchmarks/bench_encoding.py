@@ -0,0 +1,92 @@
+# backend/benchmarks/bench_encoding.py
+"""
+Payload size and encode time of catalog list responses.
+
+- current:        every field, validated through SweetResponse and serialized
+                  the way FastAPI does for a response_model
+- sparse json:    ?fields=id,name,price,quantity
+- columns json:   the same fields, Accept: application/vnd.sweetshop.columns+json
+- msgpack:        the same fields, Accept: application/msgpack (if installed)
+
+Rows are synthetic sweets with image URLs of realistic length. Sizes are
+shown raw and gzipped (what most clients actually download).
+
+Run from the 'backend' folder:
+    python -m benchmarks.bench_encoding --rows 1000
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app import encoding, schemas
+from benchmarks.bench_suggest import make_rows
+
+GRID_FIELDS = encoding.parse_fields("id,name,price,quantity")
+
+
+def sample_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": sweet_id,
+            "name": name,
+            "category": category,
+            "price": round(0.5 + (sweet_id % 97) / 10, 2),
+            "quantity": quantity,
+            "image_url": f"/media/images/{sweet_id:08x}{'0' * 56}.webp",
+        }
+        for sweet_id, name, category, quantity in make_rows(count)
+    ]
+
+
+def current_json(rows) -> bytes:
+    adapter = TypeAdapter(List[schemas.SweetResponse])
+    content = jsonable_encoder(adapter.dump_python(adapter.validate_python(rows)))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def time_ms(call, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return body, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = sample_rows(args.rows)
+    grid_rows = encoding.select_fields(rows, GRID_FIELDS)
+    cases = {
+        "current": lambda: current_json(rows),
+        "sparse json": lambda: encoding.encode(grid_rows, GRID_FIELDS, encoding.JSON),
+        "columns json": lambda: encoding.encode(grid_rows, GRID_FIELDS, encoding.COLUMNS_JSON),
+    }
+    if encoding._msgpack() is not None:
+        cases["msgpack"] = lambda: encoding.encode(grid_rows, GRID_FIELDS, encoding.MSGPACK)
+    else:
+        print("msgpack not installed: skipping the MessagePack encoding")
+
+    print(f"{args.rows:,} sweets, median of {args.repeat} encodes")
+    print(f"  {'encoding':14s} {'bytes':>10s} {'gzipped':>10s} {'encode ms':>10s}")
+    baseline = None
+    for name, call in cases.items():
+        body, ms = time_ms(call, args.repeat)
+        size = len(body)
+        baseline = baseline or size
+        print(f"  {name:14s} {size:10,d} {len(gzip.compress(body)):10,d} {ms:10.2f}"
+              f"   ({100 * size / baseline:.0f}% of current)")
+
+
+if __name__ == "__main__":
+    main()
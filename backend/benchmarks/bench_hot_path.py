@@ -0,0 +1,129 @@
+# backend/benchmarks/bench_hot_path.py
+"""
+Microbenchmarks of the per-request building blocks, to catch regressions.
+
+- tokens:    create_access_token, jwt.decode
+- passwords: verify_password at the cost the hashes were created with
+- responses: SweetResponse validation + JSON serialization, 1 and 1000 rows,
+             the way FastAPI serializes a response_model
+- get_current_user against the seeded dataset (see benchmarks/conftest.py)
+- queries:   each router's statement construction + cache key, no execution
+
+A pytest module for pytest-benchmark, not a script. Run from the 'backend'
+folder (same .env as the app):
+    pytest benchmarks/bench_hot_path.py --benchmark-json=hot_path.json
+
+Save a baseline, then compare later runs against it and fail when a median
+got slower than the threshold:
+    pytest benchmarks/bench_hot_path.py --benchmark-save=baseline
+    pytest benchmarks/bench_hot_path.py --benchmark-compare --benchmark-compare-fail=median:15%
+
+Baselines are kept under .benchmarks/ per machine and Python version: only
+compare runs from the same machine.
+"""
+import json
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app import auth, categories, dependencies, models, queries, schemas
+from app.config import get_settings
+from benchmarks.bench_encoding import sample_rows
+from benchmarks.datagen import USER_PASSWORD
+
+pytest.importorskip("pytest_benchmark")
+
+EMAIL = "admin@example.com"  # user 1 of every generated dataset
+SWEETS = TypeAdapter(List[schemas.SweetResponse])
+
+
+# --- Tokens and passwords ---
+
+def test_create_access_token(benchmark):
+    token = benchmark(auth.create_access_token, {"sub": EMAIL})
+    assert token.count(".") == 2
+
+
+def test_decode_access_token(benchmark):
+    from jose import jwt
+
+    settings = get_settings()
+    token = auth.create_access_token({"sub": EMAIL})
+    payload = benchmark(jwt.decode, token, settings.secret_key, algorithms=[settings.algorithm])
+    assert payload["sub"] == EMAIL
+
+
+def test_verify_password(benchmark, dataset_db):
+    hashed = queries.user_by_email(dataset_db, EMAIL).hashed_password
+    # bcrypt is deliberately slow: a few rounds are enough
+    assert benchmark.pedantic(auth.verify_password, args=(USER_PASSWORD, hashed), rounds=5, iterations=1)
+
+
+def test_get_current_user(benchmark, dataset_db):
+    token = auth.create_access_token({"sub": EMAIL})
+    user = benchmark(dependencies.get_current_user, token, dataset_db)
+    assert user.email == EMAIL
+
+
+# --- Responses ---
+
+@pytest.mark.parametrize("rows", [1, 1000])
+def test_sweet_response_serialization(benchmark, rows):
+    # ORM objects, as the routes return them
+    sweets = [models.Sweet(**row) for row in sample_rows(rows)]
+
+    def serialize():
+        return json.dumps(SWEETS.dump_python(SWEETS.validate_python(sweets), mode="json"))
+
+    assert len(json.loads(benchmark(serialize))) == rows
+
+
+# --- Query construction per router ---
+
+def audit_list(db):
+    # As routers/audit.py builds it
+    query = db.query(models.AuditEntry)
+    query = query.filter(models.AuditEntry.sweet_id == 42).filter(models.AuditEntry.action == "update")
+    return query.order_by(models.AuditEntry.id.desc()).offset(0).limit(50).statement
+
+
+def archive_list(db):
+    # As routers/archive.py builds it
+    query = db.query(models.ArchivedSweet).filter(models.ArchivedSweet.name.ilike("%truffle%"))
+    return query.order_by(models.ArchivedSweet.archive_id.desc()).offset(0).limit(50).statement
+
+
+def stores_search(db):
+    # As routers/stores.py builds it, once per store
+    query = db.query(models.Sweet).filter(models.Sweet.discontinued_at.is_(None))
+    query = query.filter(models.Sweet.name.ilike("%truffle%")).filter(models.Sweet.category.ilike("%choc%"))
+    return query.limit(20).statement
+
+
+def sweets_search(db):
+    category_ids = categories.resolve(db, "chocolate")
+    return queries.search_statement(q="truffle", category_ids=category_ids, in_stock=True,
+                                    sort="-price", limit=20)[0]
+
+
+ROUTE_QUERIES = {
+    "auth.user_by_email": lambda db: queries.USER_BY_EMAIL,
+    "sweets.by_id": lambda db: queries.SWEET_BY_ID,
+    "sweets.list": lambda db: queries.LIST_SWEETS,
+    "sweets.search": sweets_search,
+    "sweets.search_fields": lambda db: queries.search_statement(
+        price_min=1.0, sort="name", limit=50, columns=("id", "name", "price"))[0],
+    "audit.list": audit_list,
+    "archive.list": archive_list,
+    "stores.search": stores_search,
+}
+
+
+@pytest.mark.parametrize("route", list(ROUTE_QUERIES))
+def test_query_construction(benchmark, dataset_db, route):
+    build = ROUTE_QUERIES[route]
+    benchmark.group = "query construction"
+    # The cache key is what SQLAlchemy computes to find the compiled SQL
+    key = benchmark(lambda: build(dataset_db)._generate_cache_key())
+    assert key is not None
@@ -0,0 +1,131 @@
+# backend/benchmarks/bench_inventory.py
+"""
+Write contention on one hot sweet: single-row decrement vs sharded stock slots.
+
+N threads buy the same sweet for a fixed time. "single" runs the atomic
+``UPDATE sweets SET quantity = quantity - 1 WHERE id = ? AND quantity > 0``;
+"sharded" runs inventory.purchase() over INVENTORY_SLOTS counter rows.
+
+Run from the 'backend' folder (same .env as the app):
+    python -m benchmarks.bench_inventory --threads 16 --slots 8
+    python -m benchmarks.bench_inventory --database-url postgresql://...   # row-locking DB
+
+SQLite serializes all writers on one database lock, so expect little
+difference there; the sharded mode targets row-locking databases.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import Session
+
+from app import inventory, models
+from app.config import get_settings
+from app.database import Base
+
+
+def make_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_size=64, max_overflow=0)
+    engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30}, pool_size=64)
+
+    @event.listens_for(engine, "connect")
+    def _wal(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+        dbapi_connection.execute("PRAGMA synchronous=NORMAL")
+
+    return engine
+
+
+def single_row_purchase(db: Session, sweet: models.Sweet) -> bool:
+    result = db.execute(
+        update(models.Sweet)
+        .where(models.Sweet.id == sweet.id, models.Sweet.quantity > 0)
+        .values(quantity=models.Sweet.quantity - 1)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def sharded_purchase(db: Session, sweet: models.Sweet) -> bool:
+    ok = inventory.purchase(db, sweet) is not None
+    db.commit()
+    return ok
+
+
+def run(engine, mode: str, threads: int, duration: float, stock: int) -> dict:
+    with Session(engine) as db:
+        sweet = models.Sweet(name=f"Hot {mode}", category="Promo", price=1.0, quantity=stock)
+        db.add(sweet)
+        db.flush()
+        if mode == "sharded":
+            inventory.initialize(db, sweet.id, stock)
+        db.commit()
+        sweet_id = sweet.id
+
+    buy = single_row_purchase if mode == "single" else sharded_purchase
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        local, failed = [], 0
+        with Session(engine) as db:
+            sweet = db.get(models.Sweet, sweet_id)
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    buy(db, sweet)
+                    local.append(time.perf_counter() - start)
+                except Exception:
+                    db.rollback()
+                    failed += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "ops_per_s": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0,
+        "errors": sum(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=None, help="default: a temporary SQLite file")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--stock", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    get_settings().inventory_slots = args.slots
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'contention.db')}"
+        engine = make_engine(url)
+        Base.metadata.create_all(engine)
+
+        print(f"{engine.dialect.name}, {args.threads} threads, {args.slots} slots, {args.duration:.0f}s per mode")
+        print(f"{'mode':>8} {'ops/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for mode in ("single", "sharded"):
+            r = run(engine, mode, args.threads, args.duration, args.stock)
+            print(f"{r['mode']:>8} {r['ops_per_s']:>10.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
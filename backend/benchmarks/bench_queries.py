@@ -0,0 +1,144 @@
+# backend/benchmarks/bench_queries.py
+"""
+Per-request Python overhead of the hot queries: built per call vs prebuilt.
+
+- before: ``db.query(...).filter(...)`` built on every call, as the routes did
+- after:  the prebuilt statements in app/queries.py
+
+Each query runs against a small temporary SQLite catalog so the database
+work is tiny and the difference is Python time: building the expression,
+computing its cache key and looking up the compiled SQL. The "build" column
+isolates that part (statement construction + cache key, no execution).
+
+Run from the 'backend' folder (same .env as the app):
+    python -m benchmarks.bench_queries --repeat 5000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app import categories, models, queries
+from app.database import Base
+from benchmarks.bench_suggest import make_rows, percentile
+
+SEARCHES = [
+    {"q": "truffle", "limit": 20},
+    {"category": "gum", "in_stock": True, "sort": "price", "limit": 20},
+    {"price_min": 2.0, "price_max": 2.5, "sort": "-quantity", "skip": 20, "limit": 20},
+]
+
+
+def before_cases(db):
+    return {
+        "sweet by id": lambda: db.query(models.Sweet).filter(models.Sweet.id == 42).first(),
+        "user by email": lambda: db.query(models.User).filter(models.User.email == "user42@test.com").first(),
+        "search": lambda: [built_search(db, **params) for params in SEARCHES],
+    }
+
+
+def after_cases(db):
+    return {
+        "sweet by id": lambda: queries.sweet_by_id(db, 42),
+        "user by email": lambda: queries.user_by_email(db, "user42@test.com"),
+        "search": lambda: [queries.search_sweets(db, **params) for params in SEARCHES],
+    }
+
+
+def build_cases():
+    """Only the statement construction and cache key, which prebuilt statements skip."""
+    return {
+        "sweet by id": (
+            lambda: select(models.Sweet).where(models.Sweet.id == 42).limit(1)._generate_cache_key(),
+            lambda: queries.SWEET_BY_ID._generate_cache_key(),
+        ),
+        "search": (
+            lambda: [sql_search_statement(**params)._generate_cache_key() for params in SEARCHES],
+            lambda: [queries.search_statement(**statement_filters(params))[0]._generate_cache_key()
+                     for params in SEARCHES],
+        ),
+    }
+
+
+def statement_filters(params):
+    # The routes resolve a category name to ids in memory before picking the statement
+    filters = dict(params)
+    if filters.pop("category", None):
+        filters["category_ids"] = [1]
+    return filters
+
+
+def sql_search_statement(**params):
+    # A new statement on every call, as the routes built them before
+    return queries._build_search((
+        bool(params.get("q")), bool(params.get("category")), params.get("price_min") is not None,
+        params.get("price_max") is not None, params.get("in_stock"), params.get("sort"),
+        bool(params.get("skip")), params.get("limit") is not None, None, False,
+    ))
+
+
+def built_search(db, category=None, **params):
+    category_ids = categories.resolve(db, category)
+    _, bound = queries.search_statement(category_ids=category_ids, **params)
+    return db.scalars(sql_search_statement(category=category, **params), bound).all()
+
+
+def time_us(call, repeat):
+    for _ in range(min(repeat, 100)):
+        call()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sweets", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'queries.db')}")
+        Base.metadata.create_all(engine)
+        queries.track(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(models.Sweet), [
+                {"name": name, "category": category, "price": 0.5 + (sweet_id % 50) / 10, "quantity": quantity}
+                for sweet_id, name, category, quantity in make_rows(args.sweets)
+            ])
+            categories.link_all(conn)
+            conn.execute(insert(models.User), [
+                {"email": f"user{i}@test.com", "hashed_password": "x"} for i in range(1_000)
+            ])
+
+        db = sessionmaker(bind=engine)()
+        try:
+            before, after = before_cases(db), after_cases(db)
+            print(f"per call, {args.repeat} calls (us)      before p50/p99        after p50/p99")
+            for name in before:
+                b50, b99 = time_us(before[name], args.repeat)
+                a50, a99 = time_us(after[name], args.repeat)
+                print(f"  {name:14s} query      {b50:9.1f} /{b99:9.1f}   {a50:9.1f} /{a99:9.1f}   "
+                      f"({100 * (1 - a50 / b50):.0f}% less)")
+            for name, (build_before, build_after) in build_cases().items():
+                b50, b99 = time_us(build_before, args.repeat)
+                a50, a99 = time_us(build_after, args.repeat)
+                print(f"  {name:14s} build      {b50:9.1f} /{b99:9.1f}   {a50:9.1f} /{a99:9.1f}")
+        finally:
+            db.close()
+            engine.dispose()
+
+    stats = queries.stats()
+    print(f"compiled cache: {stats['compiled_hits']:,} hits, {stats['compiled_misses']:,} misses "
+          f"(hit rate {stats['compiled_hit_rate']}); search shapes: {stats['search_shapes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_restock.py
+"""
+Time to plan restocks for a large catalog with a year of sales.
+
+Builds a temporary SQLite file with ``--sweets`` sweets and ``--days`` days
+of ledger rows (app/sales.py), skewed like real sales: best sellers sell
+every day, the long tail now and then. Then times ``restock.plan``:
+
+- ledger:  the SQL aggregate, one row per sweet with sales
+- compute: the vectorized plan over the whole catalog (restock.compute)
+- total:   the whole call, including the catalog scan and building the items
+
+Run from the 'backend' folder (needs NumPy):
+    python -m benchmarks.bench_restock --sweets 100000 --days 365
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models, restock, sales
+from app.config import get_settings
+from app.database import Base
+from benchmarks.bench_suggest import make_rows
+
+INSERT_SALES = "INSERT INTO sweet_daily_sales (sweet_id, day, units) VALUES (?, ?, ?)"
+
+
+def ledger_days(sweets: int, days: int, sales_per_day: int, seed: int):
+    """One list of (sweet_id, day, units) rows per day: ``sales_per_day`` Zipf-weighted sales each."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, sweets + 1) ** 0.9
+    weights /= weights.sum()
+    today = sales.today()
+    for offset in range(days):
+        sold = np.unique(rng.choice(sweets, size=sales_per_day, p=weights)) + 1
+        units = rng.poisson(3, size=len(sold)) + 1
+        day = today - offset
+        yield list(zip(sold.tolist(), [day] * len(sold), units.tolist()))
+
+
+def time_ms(call, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sweets", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sales-per-day", type=int, default=20_000, help="sales drawn per day (before dedupe)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.restock_history_days = args.days
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'restock.db')}")
+        Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(insert(models.Sweet), [
+                {"name": name, "category": category, "price": 2.0, "quantity": quantity % 40}
+                for _, name, category, quantity in make_rows(args.sweets)
+            ])
+            rows = 0
+            for day_rows in ledger_days(args.sweets, args.days, args.sales_per_day, args.seed):
+                conn.exec_driver_sql(INSERT_SALES, day_rows)
+                rows += len(day_rows)
+        print(f"{args.sweets:,} sweets, {rows:,} ledger rows over {args.days} days "
+              f"(built in {time.perf_counter() - started:.1f}s)")
+
+        db = sessionmaker(bind=engine)()
+        try:
+            today = sales.today()
+            since = today - args.days + 1
+            totals, ledger_ms = time_ms(lambda: sales.demand_totals(db, since), args.repeat)
+            ledger = np.array(totals, dtype=np.int64).reshape(-1, 4)
+
+            ids = np.arange(1, args.sweets + 1, dtype=np.int64)
+            on_hand = np.full(args.sweets, 10, dtype=np.int64)
+            _, compute_ms = time_ms(lambda: restock.compute(
+                ids, on_hand, ledger, today, args.days, settings.restock_lead_time_days,
+                settings.restock_cover_days, settings.restock_service_z,
+            ), args.repeat)
+
+            plan, total_ms = time_ms(lambda: restock.plan(db), args.repeat)
+        finally:
+            db.close()
+        engine.dispose()
+
+    print(f"  {'ledger':10s} {ledger_ms:10.1f} ms   ({len(totals):,} sweets with sales)")
+    print(f"  {'compute':10s} {compute_ms:10.1f} ms")
+    print(f"  {'total':10s} {total_ms:10.1f} ms   ({len(plan['items']):,} sweets to restock)")
+
+
+if __name__ == "__main__":
+    main()
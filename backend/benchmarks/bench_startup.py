@@ -0,0 +1,111 @@
+# backend/benchmarks/bench_startup.py
+"""
+Cold-start profile of the API: import time of ``app.main`` and
+time-to-first-response, each measured in a fresh interpreter. The first
+response includes the lifespan startup and building the middleware stack
+(which reads the settings), as it does for a real server.
+
+Run from the 'backend' folder (same .env as the app):
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --server      # also time a real uvicorn boot
+
+For a per-module breakdown use: python -X importtime -c "import app.main"
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay deferred until first use
+DEFERRED_MODULES = ("passlib", "bcrypt", "jose")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+loaded_deferred = [m for m in %r if m in sys.modules]
+from app.config import get_settings
+settings_loaded = get_settings.cache_info().currsize > 0
+from fastapi.testclient import TestClient
+first_request = time.perf_counter()
+with TestClient(app.main.app) as client:
+    started = time.perf_counter()
+    client.get("/")
+    responded = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "startup_s": started - first_request,
+    "first_response_s": responded - first_request,
+    "loaded_deferred": loaded_deferred,
+    "settings_loaded": settings_loaded,
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def run_probe() -> dict:
+    """Imports the app in a fresh interpreter and returns its timings."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_server_boot(timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until GET / answers."""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+                return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", action="store_true", help="also time a real uvicorn boot")
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(args.runs)]
+    imports = [r["import_s"] * 1000 for r in results]
+    startups = [r["startup_s"] * 1000 for r in results]
+    firsts = [r["first_response_s"] * 1000 for r in results]
+    print(f"import app.main:      median {statistics.median(imports):7.1f} ms  min {min(imports):7.1f} ms")
+    print(f"lifespan startup:     median {statistics.median(startups):7.1f} ms  min {min(startups):7.1f} ms")
+    print(f"first response (ASGI): median {statistics.median(firsts):7.1f} ms  min {min(firsts):7.1f} ms"
+          "  (startup included)")
+    print(f"deferred modules loaded at import: {results[0]['loaded_deferred'] or 'none'}")
+    print(f"settings (.env) read at import:    {results[0]['settings_loaded']}")
+
+    if args.server:
+        boots = [time_server_boot() * 1000 for _ in range(args.runs)]
+        print(f"uvicorn spawn -> first 200: median {statistics.median(boots):7.1f} ms  min {min(boots):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# backend/benchmarks/bench_suggest.py
+"""
+Memory footprint and per-keystroke latency of the autocomplete suggester.
+
+Run from the 'backend' folder (same .env as the app):
+    python -m benchmarks.bench_suggest --sweets 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.suggest import Suggester
+
+WORDS = [
+    "dark", "milk", "white", "sour", "sugar", "free", "mint", "caramel", "toffee",
+    "gummy", "jelly", "fudge", "honey", "lemon", "cherry", "berry", "salted",
+    "crunchy", "chewy", "royal", "classic", "fizzy", "cocoa", "vanilla", "nougat",
+]
+NOUNS = ["chocolate", "bar", "bears", "worms", "drops", "truffle", "lollipop", "bonbon", "brittle", "swirl"]
+CATEGORIES = ["Chocolate", "Gummy", "Hard Candy", "Toffee", "Licorice", "Marshmallow", "Pastry", "Mints"]
+
+
+def make_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    for sweet_id in range(1, count + 1):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(NOUNS).title()} {sweet_id}"
+        yield sweet_id, name, rng.choice(CATEGORIES), rng.randint(0, 500)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sweets", type=int, default=100_000)
+    parser.add_argument("--keystrokes", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = list(make_rows(args.sweets))
+    suggester = Suggester()
+
+    start = time.perf_counter()
+    suggester.load(rows)
+    build_s = time.perf_counter() - start
+    stats = suggester.stats()
+    print(f"catalog: {args.sweets:,} sweets -> {stats['entries']:,} entries, {stats['keys']:,} keys")
+    print(f"build:   {build_s:.2f} s")
+    print(f"memory:  {stats['memory_bytes'] / 1024 / 1024:.1f} MiB "
+          f"({stats['memory_bytes'] / max(args.sweets, 1):.0f} B/sweet)")
+
+    # Simulate typing: every prefix of a random word, one query per keystroke
+    rng = random.Random(7)
+    by_length = {}
+    for _ in range(args.keystrokes // 5):
+        word = rng.choice(WORDS + NOUNS)
+        for length in range(1, min(len(word), 5) + 1):
+            start = time.perf_counter()
+            suggester.suggest(word[:length], args.limit)
+            by_length.setdefault(length, []).append((time.perf_counter() - start) * 1e6)
+
+    print("keystroke latency (us):")
+    for length, samples in sorted(by_length.items()):
+        print(f"  prefix len {length}: p50 {statistics.median(samples):9.1f}  "
+              f"p99 {percentile(samples, 99):9.1f}")
+
+    # Incremental maintenance: restocks reweigh in place, renames move keys
+    sample = rng.sample(rows, min(1_000, len(rows)))
+    for label, suffix, extra in (("restock", "", 1), ("rename", " Deluxe", 0)):
+        samples = []
+        for sweet_id, name, category, quantity in sample:
+            start = time.perf_counter()
+            suggester.apply_changes(
+                [{"id": sweet_id, "name": name + suffix, "category": category, "quantity": quantity + extra}], []
+            )
+            samples.append((time.perf_counter() - start) * 1e6)
+        print(f"{label} latency (us): p50 {statistics.median(samples):.1f}  p99 {percentile(samples, 99):.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# backend/benchmarks/bench_workers.py
+"""
+Throughput scaling of ``python -m app.serve`` across worker counts.
+
+Seeds a temporary SQLite catalog, starts the server with 1, 2, 4 and 8
+workers in turn, and drives it with client processes over keep-alive
+connections. Reports requests/second and latency percentiles per worker count.
+
+Run from the 'backend' folder (same .env as the app):
+    python -m benchmarks.bench_workers --duration 10 --clients 16
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed_catalog(database_url: str, count: int) -> None:
+    from app import models
+    from app.database import Base
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            models.Sweet(name=f"Sweet {i}", category=f"Category {i % 12}", price=1 + i % 20, quantity=100)
+            for i in range(count)
+        )
+        db.commit()
+    engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start")
+
+
+def _client(args):
+    port, path, duration = args
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except OSError:
+            errors += 1
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def run(workers: int, database_url: str, clients: int, duration: float, path: str) -> dict:
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, WEB_CONCURRENCY=str(workers))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port)
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.map(_client, [(port, path, duration)] * clients)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(l for result, _ in results for l in result)
+    errors = sum(e for _, e in results)
+    pick = lambda pct: latencies[min(len(latencies) - 1, int(len(latencies) * pct))] * 1000
+    return {
+        "workers": workers,
+        "rps": len(latencies) / duration,
+        "p50_ms": pick(0.50),
+        "p99_ms": pick(0.99),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client processes")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per worker count")
+    parser.add_argument("--sweets", type=int, default=1_000)
+    parser.add_argument("--path", default="/api/sweets/?limit=20")
+    args = parser.parse_args()
+
+    from app.serve import available_cpus
+    print(f"available CPUs: {available_cpus()}  clients: {args.clients}  path: {args.path}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed_catalog(database_url, args.sweets)
+
+        baseline = None
+        print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for workers in args.workers:
+            result = run(workers, database_url, args.clients, args.duration, args.path)
+            baseline = baseline or result["rps"]
+            print(f"{workers:>7} {result['rps']:>10.0f} {result['rps'] / baseline:>7.2f}x "
+                  f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
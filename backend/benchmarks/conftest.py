@@ -0,0 +1,88 @@
+# backend/benchmarks/conftest.py
+"""
+Seeded datasets as pytest fixtures for benchmarks.
+
+Sizes come from the environment so the same benchmark runs small on a
+laptop and large in CI:
+
+    BENCH_SWEETS=1000000 BENCH_USERS=50000 BENCH_PURCHASES=0 pytest benchmarks ...
+
+Generated files are cached per spec and dataset tag (generator version and
+schema, see datagen.dataset_tag) under BENCH_DATA_DIR (default: the system
+temp directory), since a 1M-sweet file is worth reusing across runs.
+
+BENCH_SNAPSHOT=path/to/snapshot.db (or a .db.gz backup) runs them on a real
+snapshot from scripts/backup_db.py instead.
+"""
+import gzip
+import os
+import shutil
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.datagen import DatasetSpec, build, dataset_tag
+
+
+def dataset_spec() -> DatasetSpec:
+    return DatasetSpec(
+        sweets=int(os.environ.get("BENCH_SWEETS", DatasetSpec.sweets)),
+        users=int(os.environ.get("BENCH_USERS", DatasetSpec.users)),
+        purchases=int(os.environ.get("BENCH_PURCHASES", DatasetSpec.purchases)),
+        seed=int(os.environ.get("BENCH_SEED", DatasetSpec.seed)),
+    )
+
+
+def snapshot_path(snapshot: str) -> str:
+    """Benchmarks may write (tests roll back), so they get a copy, never the snapshot itself."""
+    directory = os.environ.get("BENCH_DATA_DIR", tempfile.gettempdir())
+    name = os.path.basename(snapshot).removesuffix(".gz")
+    path = os.path.join(directory, f"sweetshop-bench-snapshot-{name}")
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(snapshot):
+        opener = gzip.open if snapshot.endswith(".gz") else open
+        with opener(snapshot, "rb") as source, open(path + ".partial", "wb") as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(path + ".partial", path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def dataset_path():
+    """Path of a generated SQLite file, built once and reused while the spec and schema are unchanged."""
+    snapshot = os.environ.get("BENCH_SNAPSHOT")
+    if snapshot:
+        return snapshot_path(snapshot)
+
+    spec = dataset_spec()
+    directory = os.environ.get("BENCH_DATA_DIR", tempfile.gettempdir())
+    path = os.path.join(
+        directory,
+        f"sweetshop-bench-{spec.sweets}s-{spec.users}u-{spec.purchases}p-seed{spec.seed}-{dataset_tag()}.db",
+    )
+    if not os.path.exists(path):
+        build(path + ".partial", spec, force=True)
+        os.replace(path + ".partial", path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def dataset_engine(dataset_path):
+    engine = create_engine(f"sqlite:///{dataset_path}", connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def dataset_db(dataset_engine):
+    """A session on the generated dataset; changes are rolled back after the test."""
+    connection = dataset_engine.connect()
+    transaction = connection.begin()
+    db = sessionmaker(bind=connection)()
+    try:
+        yield db
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
@@ -0,0 +1,289 @@
+# backend/benchmarks/datagen.py
+"""
+Deterministic synthetic datasets for benchmarks: sweets, users, purchases.
+
+The same seed always produces the same rows, so numbers from different
+machines and branches are comparable.
+
+- Sweets get names from a candy vocabulary, categories with a skewed size
+  distribution (a few big categories, a long tail), and category-dependent
+  log-normal prices.
+- Popularity is Zipf-distributed over a seeded shuffle of the catalog:
+  sweet at popularity rank r is bought with probability ~ 1 / r**s.
+  Stock levels follow popularity loosely, and some sweets are sold out.
+- Users share one pre-computed bcrypt hash (password "password"), since
+  hashing a million passwords would dominate generation time. The first
+  user is an admin.
+- Purchases (optional) pick users uniformly and sweets by popularity, with
+  timestamps spread over the ``days`` before a fixed date. They go into a
+  ``dataset_purchases`` table that only exists in generated files.
+
+Loading uses one transaction per table with SQLite's journal and fsync
+turned off, and builds secondary indexes after the rows are in.
+
+Run from the 'backend' folder:
+    python -m benchmarks.datagen bench.db --sweets 1000000 --users 50000 --purchases 2000000
+    DATABASE_URL=sqlite:///./bench.db uvicorn app.main:app   # serve it
+
+For pytest, see the ``dataset_path`` / ``dataset_db`` fixtures in benchmarks/conftest.py.
+"""
+import argparse
+import bisect
+import hashlib
+import itertools
+import math
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, create_engine
+
+from app import categories, models
+from app.database import Base
+
+ADJECTIVES = [
+    "Dark", "Milk", "White", "Sour", "Sugar-Free", "Salted", "Crunchy", "Chewy", "Royal",
+    "Classic", "Fizzy", "Creamy", "Spicy", "Golden", "Tiny", "Giant", "Double", "Smoky",
+]
+FLAVORS = [
+    "Mint", "Caramel", "Toffee", "Honey", "Lemon", "Cherry", "Strawberry", "Raspberry",
+    "Cocoa", "Vanilla", "Nougat", "Hazelnut", "Coconut", "Orange", "Ginger", "Almond",
+    "Pistachio", "Maple", "Cinnamon", "Blueberry", "Mango", "Peanut", "Coffee", "Licorice",
+]
+# category: (relative share of the catalog, typical price, nouns)
+CATEGORIES = {
+    "Chocolate": (30, 3.50, ["Bar", "Truffle", "Bonbon", "Buttons", "Praline", "Bark"]),
+    "Gummy": (18, 1.80, ["Bears", "Worms", "Rings", "Sharks", "Cola Bottles"]),
+    "Hard Candy": (12, 1.20, ["Drops", "Lollipop", "Humbugs", "Rock", "Sticks"]),
+    "Toffee": (8, 2.50, ["Squares", "Brittle", "Chews"]),
+    "Pastry": (8, 4.00, ["Tart", "Eclair", "Macaron", "Cupcake", "Churros"]),
+    "Marshmallow": (6, 2.00, ["Puffs", "Twists", "Mallows"]),
+    "Licorice": (5, 1.60, ["Laces", "Wheels", "Allsorts"]),
+    "Fudge": (5, 3.00, ["Fudge", "Slab"]),
+    "Mints": (4, 1.00, ["Mints", "Imperials"]),
+    "Halva": (2, 5.50, ["Halva"]),
+    "Turkish Delight": (2, 6.00, ["Delight", "Lokum"]),
+}
+USER_PASSWORD = "password"
+# Bump when the generated rows change (cached files in benchmarks/conftest.py are
+# keyed on it); schema changes are picked up by dataset_tag() on their own
+DATASET_VERSION = 1
+# Fixed so datasets do not depend on when they were generated
+HISTORY_END = datetime(2026, 1, 1)
+
+purchases_table = Table(
+    "dataset_purchases",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False, index=True),
+    Column("sweet_id", Integer, nullable=False, index=True),
+    Column("quantity", Integer, nullable=False),
+    Column("purchased_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    sweets: int = 10_000
+    users: int = 1_000
+    purchases: int = 0
+    seed: int = 42
+    zipf_s: float = 1.1
+    days: int = 90
+
+
+def popularity_ranks(spec: DatasetSpec) -> List[int]:
+    """rank[i] = popularity rank (1 = best seller) of sweet id i + 1."""
+    ranks = list(range(1, spec.sweets + 1))
+    random.Random(spec.seed + 1).shuffle(ranks)
+    return ranks
+
+
+def zipf_cum_weights(spec: DatasetSpec) -> List[float]:
+    """Cumulative purchase weights by sweet id, for random.choices(cum_weights=...)."""
+    weights = (1.0 / rank ** spec.zipf_s for rank in popularity_ranks(spec))
+    return list(itertools.accumulate(weights))
+
+
+def generate_categories() -> Iterator[dict]:
+    for category_id, name in enumerate(CATEGORIES, start=1):
+        yield {"id": category_id, "name": name, "key": categories.normalize(name)}
+
+
+def generate_sweets(spec: DatasetSpec) -> Iterator[dict]:
+    rng = random.Random(spec.seed)
+    names = list(CATEGORIES)
+    category_ids = {name: category_id for category_id, name in enumerate(names, start=1)}
+    cum_shares = list(itertools.accumulate(share for share, _, _ in CATEGORIES.values()))
+    ranks = popularity_ranks(spec)
+    for sweet_id in range(1, spec.sweets + 1):
+        category = names[bisect.bisect_left(cum_shares, rng.random() * cum_shares[-1])]
+        _, base_price, nouns = CATEGORIES[category]
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(FLAVORS)} {rng.choice(nouns)}"
+        if rng.random() < 0.5:
+            name = f"{name} #{sweet_id}"  # plenty of near-duplicates, like a real catalog
+        # Best sellers are stocked deeper; ~5% of the catalog is sold out
+        rank = ranks[sweet_id - 1]
+        depth = max(1, int(500 / math.sqrt(rank)))
+        quantity = 0 if rng.random() < 0.05 else rng.randint(1, depth + 20)
+        price = round(base_price * rng.lognormvariate(0, 0.35), 2)
+        yield {
+            "id": sweet_id,
+            "name": name,
+            "category": category,
+            "category_id": category_ids[category],
+            "price": price,
+            "quantity": quantity,
+            "image_url": None,
+            "price_cents": models.price_to_cents(price),
+            "discontinued_at": None,
+            "out_of_stock_since": HISTORY_END if quantity == 0 else None,
+        }
+
+
+def generate_users(spec: DatasetSpec, hashed_password: str) -> Iterator[dict]:
+    for user_id in range(1, spec.users + 1):
+        yield {
+            "id": user_id,
+            "email": "admin@example.com" if user_id == 1 else f"user{user_id}@example.com",
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_admin": user_id == 1,
+        }
+
+
+def generate_purchases(spec: DatasetSpec) -> Iterator[dict]:
+    if not spec.purchases or not spec.users or not spec.sweets:
+        return
+    rng = random.Random(spec.seed + 2)
+    cum_weights = zipf_cum_weights(spec)
+    sweet_ids = range(1, spec.sweets + 1)
+    span = spec.days * 86400
+    start = HISTORY_END - timedelta(days=spec.days)
+    batch = 10_000
+    purchase_id = 0
+    for offset in range(0, spec.purchases, batch):
+        size = min(batch, spec.purchases - offset)
+        picks = rng.choices(sweet_ids, cum_weights=cum_weights, k=size)
+        for sweet_id in picks:
+            purchase_id += 1
+            yield {
+                "id": purchase_id,
+                "user_id": rng.randint(1, spec.users),
+                "sweet_id": sweet_id,
+                "quantity": 1 if rng.random() < 0.8 else rng.randint(2, 5),
+                "purchased_at": start + timedelta(seconds=rng.randrange(span)),
+            }
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def dataset_tag() -> str:
+    """'v<DATASET_VERSION>-<hash of every model table and column>': differs whenever a generated file would."""
+    schema = sorted(
+        f"{table.name}.{column.name}:{type(column.type).__name__}"
+        for table in Base.metadata.tables.values() for column in table.columns
+    )
+    digest = hashlib.sha1("\n".join(schema).encode()).hexdigest()[:8]
+    return f"v{DATASET_VERSION}-{digest}"
+
+
+def _bulk_load(conn, table: Table, rows: Iterator[dict], chunk_size: int = 50_000) -> int:
+    """Plain DB-API executemany: several times faster than ORM or Core inserts."""
+    columns = [column.name for column in table.columns]
+    sql = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        conn.exec_driver_sql(sql, [tuple(_sqlite_value(row[c]) for c in columns) for row in chunk])
+        count += len(chunk)
+    return count
+
+
+def _sqlite_value(value):
+    # Same text format SQLAlchemy's DateTime uses on SQLite
+    return value.isoformat(" ") if isinstance(value, datetime) else value
+
+
+def build(path: str, spec: DatasetSpec, force: bool = False) -> dict:
+    """Writes the dataset to a new SQLite file. Returns row counts and timings."""
+    from app.auth import get_password_hash
+
+    if os.path.exists(path):
+        if not force:
+            raise FileExistsError(f"{path} exists (use force=True / --force to replace it)")
+        os.remove(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    tables = [models.Sweet.__table__, models.User.__table__, purchases_table]
+    Base.metadata.create_all(engine)
+    purchases_table.create(engine)
+
+    report = {"path": path}
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=OFF")
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        # Indexes are cheaper to build once than to maintain row by row
+        for table in tables:
+            for index in table.indexes:
+                index.drop(conn)
+        conn.commit()
+
+        sources = [
+            (models.Category.__table__, generate_categories()),
+            (models.Sweet.__table__, generate_sweets(spec)),
+            (models.User.__table__, generate_users(spec, get_password_hash(USER_PASSWORD))),
+            (purchases_table, generate_purchases(spec)),
+        ]
+        for table, rows in sources:
+            started = time.perf_counter()
+            count = _bulk_load(conn, table, rows)
+            conn.commit()
+            report[table.name] = {"rows": count, "seconds": round(time.perf_counter() - started, 2)}
+
+        started = time.perf_counter()
+        for table in tables:
+            for index in table.indexes:
+                index.create(conn)
+        conn.commit()
+        report["indexes_seconds"] = round(time.perf_counter() - started, 2)
+    engine.dispose()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a seeded benchmark dataset (SQLite)")
+    parser.add_argument("path", help="SQLite file to create")
+    parser.add_argument("--sweets", type=int, default=DatasetSpec.sweets)
+    parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    parser.add_argument("--purchases", type=int, default=DatasetSpec.purchases)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--zipf", type=float, default=DatasetSpec.zipf_s, help="popularity skew exponent")
+    parser.add_argument("--days", type=int, default=DatasetSpec.days, help="purchase history window")
+    parser.add_argument("--force", action="store_true", help="replace an existing file")
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(args.sweets, args.users, args.purchases, args.seed, args.zipf, args.days)
+    started = time.perf_counter()
+    report = build(args.path, spec, force=args.force)
+    total = time.perf_counter() - started
+
+    print(f"--> Wrote {args.path} (seed {spec.seed}) in {total:.1f} s")
+    for table in ("sweets", "users", "dataset_purchases"):
+        rows, seconds = report[table]["rows"], report[table]["seconds"]
+        rate = rows / seconds if seconds else 0
+        print(f"    {table:<18} {rows:>10,} rows  {seconds:6.2f} s  ({rate:,.0f} rows/s)")
+    print(f"    indexes            {report['indexes_seconds']:>17.2f} s")
+    print(f"--> Users log in with password '{USER_PASSWORD}' (admin: admin@example.com)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Moves discontinued and long out-of-stock sweets to the archive table.
+
+    python scripts/archive_sweets.py                       # every store, settings from .env
+    python scripts/archive_sweets.py --out-of-stock-days 30 --batch-size 200
+    python scripts/archive_sweets.py --store north         # one store in multi-store mode
+
+Works in short batches with a pause in between (see app/archive.py), so it
+is safe to run while the API is serving purchases.
+
+Run it from the 'backend' folder with the same .env as the app.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+# 1. Setup Path to find 'app' module
+# This allows the script to run from the 'backend' folder
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import archive, stores
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Archive discontinued and long out-of-stock sweets")
+    parser.add_argument("--batch-size", type=int, default=None, help="default: ARCHIVE_BATCH_SIZE")
+    parser.add_argument("--out-of-stock-days", type=float, default=None,
+                        help="default: ARCHIVE_OUT_OF_STOCK_DAYS (0 = only discontinued sweets)")
+    parser.add_argument("--sleep-ms", type=float, default=None, help="pause between batches")
+    parser.add_argument("--store", default=None, help="archive this store only (multi-store mode)")
+    args = parser.parse_args(argv)
+
+    if args.store and not stores.is_known(args.store):
+        print(f"--> Unknown store {args.store!r}")
+        return 1
+
+    overrides = {
+        "batch_size": args.batch_size,
+        "out_of_stock_days": args.out_of_stock_days,
+        "batch_sleep": None if args.sleep_ms is None else args.sleep_ms / 1000,
+    }
+    if args.store:
+        with stores.use_store(args.store):
+            results = {args.store: archive.run(**overrides)}
+    else:
+        results = archive.run_all_stores(**overrides)
+
+    for store, result in results.items():
+        print(f"--> {store}: archived {result['archived']} sweets in {result['batches']} batches, "
+              f"pruned {result['sales_pruned']} sales ledger rows, {result['seconds']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
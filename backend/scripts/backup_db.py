@@ -0,0 +1,69 @@
+"""
+Online backup of the SQLite database while the API keeps running.
+
+    python scripts/backup_db.py [--dest backups/] [--keep 7] [--no-compress]
+    python scripts/backup_db.py --every 3600              # scheduled, once an hour
+    python scripts/backup_db.py --snapshot snapshots/catalog.db --no-backup
+    python scripts/backup_db.py --store north             # one store in multi-store mode
+
+Uses SQLite's online backup API in small page steps (see app/backup.py), so
+purchases keep committing while the copy runs. ``--snapshot`` also refreshes
+an uncompressed copy at a fixed path, for DATABASE_READ_URL or
+BENCH_SNAPSHOT.
+
+Run it from the 'backend' folder with the same .env as the app.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+# 1. Setup Path to find 'app' module
+# This allows the script to run from the 'backend' folder
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import backup, stores
+
+
+def run_once(args) -> None:
+    if not args.no_backup:
+        result = backup.run_backup(dest_dir=args.dest, compressed=not args.no_compress, keep=args.keep)
+        print(f"--> Backup {result.path}: {result.pages} pages in {result.steps} steps, "
+              f"{result.restarts} restarts, {result.size_bytes / 1e6:.1f} MB, {result.seconds:.2f}s")
+    if args.snapshot:
+        result = backup.write_snapshot(args.snapshot)
+        print(f"--> Snapshot {result.path}: {result.size_bytes / 1e6:.1f} MB, {result.seconds:.2f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Online backup of the SQLite database")
+    parser.add_argument("--dest", default=None, help="backup directory (default: BACKUP_DIR)")
+    parser.add_argument("--keep", type=int, default=None, help="backups to keep (default: BACKUP_KEEP)")
+    parser.add_argument("--no-compress", action="store_true", help="store plain .db files")
+    parser.add_argument("--snapshot", default=None, help="also refresh a read-only copy at this path")
+    parser.add_argument("--no-backup", action="store_true", help="only refresh --snapshot")
+    parser.add_argument("--store", default=None, help="back up this store (multi-store mode)")
+    parser.add_argument("--every", type=float, default=None, help="repeat every N seconds until stopped")
+    args = parser.parse_args(argv)
+
+    if args.store and not stores.is_known(args.store):
+        print(f"--> Unknown store {args.store!r}")
+        return 1
+
+    with stores.use_store(args.store):
+        while True:
+            started = time.monotonic()
+            try:
+                run_once(args)
+            except backup.BackupError as exc:
+                print(f"--> Backup failed: {exc}")
+                if args.every is None:
+                    return 1
+            if args.every is None:
+                return 0
+            time.sleep(max(args.every - (time.monotonic() - started), 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
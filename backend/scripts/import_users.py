@@ -0,0 +1,170 @@
+"""
+Bulk-import users from a CSV file, straight into the database.
+
+    python scripts/import_users.py users.csv [--workers 4] [--batch-size 1000] [--dry-run]
+
+The CSV needs a header with at least ``email`` and ``password`` columns; an
+optional ``role`` column accepts ``admin`` or ``user`` (default: user).
+
+- Passwords are bcrypt-hashed across a process pool (hashing is CPU-bound,
+  so threads would not help).
+- Emails already in the database are skipped; they are found with a few
+  set-based ``IN`` queries instead of one query per user.
+- New users are inserted in batches, one transaction per batch.
+
+The API server is not involved; run it from the 'backend' folder with the
+same .env as the app.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+# 1. Setup Path to find 'app' module
+# This allows the script to run from the 'backend' folder
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.auth import get_password_hash
+from app.models import User
+
+ROLES = {"admin": True, "user": False}
+# Stay well below SQLite's limit on bound parameters per statement
+LOOKUP_CHUNK = 500
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    new: int = 0
+    inserted: int = 0
+    existing: int = 0
+    duplicates: int = 0
+    invalid: List[str] = field(default_factory=list)
+    hash_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    def summary(self) -> str:
+        rate = self.inserted / self.total_seconds if self.total_seconds else 0.0
+        hash_rate = self.inserted / self.hash_seconds if self.hash_seconds else 0.0
+        return (
+            f"--> Read {self.read} rows: {self.inserted} inserted, {self.existing} already existed, "
+            f"{self.duplicates} duplicates in file, {len(self.invalid)} invalid\n"
+            f"--> {self.total_seconds:.1f} s total ({rate:.1f} users/s), "
+            f"hashing {self.hash_seconds:.1f} s ({hash_rate:.1f} hashes/s)"
+        )
+
+
+def read_rows(path: str) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def clean_rows(rows: Iterable[Dict[str, str]], report: ImportReport) -> List[dict]:
+    """Validates rows and drops repeated emails (the first occurrence wins)."""
+    seen: Set[str] = set()
+    users = []
+    for line, row in enumerate(rows, start=2):  # line 1 is the header
+        report.read += 1
+        email = (row.get("email") or "").strip()  # stored as given, like /register
+        password = row.get("password") or ""
+        role = (row.get("role") or "user").strip().lower()
+        if "@" not in email or not password or role not in ROLES:
+            report.invalid.append(f"line {line}: {email or '<no email>'}")
+            continue
+        if email in seen:
+            report.duplicates += 1
+            continue
+        seen.add(email)
+        users.append({"email": email, "password": password, "is_admin": ROLES[role]})
+    return users
+
+
+def existing_emails(db: Session, emails: List[str]) -> Set[str]:
+    found = set()
+    for start in range(0, len(emails), LOOKUP_CHUNK):
+        chunk = emails[start:start + LOOKUP_CHUNK]
+        found.update(e for (e,) in db.query(User.email).filter(User.email.in_(chunk)))
+    return found
+
+
+def hash_passwords(passwords: List[str], workers: int) -> List[str]:
+    if workers <= 1 or len(passwords) < 2:
+        return [get_password_hash(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(get_password_hash, passwords, chunksize=chunksize))
+
+
+def import_users(
+    db: Session,
+    rows: Iterable[Dict[str, str]],
+    workers: int = 1,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+) -> ImportReport:
+    report = ImportReport()
+    started = time.perf_counter()
+
+    users = clean_rows(rows, report)
+    taken = existing_emails(db, [u["email"] for u in users])
+    report.existing = len(taken)
+    users = [u for u in users if u["email"] not in taken]
+    report.new = len(users)
+
+    if not dry_run and users:
+        hash_started = time.perf_counter()
+        hashes = hash_passwords([u["password"] for u in users], workers)
+        report.hash_seconds = time.perf_counter() - hash_started
+
+        records = [
+            {"email": u["email"], "hashed_password": h, "is_active": True, "is_admin": u["is_admin"]}
+            for u, h in zip(users, hashes)
+        ]
+        for start in range(0, len(records), batch_size):
+            db.execute(insert(User), records[start:start + batch_size])
+            db.commit()
+        report.inserted = len(records)
+
+    report.total_seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database import SessionLocal
+    from app.serve import available_cpus
+
+    parser = argparse.ArgumentParser(description="Bulk-import users from a CSV file")
+    parser.add_argument("csv_path", help="CSV with columns: email, password[, role]")
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="users per INSERT transaction")
+    parser.add_argument("--dry-run", action="store_true", help="validate and count, write nothing")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or available_cpus()
+    rows = read_rows(args.csv_path)
+    print(f"--> Importing {len(rows)} rows from {args.csv_path} with {workers} hashing worker(s)")
+
+    db = SessionLocal()
+    try:
+        report = import_users(db, rows, workers=workers, batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    for problem in report.invalid[:20]:
+        print(f"--> Skipped invalid row, {problem}")
+    if len(report.invalid) > 20:
+        print(f"--> ... and {len(report.invalid) - 20} more invalid rows")
+    if args.dry_run:
+        print(f"--> Dry run: {report.new} users would be inserted, nothing was written")
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Apply Alembic migrations to every store database (multi-store mode).
+
+    python scripts/migrate_stores.py [--revision head] [--stores north south] [--parallel 4]
+
+Runs ``alembic -x store=<id> upgrade <revision>`` once per store in STORE_IDS
+(or the given subset), several at a time: each store is its own database,
+so their migrations do not contend. The default database (DATABASE_URL) is
+migrated with a plain ``alembic upgrade head`` as before.
+
+Run it from the 'backend' folder with the same .env as the app.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+# 1. Setup Path to find 'app' module
+# This allows the script to run from the 'backend' folder
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def migrate(store: str, revision: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "alembic", "-x", f"store={store}", "upgrade", revision],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app import stores
+
+    parser = argparse.ArgumentParser(description="Migrate every store database")
+    parser.add_argument("--revision", default="head")
+    parser.add_argument("--stores", nargs="*", help="subset of STORE_IDS (default: all)")
+    parser.add_argument("--parallel", type=int, default=4, help="stores migrated at the same time")
+    args = parser.parse_args(argv)
+
+    if not stores.enabled():
+        print("--> STORE_DATABASE_URL is not set; nothing to do")
+        return 0
+    targets = args.stores or stores.configured_stores()
+    unknown = [store for store in targets if not stores.is_known(store)]
+    if unknown:
+        print(f"--> Unknown store(s): {', '.join(unknown)}")
+        return 1
+
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as pool:
+        results = dict(zip(targets, pool.map(lambda store: migrate(store, args.revision), targets)))
+
+    failed = 0
+    for store, result in results.items():
+        if result.returncode == 0:
+            print(f"--> {store}: upgraded to {args.revision}")
+        else:
+            failed += 1
+            print(f"--> {store}: FAILED\n{result.stderr.strip()}")
+    print(f"--> {len(targets) - failed}/{len(targets)} stores migrated")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,14 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
+from app import database
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, ReadOnlySession, get_db, get_read_db
+from app.idempotency import get_response_cache
+from app.popularity import get_tracker
+from app.audit import get_audit_log
+from app.suggest import suggester
+from app.categories import get_map as get_category_map
 
 # 1. Use an in-memory SQLite database for tests
 # check_same_thread=False is needed for SQLite
@@ -19,6 +25,8 @@ engine = create_engine(
 )
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# GET routes get a read-only session, like database.ReadSessionLocal
+TestingReadSessionLocal = sessionmaker(class_=ReadOnlySession, autoflush=False, expire_on_commit=False, bind=engine)
 
 @pytest.fixture(scope="function")
 def test_db():
@@ -36,7 +44,7 @@ def test_db():
         Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
-def client(test_db):
+def client(test_db, monkeypatch):
     """
     Create a TestClient that uses the override_get_db dependency.
     This forces the app to use our in-memory test_db.
@@ -47,8 +55,25 @@ def client(test_db):
         finally:
             test_db.close()
 
+    def override_get_read_db():
+        db = TestingReadSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
     # Override the dependency
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    # Components that open their own sessions (outside get_db) use the test DB too
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    # In-memory indexes must not leak between test databases
+    suggester.reset()
+    get_category_map().reset()
+    get_response_cache().clear()
+    get_tracker().reset()
+    # Write audit events inline: a writer thread would share the in-memory connection
+    monkeypatch.setattr(get_audit_log(), "background", False)
     
     with TestClient(app) as c:
         yield c
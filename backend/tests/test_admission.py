@@ -0,0 +1,91 @@
+# backend/tests/test_admission.py
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.admission import AdmissionController, AdmissionMiddleware, Limiter, Shed, classify
+
+
+def test_limiter_serves_waiters_by_priority():
+    async def scenario():
+        limiter = Limiter("test", limit=1, max_queue=5)
+        await limiter.acquire(priority=2, timeout=1)
+        order = []
+
+        async def wait(name, priority):
+            await limiter.acquire(priority, timeout=1)
+            order.append(name)
+            limiter.release()
+
+        browse = asyncio.create_task(wait("browse", 2))
+        purchase = asyncio.create_task(wait("purchase", 0))
+        await asyncio.sleep(0)
+        assert limiter.queued == 2
+
+        limiter.release()
+        await asyncio.gather(browse, purchase)
+        return order, limiter
+
+    order, limiter = asyncio.run(scenario())
+    assert order == ["purchase", "browse"]
+    assert limiter.in_flight == 0
+    assert limiter.stats()["admitted"] == 3
+
+
+def test_limiter_sheds_on_full_queue_and_timeout():
+    async def scenario():
+        limiter = Limiter("test", limit=1, max_queue=1)
+        await limiter.acquire(priority=0, timeout=1)
+
+        waiting = asyncio.create_task(limiter.acquire(priority=0, timeout=0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as full:
+            await limiter.acquire(priority=0, timeout=1)
+        with pytest.raises(Shed) as late:
+            await waiting
+        return limiter, full.value.reason, late.value.reason
+
+    limiter, full_reason, late_reason = asyncio.run(scenario())
+    assert (full_reason, late_reason) == ("queue_full", "timeout")
+    assert limiter.stats()["shed"] == {"queue_full": 1, "timeout": 1}
+    assert limiter.queued == 0
+
+
+def test_classify_routes():
+    assert classify("POST", "/api/sweets/3/purchase", []) == ("purchase", 0)
+    assert classify("GET", "/api/sweets/search", []) == ("browse", 2)
+    assert classify("GET", "/api/sweets/", [(b"authorization", b"Bearer x")]) == ("browse", 1)
+    assert classify("POST", "/api/auth/login", []) == ("auth", 2)
+    assert classify("DELETE", "/api/sweets/3", [(b"authorization", b"Bearer x")]) == ("admin", 1)
+    assert classify("GET", "/", []) is None
+    assert classify("GET", "/api/ops/admission", []) is None
+
+
+def test_middleware_returns_503_with_retry_after():
+    controller = AdmissionController(max_concurrency=0, max_queue=0, queue_timeout=0.1, retry_after=3)
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.get("/api/sweets/search")
+    def search():
+        return []
+
+    with TestClient(app) as c:
+        response = c.get("/api/sweets/search")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert controller.stats()["server"]["shed"]["queue_full"] == 1
+
+
+def test_admission_stats_endpoint(client):
+    client.get("/api/sweets")
+
+    response = client.get("/api/ops/admission")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["server"]["admitted"] >= 1
+    assert data["server"]["in_flight"] == 0
+    assert "browse" in data["groups"]
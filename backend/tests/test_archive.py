@@ -0,0 +1,155 @@
+# backend/tests/test_archive.py
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import update
+
+from app import archive, models, sales
+from app.config import get_settings
+
+
+def get_token(client, test_db, email="archivist@test.com", admin=True):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    if admin:
+        user = test_db.query(models.User).filter(models.User.email == email).first()
+        user.is_admin = True
+        test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+
+def days_ago(days):
+    return datetime.now(UTC).replace(tzinfo=None) - timedelta(days=days)
+
+
+def test_out_of_stock_since_follows_quantity(test_db):
+    sweet = models.Sweet(name="Peda", category="Milk", price=1.5, quantity=0)
+    test_db.add(sweet)
+    test_db.commit()
+    assert sweet.out_of_stock_since is not None
+
+    sweet.quantity = 4
+    test_db.commit()
+    assert sweet.out_of_stock_since is None
+
+
+def test_archiver_moves_discontinued_and_long_out_of_stock_sweets(client, test_db):
+    headers = get_token(client, test_db)
+    test_db.add_all([
+        models.Sweet(name="Barfi", category="Milk", price=2.0, quantity=4),
+        models.Sweet(name="Peda", category="Milk", price=1.5, quantity=0, out_of_stock_since=days_ago(200)),
+        models.Sweet(name="Rasgulla", category="Milk", price=1.0, quantity=0, out_of_stock_since=days_ago(3)),
+        models.Sweet(name="Kaju Katli", category="Nut", price=3.0, quantity=7),
+    ])
+    test_db.commit()
+    version = client.get("/api/sweets/changes").json()["version"]
+    client.delete("/api/sweets/4", headers=headers)
+
+    assert archive.archive_batch(test_db, batch_size=1, out_of_stock_days=90) == 1
+    assert archive.archive_batch(test_db, batch_size=10, out_of_stock_days=90) == 1
+    assert archive.archive_batch(test_db, batch_size=10, out_of_stock_days=90) == 0
+
+    assert [s.name for s in test_db.query(models.Sweet).order_by(models.Sweet.id)] == ["Barfi", "Rasgulla"]
+    archived = client.get("/api/archive/sweets", headers=headers).json()
+    assert [(a["sweet_id"], a["reason"], a["quantity"]) for a in archived] == [
+        (4, archive.DISCONTINUED, 7),
+        (2, archive.OUT_OF_STOCK, 0),
+    ]
+
+    # Delta-sync clients see both as deleted
+    changes = client.get(f"/api/sweets/changes?since={version}").json()
+    assert sorted(changes["deleted"]) == [2, 4]
+
+
+def test_restore_brings_a_sweet_back_under_its_old_id(client, test_db):
+    headers = get_token(client, test_db, "restorer@test.com")
+    sweet_id = client.post(
+        "/api/sweets/", json={"name": "Jalebi", "category": "Fried", "price": 1.0, "quantity": 6}, headers=headers
+    ).json()["id"]
+    assert client.post(f"/api/archive/sweets/{sweet_id}/restore", headers=headers).status_code == 409
+
+    # Discontinued, not archived yet
+    client.delete(f"/api/sweets/{sweet_id}", headers=headers)
+    response = client.post(f"/api/archive/sweets/{sweet_id}/restore", headers=headers)
+    assert response.status_code == 200 and response.json()["name"] == "Jalebi"
+
+    # Archived
+    client.delete(f"/api/sweets/{sweet_id}", headers=headers)
+    archive.archive_batch(test_db, batch_size=10, out_of_stock_days=0)
+    assert test_db.query(models.Sweet).count() == 0
+    response = client.post(f"/api/archive/sweets/{sweet_id}/restore", headers=headers)
+    assert response.json() == {"id": sweet_id, "name": "Jalebi", "category": "Fried", "price": 1.0,
+                               "quantity": 6, "image_url": None}
+    assert [s["id"] for s in client.get("/api/sweets/").json()] == [sweet_id]
+    assert client.get("/api/archive/sweets", headers=headers).json() == []
+
+    actions = [e["action"] for e in client.get(f"/api/audit/?sweet_id={sweet_id}", headers=headers).json()]
+    assert actions[0] == "restore"
+
+    assert client.post("/api/archive/sweets/999/restore", headers=headers).status_code == 404
+
+
+def test_archive_routes_are_admin_only(client, test_db):
+    headers = get_token(client, test_db, "shopper@test.com", admin=False)
+    assert client.get("/api/archive/sweets", headers=headers).status_code == 403
+    assert client.post("/api/archive/sweets/1/restore", headers=headers).status_code == 403
+
+
+def test_restored_sweet_keeps_its_id_and_restarts_its_out_of_stock_clock(client, test_db):
+    headers = get_token(client, test_db, "keeper@test.com")
+    test_db.add(models.Sweet(name="Peda", category="Milk", price=1.5, quantity=0, out_of_stock_since=days_ago(200)))
+    test_db.commit()
+    assert archive.archive_batch(test_db, batch_size=10, out_of_stock_days=90) == 1
+
+    # The archived id is not handed to a new sweet
+    new_id = client.post(
+        "/api/sweets/", json={"name": "Barfi", "category": "Milk", "price": 2.0, "quantity": 3}, headers=headers
+    ).json()["id"]
+    assert new_id == 2
+    assert client.post("/api/archive/sweets/1/restore", headers=headers).status_code == 200
+
+    # Still out of stock, but only since the restore
+    restored = test_db.get(models.Sweet, 1)
+    test_db.refresh(restored)
+    assert restored.out_of_stock_since > days_ago(1)
+    assert archive.archive_batch(test_db, batch_size=10, out_of_stock_days=90) == 0
+
+
+def test_archiver_prunes_the_sales_ledger(client, test_db, monkeypatch):
+    monkeypatch.setattr(archive, "_sales_pruned_on", {})
+    today = sales.today()
+    test_db.add_all([
+        models.Sweet(name="Barfi", category="Milk", price=2.0, quantity=4),
+        models.Sweet(name="Peda", category="Milk", price=1.5, quantity=3, discontinued_at=days_ago(1)),
+        models.SweetDailySales(sweet_id=1, day=today, units=2),
+        models.SweetDailySales(sweet_id=1, day=today - 365, units=2),
+        models.SweetDailySales(sweet_id=2, day=today, units=1),
+    ])
+    test_db.commit()
+
+    result = archive.run(batch_size=10, out_of_stock_days=90, batch_sleep=0)
+    assert result["archived"] == 1 and result["sales_pruned"] == 1
+    test_db.expire_all()
+    assert [(r.sweet_id, r.day) for r in test_db.query(models.SweetDailySales)] == [(1, today)]
+    # Once a day
+    assert archive.run(batch_size=10, out_of_stock_days=90, batch_sleep=0)["sales_pruned"] == 0
+
+
+def test_sweet_sold_out_through_stock_slots_is_archived(client, test_db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "inventory_slots", 4)
+    headers = get_token(client, test_db, "slots@test.com")
+    client.post("/api/sweets/", json={"name": "Promo Barfi", "category": "Milk", "price": 2.0, "quantity": 2},
+                headers=headers)
+    client.post("/api/sweets/1/purchase", headers=headers)
+    assert test_db.get(models.Sweet, 1).out_of_stock_since is None
+    client.post("/api/sweets/1/purchase", headers=headers)
+
+    test_db.expire_all()
+    sweet = test_db.get(models.Sweet, 1)
+    assert sweet.quantity == 0 and sweet.out_of_stock_since is not None
+    test_db.execute(update(models.Sweet).where(models.Sweet.id == 1).values(out_of_stock_since=days_ago(200)))
+    test_db.commit()
+    assert archive.archive_batch(test_db, batch_size=10, out_of_stock_days=90) == 1
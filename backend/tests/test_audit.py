@@ -0,0 +1,85 @@
+# backend/tests/test_audit.py
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.audit import AuditLog
+from app.database import Base
+
+
+def get_token(client, test_db, email, admin=False):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    if admin:
+        user = test_db.query(models.User).filter(models.User.email == email).first()
+        user.is_admin = True
+        test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def test_admin_changes_are_audited(client, test_db):
+    headers = {"Authorization": f"Bearer {get_token(client, test_db, 'auditor@test.com', admin=True)}"}
+
+    sweet_id = client.post(
+        "/api/sweets",
+        json={"name": "Kulfi", "category": "Frozen", "price": 2.0, "quantity": 5},
+        headers=headers
+    ).json()["id"]
+    # Another spelling of the same category is no change
+    client.put(f"/api/sweets/{sweet_id}", json={"price": 2.5, "category": " FROZEN "}, headers=headers)
+    client.post(f"/api/sweets/{sweet_id}/restock", json={"amount": 3}, headers=headers)
+    client.delete(f"/api/sweets/{sweet_id}", headers=headers)
+
+    response = client.get("/api/audit/", headers=headers)
+    assert response.status_code == 200
+    entries = response.json()
+    assert [e["action"] for e in entries] == ["delete", "restock", "update", "create"]
+    assert all(e["actor_email"] == "auditor@test.com" and e["sweet_id"] == sweet_id for e in entries)
+
+    delete, restock, update, create = entries
+    # Only the fields that actually changed
+    assert (update["before"], update["after"]) == ({"price": 2.0}, {"price": 2.5})
+    assert (restock["before"], restock["after"]) == ({"quantity": 5}, {"quantity": 8})
+    assert create["before"] is None and create["after"]["name"] == "Kulfi"
+    assert delete["before"]["quantity"] == 8 and delete["after"] is None
+
+    page = client.get("/api/audit/?action=update&limit=1", headers=headers).json()
+    assert [e["id"] for e in page] == [update["id"]]
+    assert client.get("/api/audit/?skip=4", headers=headers).json() == []
+
+
+def test_audit_log_requires_admin(client, test_db):
+    headers = {"Authorization": f"Bearer {get_token(client, test_db, 'curious@test.com')}"}
+    assert client.get("/api/audit/", headers=headers).status_code == 403
+
+
+def test_background_writer_batches_and_flushes_on_shutdown(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine)
+    actor = models.User(id=1, email="batch@test.com")
+
+    log = AuditLog(sessionmaker(bind=engine), batch_size=50)
+    for i in range(120):
+        assert log.record(actor, "restock", i, before={"quantity": i}, after={"quantity": i + 1})
+    log.shutdown()
+
+    assert log.stats()["written"] == 120 and not log.stats()["writer_alive"]
+    with sessionmaker(bind=engine)() as db:
+        assert db.query(models.AuditEntry).count() == 120
+    engine.dispose()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    actor = models.User(id=1, email="burst@test.com")
+    log = AuditLog(lambda: None, max_queue=2)
+    # Hold the writer back so the queue fills up
+    log._ensure_writer = lambda: None
+
+    results = [log.record(actor, "update", 1) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert log.stats()["dropped"] == 1 and log.stats()["queued"] == 2
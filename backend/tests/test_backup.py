@@ -0,0 +1,80 @@
+# backend/tests/test_backup.py
+import gzip
+import sqlite3
+
+import pytest
+
+from app import backup, models
+from app.config import get_settings
+
+
+@pytest.fixture
+def live_db(tmp_path, monkeypatch):
+    path = tmp_path / "live.db"
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE sweets (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO sweets (name) VALUES (?)", [(f"Sweet {i}",) for i in range(2000)])
+    conn.commit()
+    conn.close()
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{path}")
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path / "backups"))
+    monkeypatch.setattr(settings, "backup_pages_per_step", 4)
+    monkeypatch.setattr(settings, "backup_step_sleep_ms", 0)
+    return path
+
+
+def count_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        return conn.execute("SELECT COUNT(*) FROM sweets").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_copies_in_steps_compresses_and_prunes(live_db, tmp_path):
+    results = [backup.run_backup(keep=2) for _ in range(3)]
+
+    assert results[0].steps > 1 and results[0].compressed
+    kept = backup.list_backups(str(tmp_path / "backups"), "sweetshop")
+    assert kept == [r.path for r in results[1:]]
+
+    restored = tmp_path / "restored.db"
+    restored.write_bytes(gzip.open(kept[-1]).read())
+    assert count_rows(restored) == 2000
+
+
+def test_snapshot_is_swapped_in_at_a_fixed_path(live_db, tmp_path):
+    snapshot = tmp_path / "snapshots" / "catalog.db"
+    backup.write_snapshot(str(snapshot))
+
+    conn = sqlite3.connect(live_db)
+    conn.execute("DELETE FROM sweets WHERE id > 10")
+    conn.commit()
+    conn.close()
+    assert count_rows(snapshot) == 2000
+
+    backup.write_snapshot(str(snapshot))
+    assert count_rows(snapshot) == 10
+
+
+def test_backup_endpoint_runs_in_background(client, test_db, live_db, tmp_path):
+    client.post("/api/auth/register", json={"email": "ops@test.com", "password": "pass"})
+    user = test_db.query(models.User).filter(models.User.email == "ops@test.com").first()
+    user.is_admin = True
+    test_db.commit()
+    token = client.post(
+        "/api/auth/login",
+        data={"username": "ops@test.com", "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.post("/api/ops/backup", headers=headers).status_code == 202
+    # TestClient runs background tasks before returning
+    last = client.get("/api/ops/backup", headers=headers).json()["last"]
+    assert last["ok"] and last["path"].endswith(".db.gz")
+    assert backup.list_backups(str(tmp_path / "backups"), "sweetshop") == [last["path"]]
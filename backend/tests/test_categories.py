@@ -0,0 +1,127 @@
+# backend/tests/test_categories.py
+from sqlalchemy import insert
+
+from app import categories, models, queries
+from tests.conftest import engine
+
+
+def get_token(client, test_db, email="categories@test.com"):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    user = test_db.query(models.User).filter(models.User.email == email).first()
+    user.is_admin = True
+    test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+
+def create(client, headers, name, category):
+    return client.post(
+        "/api/sweets/", json={"name": name, "category": category, "price": 1.0, "quantity": 5}, headers=headers
+    ).json()
+
+
+def test_spellings_share_one_category(client, test_db):
+    headers = get_token(client, test_db)
+    first = create(client, headers, "Dark Bar", "Chocolate")
+    second = create(client, headers, "Milk Bar", "  chocolate ")
+    create(client, headers, "Cola Bottles", "Gummy")
+
+    # Responses keep the category name, spelled the way the category was first created
+    assert first["category"] == second["category"] == "Chocolate"
+    assert test_db.query(models.Category).count() == 2
+    assert client.get("/api/sweets/categories").json() == [
+        {"id": 1, "name": "Chocolate"},
+        {"id": 2, "name": "Gummy"},
+    ]
+
+    client.put(f"/api/sweets/{second['id']}", json={"category": "GUMMY"}, headers=headers)
+    sweet = test_db.get(models.Sweet, second["id"])
+    test_db.refresh(sweet)
+    assert (sweet.category, sweet.category_id) == ("Gummy", 2)
+
+
+def test_search_by_name_and_by_id(client, test_db):
+    headers = get_token(client, test_db, "filters@test.com")
+    create(client, headers, "Dark Bar", "Chocolate")
+    create(client, headers, "Cocoa Nibs", "Hot Chocolate")
+    create(client, headers, "Cola Bottles", "Gummy")
+
+    def search(query):
+        return sorted(s["name"] for s in client.get(f"/api/sweets/search?{query}").json())
+
+    # An exact name picks that category only; anything else matches as part of a name
+    assert search("category=chocolate") == ["Dark Bar"]
+    assert search("category=choc") == ["Cocoa Nibs", "Dark Bar"]
+    assert search("category_id=3") == ["Cola Bottles"]
+    assert search("category=choc&category_id=2") == ["Cocoa Nibs"]
+    assert search("category=toffee") == []
+
+
+def test_category_filter_uses_the_integer_key():
+    stmt, params = queries.search_statement(category_ids=[1, 2])
+    assert "category_id IN" in str(stmt) and "ILIKE" not in str(stmt).upper()
+    assert params == {"category_ids": [1, 2]}
+
+
+def test_new_categories_are_seen_after_commit(client, test_db):
+    headers = get_token(client, test_db, "cache@test.com")
+    create(client, headers, "Dark Bar", "Chocolate")
+    assert [c["name"] for c in client.get("/api/sweets/categories").json()] == ["Chocolate"]
+
+    create(client, headers, "Lokum", "Turkish Delight")
+    assert [c["name"] for c in client.get("/api/sweets/categories").json()] == ["Chocolate", "Turkish Delight"]
+
+
+def test_link_all_dedupes_bulk_loaded_rows(test_db):
+    with engine.begin() as conn:
+        conn.execute(insert(models.Sweet), [
+            {"name": "A", "category": "hard candy", "price": 1.0, "quantity": 1},
+            {"name": "B", "category": "Hard Candy", "price": 1.0, "quantity": 1},
+            {"name": "C", "category": "Hard  Candy", "price": 1.0, "quantity": 1},
+            {"name": "D", "category": "Hard Candy", "price": 1.0, "quantity": 1},
+            {"name": "E", "category": "Mints", "price": 1.0, "quantity": 1},
+        ])
+        assert categories.link_all(conn) == 5
+        assert categories.link_all(conn) == 0
+
+    rows = test_db.query(models.Sweet.category, models.Sweet.category_id).order_by(models.Sweet.name).all()
+    assert [tuple(row) for row in rows] == [("Hard Candy", 1)] * 4 + [("Mints", 2)]
+    assert [c.name for c in test_db.query(models.Category).order_by(models.Category.id)] == ["Hard Candy", "Mints"]
+
+
+class MissedLookup:
+    def first(self):
+        return None
+
+
+class RacingConnection:
+    """Misses the first lookup, as if another writer created the category right after it."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.raced = False
+
+    def execute(self, statement, *args):
+        if not self.raced:
+            self.raced = True
+            return MissedLookup()
+        return self.connection.execute(statement, *args)
+
+    def begin_nested(self):
+        return self.connection.begin_nested()
+
+
+def test_category_created_concurrently_is_reused(test_db):
+    test_db.add(models.Category(name="Toffee", key="toffee"))
+    test_db.commit()
+
+    assert categories.ensure(RacingConnection(test_db.connection()), "TOFFEE ") == (1, "Toffee", False)
+    # The failed insert only rolled back its savepoint
+    test_db.add(models.Sweet(name="Butterscotch", category="toffee", price=1.0, quantity=2))
+    test_db.commit()
+    assert [(s.category, s.category_id) for s in test_db.query(models.Sweet)] == [("Toffee", 1)]
+    assert test_db.query(models.Category).count() == 1
@@ -0,0 +1,77 @@
+# backend/tests/test_changefeed.py
+from datetime import timedelta
+
+from app import changefeed, models
+
+
+def get_token(client, test_db, email="sync@test.com", admin=False):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    if admin:
+        user = test_db.query(models.User).filter(models.User.email == email).first()
+        user.is_admin = True
+        test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+
+def test_changes_since_returns_only_changed_sweets(client, test_db):
+    test_db.add_all([
+        models.Sweet(name=f"Sweet {i}", category="Mix", price=1.0, quantity=5) for i in range(20)
+    ])
+    test_db.commit()
+    headers = get_token(client, test_db)
+
+    version = client.get("/api/sweets/changes").json()["version"]
+    assert client.get(f"/api/sweets/changes?since={version}").json() == {
+        "version": version, "upserted": [], "deleted": [], "has_more": False
+    }
+
+    client.post("/api/sweets/3/purchase", headers=headers)
+    client.post("/api/sweets/3/purchase", headers=headers)
+    body = client.get(f"/api/sweets/changes?since={version}").json()
+
+    assert [(s["id"], s["quantity"]) for s in body["upserted"]] == [(3, 3)]
+    assert body["deleted"] == [] and body["version"] > version
+
+
+def test_deletes_are_sent_as_tombstones_and_pages_resume(client, test_db):
+    admin = get_token(client, test_db, "sync-admin@test.com", admin=True)
+    ids = [
+        client.post("/api/sweets/", json={"name": name, "category": "Mix", "price": 1.0, "quantity": 1},
+                    headers=admin).json()["id"]
+        for name in ("Barfi", "Peda", "Jalebi")
+    ]
+    client.delete(f"/api/sweets/{ids[0]}", headers=admin)
+
+    first = client.get("/api/sweets/changes?since=0&limit=2").json()
+    assert first["has_more"] and [s["name"] for s in first["upserted"]] == ["Peda", "Jalebi"]
+    second = client.get(f"/api/sweets/changes?since={first['version']}&limit=2").json()
+    assert not second["has_more"] and second["upserted"] == [] and second["deleted"] == [ids[0]]
+
+
+def test_compaction_drops_old_rows_and_requires_resync_behind_the_floor(client, test_db):
+    admin = get_token(client, test_db, "compact@test.com", admin=True)
+    sweet_id = client.post("/api/sweets/", json={"name": "Ladoo", "category": "Mix", "price": 1.0, "quantity": 9},
+                           headers=admin).json()["id"]
+    for _ in range(3):
+        client.post(f"/api/sweets/{sweet_id}/restock", json={"amount": 1}, headers=admin)
+    client.delete(f"/api/sweets/{sweet_id}", headers=admin)
+    version = client.get("/api/sweets/changes").json()["version"]
+
+    result = changefeed.compact(test_db, retention=timedelta(0))
+    assert result == {"superseded": 4, "tombstones": 1, "floor": version}
+    assert test_db.query(models.SweetChange).count() == 0
+
+    response = client.get("/api/sweets/changes?since=0")
+    assert response.status_code == 410
+    assert response.headers["x-catalog-version"] == str(version)
+    assert client.get(f"/api/sweets/changes?since={version}").json()["upserted"] == []
+
+    # Versions keep increasing after the log was emptied
+    client.post("/api/sweets/", json={"name": "Halwa", "category": "Mix", "price": 1.0, "quantity": 1},
+                headers=admin)
+    assert client.get("/api/sweets/changes").json()["version"] > version
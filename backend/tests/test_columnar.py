@@ -0,0 +1,115 @@
+# backend/tests/test_columnar.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from app import changefeed, models
+from app.config import get_settings
+
+np = pytest.importorskip("numpy")
+
+from app.columnar import ColumnarCatalog, get_catalog  # noqa: E402
+
+
+@pytest.fixture
+def columnar(monkeypatch):
+    monkeypatch.setattr(get_settings(), "catalog_engine", "columnar")
+    get_catalog().reset()
+    yield get_catalog()
+    get_catalog().reset()
+
+
+def get_admin_token(client, test_db, email="columnar_admin@test.com"):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    user = test_db.query(models.User).filter(models.User.email == email).first()
+    user.is_admin = True
+    test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def seed(test_db):
+    test_db.add_all([
+        models.Sweet(name="Dark Chocolate", category="Chocolate", price=3.0, quantity=5),
+        models.Sweet(name="Milk Chocolate", category="Chocolate", price=2.0, quantity=0),
+        models.Sweet(name="Chocolate Fudge", category="Fudge", price=4.5, quantity=7),
+        models.Sweet(name="Lemon Drop", category="Hard Candy", price=0.5, quantity=20),
+    ])
+    test_db.commit()
+
+
+@pytest.mark.parametrize("params", [
+    "q=chocolate",
+    "category=CHOC",
+    "price_min=1&price_max=4",
+    "in_stock=true&sort=-price",
+    "in_stock=false",
+    "sort=name&skip=1&limit=2",
+    "q=o&category=c&sort=quantity",
+])
+def test_columnar_matches_sql_engine(client, test_db, monkeypatch, params):
+    seed(test_db)
+    expected = client.get(f"/api/sweets/search?{params}").json()
+
+    monkeypatch.setattr(get_settings(), "catalog_engine", "columnar")
+    get_catalog().reset()
+    try:
+        actual = client.get(f"/api/sweets/search?{params}").json()
+    finally:
+        get_catalog().reset()
+
+    if "sort" in params:
+        assert actual == expected
+    else:
+        assert sorted(actual, key=lambda s: s["id"]) == sorted(expected, key=lambda s: s["id"])
+
+
+def test_columnar_follows_catalog_mutations(client, test_db, columnar):
+    seed(test_db)
+    headers = {"Authorization": f"Bearer {get_admin_token(client, test_db)}"}
+    assert len(client.get("/api/sweets/search?q=choc").json()) == 3
+    assert columnar.loaded
+
+    created = client.post(
+        "/api/sweets",
+        json={"name": "White Chocolate", "category": "Chocolate", "price": 2.5, "quantity": 3},
+        headers=headers,
+    ).json()
+    client.put(f"/api/sweets/{created['id']}", json={"name": "Ivory Choc"}, headers=headers)
+    client.delete("/api/sweets/1", headers=headers)
+
+    names = [s["name"] for s in client.get("/api/sweets/search?q=choc&sort=name").json()]
+    assert names == ["Chocolate Fudge", "Ivory Choc", "Milk Chocolate"]
+
+
+def test_columnar_picks_up_other_workers_changes(client, test_db, columnar, monkeypatch):
+    monkeypatch.setattr(get_settings(), "catalog_sync_seconds", 0)
+    seed(test_db)
+    assert len(client.get("/api/sweets/search?q=choc").json()) == 3
+
+    # Written by another worker: this process only sees it through the change feed
+    test_db.execute(update(models.Sweet).where(models.Sweet.id == 3).values(name="Vanilla Fudge"))
+    test_db.execute(update(models.Sweet).where(models.Sweet.id == 1).values(discontinued_at=datetime(2026, 1, 1)))
+    changefeed.mark_changed(test_db, 3)
+    changefeed.mark_deleted(test_db, [1])
+    test_db.commit()
+
+    assert [s["name"] for s in client.get("/api/sweets/search?q=choc").json()] == ["Milk Chocolate"]
+
+
+def test_tombstones_are_compacted():
+    catalog = ColumnarCatalog()
+    catalog.load([(i, f"Sweet {i}", "Cat", float(i), i, None) for i in range(1, 9)])
+    catalog.apply_changes([], [1, 2, 3])
+    stats = catalog.stats()
+    assert stats["rows"] == 5 and stats["tombstones"] == 0
+
+    catalog.apply_changes([{"id": 9, "name": "Sweet 9", "category": "New", "price": 9.0,
+                            "quantity": 0, "image_url": None}], [])
+    assert [s["id"] for s in catalog.search(price_min=7)] == [7, 8, 9]
+    assert [s["id"] for s in catalog.search(in_stock=False)] == [9]
@@ -0,0 +1,40 @@
+# backend/tests/test_datagen.py
+import collections
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.datagen import DatasetSpec, build, generate_purchases, generate_sweets
+
+
+def test_same_seed_same_dataset():
+    spec = DatasetSpec(sweets=500, users=20, purchases=200, seed=7)
+    assert list(generate_sweets(spec)) == list(generate_sweets(spec))
+    assert list(generate_purchases(spec)) == list(generate_purchases(spec))
+    assert list(generate_sweets(spec)) != list(generate_sweets(DatasetSpec(sweets=500, seed=8)))
+
+
+def test_purchases_are_zipf_skewed():
+    spec = DatasetSpec(sweets=1000, users=50, purchases=20_000, seed=1)
+    counts = collections.Counter(p["sweet_id"] for p in generate_purchases(spec))
+    top_ten = sum(count for _, count in counts.most_common(10))
+    # With s=1.1 the 10 best sellers (1% of the catalog) take well over a third of sales
+    assert top_ten / spec.purchases > 0.35
+
+
+def test_build_writes_sqlite_file(tmp_path):
+    path = str(tmp_path / "bench.db")
+    report = build(path, DatasetSpec(sweets=300, users=5, purchases=100))
+    assert report["sweets"]["rows"] == 300
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        counts = [
+            conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            for table in ("sweets", "users", "dataset_purchases")
+        ]
+        admins = conn.execute(text("SELECT email FROM users WHERE is_admin")).scalars().all()
+        indexes = conn.execute(text("SELECT name FROM sqlite_master WHERE type='index'")).scalars().all()
+    engine.dispose()
+    assert counts == [300, 5, 100]
+    assert admins == ["admin@example.com"]
+    assert "ix_sweets_name" in indexes
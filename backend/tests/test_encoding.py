@@ -0,0 +1,56 @@
+# backend/tests/test_encoding.py
+import pytest
+
+from app import encoding, models, queries
+
+
+@pytest.fixture
+def catalog(test_db):
+    test_db.add_all([
+        models.Sweet(name="Barfi", category="Milk", price=2.0, quantity=4, image_url="/media/barfi.webp"),
+        models.Sweet(name="Peda", category="Milk", price=1.5, quantity=0, image_url="/media/peda.webp"),
+    ])
+    test_db.commit()
+
+
+def test_fields_narrow_the_select():
+    stmt, _ = queries.search_statement(q="barfi", columns=encoding.parse_fields("name,price"))
+    sql = str(stmt)
+    assert "sweets.name" in sql and "sweets.price" in sql and "sweets.id" in sql
+    assert "image_url" not in sql and "category" not in sql
+
+
+def test_list_and_search_with_fields(client, catalog):
+    response = client.get("/api/sweets/?fields=name,quantity")
+    assert response.json() == [
+        {"id": 1, "name": "Barfi", "quantity": 4},
+        {"id": 2, "name": "Peda", "quantity": 0},
+    ]
+
+    response = client.get("/api/sweets/search?in_stock=true&fields=price")
+    assert response.json() == [{"id": 1, "price": 2.0}]
+
+    assert client.get("/api/sweets/?fields=name,secret").status_code == 400
+    # Without fields the response is unchanged, but still varies with Accept
+    plain = client.get("/api/sweets/")
+    assert plain.json()[0]["image_url"] == "/media/barfi.webp"
+    assert "Accept" in plain.headers["vary"]
+    assert "Accept" in client.get("/api/sweets/search?q=peda").headers["vary"]
+
+
+def test_column_layout_is_negotiated(client, catalog):
+    response = client.get(
+        "/api/sweets/search?sort=price&fields=name,price",
+        headers={"Accept": encoding.COLUMNS_JSON},
+    )
+    assert response.headers["content-type"].startswith(encoding.COLUMNS_JSON)
+    assert "Accept" in response.headers["vary"]
+    assert response.json() == {"id": [2, 1], "name": ["Peda", "Barfi"], "price": [1.5, 2.0]}
+
+
+def test_msgpack_encoding(client, catalog):
+    msgpack = pytest.importorskip("msgpack")
+
+    response = client.get("/api/sweets/?fields=name", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == encoding.MSGPACK
+    assert msgpack.unpackb(response.content) == {"id": [1, 2], "name": ["Barfi", "Peda"]}
@@ -0,0 +1,104 @@
+# backend/tests/test_idempotency.py
+import asyncio
+
+from app import models
+from app.idempotency import IdempotencyMiddleware, ResponseCache, get_response_cache
+
+
+def get_token(client, email):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def test_purchase_retry_is_replayed_not_repeated(client, test_db):
+    token = get_token(client, "retry@test.com")
+    sweet = models.Sweet(name="Retry Me", category="Treat", price=1.0, quantity=5)
+    test_db.add(sweet)
+    test_db.commit()
+    test_db.refresh(sweet)
+
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "purchase-1"}
+    first = client.post(f"/api/sweets/{sweet.id}/purchase", headers=headers)
+    retry = client.post(f"/api/sweets/{sweet.id}/purchase", headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json() == {"message": "Purchase successful", "remaining_quantity": 4}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+    # A new key is a new purchase
+    other = client.post(
+        f"/api/sweets/{sweet.id}/purchase",
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "purchase-2"}
+    )
+    assert other.json()["remaining_quantity"] == 3
+
+    updated = test_db.query(models.Sweet).filter(models.Sweet.id == sweet.id).first()
+    assert updated.quantity == 3
+
+
+def test_key_reuse_with_different_body_is_rejected(client, test_db):
+    token = get_token(client, "idem_admin@test.com")
+    user = test_db.query(models.User).filter(models.User.email == "idem_admin@test.com").first()
+    user.is_admin = True
+    test_db.commit()
+    sweet = models.Sweet(name="Restock Me", category="Treat", price=1.0, quantity=1)
+    test_db.add(sweet)
+    test_db.commit()
+    test_db.refresh(sweet)
+
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "restock-1"}
+    first = client.post(f"/api/sweets/{sweet.id}/restock", json={"amount": 10}, headers=headers)
+    assert first.json()["quantity"] == 11
+
+    reused = client.post(f"/api/sweets/{sweet.id}/restock", json={"amount": 99}, headers=headers)
+    assert reused.status_code == 422
+
+    # The stored response survives a cold in-memory cache (served from the table)
+    get_response_cache().clear()
+    again = client.post(f"/api/sweets/{sweet.id}/restock", json={"amount": 10}, headers=headers)
+    assert again.json()["quantity"] == 11
+    assert again.headers["idempotent-replayed"] == "true"
+
+
+def test_concurrent_duplicates_execute_once(client):
+    calls = []
+
+    async def slow_app(scope, receive, send):
+        calls.append(scope["path"])
+        await asyncio.sleep(0.05)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"ok": true}'})
+
+    middleware = IdempotencyMiddleware(slow_app, cache=ResponseCache(10, 60))
+
+    async def request():
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/sweets/1/purchase",
+            "headers": [(b"idempotency-key", b"same"), (b"authorization", b"Bearer t")],
+        }
+        await middleware(scope, receive, send)
+        return sent
+
+    async def scenario():
+        return await asyncio.gather(request(), request(), request())
+
+    results = asyncio.run(scenario())
+    assert calls == ["/api/sweets/1/purchase"]
+    assert all(sent[0]["status"] == 200 and sent[1]["body"] == b'{"ok": true}' for sent in results)
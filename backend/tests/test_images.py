@@ -0,0 +1,100 @@
+# backend/tests/test_images.py
+import io
+
+import pytest
+
+from app import models
+from app.config import get_settings
+
+
+def get_admin_token(client, test_db, email="images_admin@test.com"):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    user = test_db.query(models.User).filter(models.User.email == email).first()
+    user.is_admin = True
+    test_db.commit()
+
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def make_png(width=600, height=300):
+    Image = pytest.importorskip("PIL.Image")
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 90)).save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "media_root", str(tmp_path))
+    return tmp_path
+
+
+def test_upload_is_content_addressed_with_thumbnails(client, test_db, media_root):
+    token = get_admin_token(client, test_db)
+    headers = {"Authorization": f"Bearer {token}"}
+    png = make_png()
+
+    response = client.post("/api/images", files={"file": ("whatever.jpg", png, "image/jpeg")}, headers=headers)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["url"] == f"/media/{data['sha256']}.png"
+    assert sorted(data["thumbnails"]) == ["160", "480"]
+
+    # Same bytes, same address
+    again = client.post("/api/images", files={"file": ("copy.png", png, "image/png")}, headers=headers)
+    assert again.json() == data
+
+    # Thumbnails are real, resized images
+    thumb = client.get(data["thumbnails"]["160"])
+    assert thumb.status_code == 200
+    from PIL import Image
+    assert Image.open(io.BytesIO(thumb.content)).size == (160, 80)
+
+
+def test_served_images_are_immutable_and_revalidate(client, test_db, media_root):
+    token = get_admin_token(client, test_db)
+    png = make_png(10, 10)
+    url = client.post(
+        "/api/images", files={"file": ("a.png", png, "image/png")}, headers={"Authorization": f"Bearer {token}"}
+    ).json()["url"]
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == png
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+    revalidate = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidate.status_code == 304
+    assert revalidate.content == b""
+
+    assert client.get("/media/../../etc/passwd").status_code == 404
+    assert client.get("/media/" + "0" * 64 + ".png").status_code == 404
+
+
+def test_upload_rejects_non_images_and_non_admins(client, test_db, media_root):
+    token = get_admin_token(client, test_db)
+    response = client.post(
+        "/api/images",
+        files={"file": ("evil.png", b"<script>alert(1)</script>", "image/png")},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 400
+
+    client.post("/api/auth/register", json={"email": "plain@test.com", "password": "pass"})
+    user_token = client.post(
+        "/api/auth/login",
+        data={"username": "plain@test.com", "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    ).json()["access_token"]
+    response = client.post(
+        "/api/images",
+        files={"file": ("a.png", b"\x89PNG\r\n\x1a\n", "image/png")},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert response.status_code == 403
@@ -0,0 +1,36 @@
+# backend/tests/test_import_users.py
+from app import models
+from app.auth import verify_password
+from scripts.import_users import import_users
+
+
+def test_import_skips_existing_duplicate_and_invalid_rows(test_db):
+    test_db.add(models.User(email="old@test.com", hashed_password="x"))
+    test_db.commit()
+
+    rows = [
+        {"email": "staff@test.com", "password": "s3cret", "role": "admin"},
+        {"email": "buyer@test.com", "password": "pw"},
+        {"email": "staff@test.com", "password": "other", "role": "user"},
+        {"email": "old@test.com", "password": "pw"},
+        {"email": "not-an-email", "password": "pw"},
+        {"email": "nobody@test.com", "password": "pw", "role": "owner"},
+    ]
+    report = import_users(test_db, rows, workers=1, batch_size=1)
+
+    assert (report.read, report.inserted, report.existing, report.duplicates) == (6, 2, 1, 1)
+    assert len(report.invalid) == 2
+
+    staff = test_db.query(models.User).filter(models.User.email == "staff@test.com").one()
+    assert staff.is_admin and staff.is_active
+    assert verify_password("s3cret", staff.hashed_password)
+
+    # Re-running the same file is a no-op
+    again = import_users(test_db, rows, workers=1)
+    assert (again.inserted, again.existing) == (0, 3)
+
+
+def test_dry_run_writes_nothing(test_db):
+    report = import_users(test_db, [{"email": "dry@test.com", "password": "pw"}], dry_run=True)
+    assert (report.new, report.inserted) == (1, 0)
+    assert test_db.query(models.User).count() == 0
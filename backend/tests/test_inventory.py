@@ -0,0 +1,111 @@
+# backend/tests/test_inventory.py
+import pytest
+
+from app import inventory, models
+from app.config import get_settings
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(get_settings(), "inventory_slots", 4)
+
+
+def get_token(client, test_db, email, admin=False):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    if admin:
+        user = test_db.query(models.User).filter(models.User.email == email).first()
+        user.is_admin = True
+        test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def test_split_spreads_evenly():
+    assert inventory.split(10, 4) == [3, 3, 2, 2]
+    assert inventory.split(2, 4) == [1, 1, 0, 0]
+    assert inventory.split(0, 3) == [0, 0, 0]
+
+
+def test_sharded_purchase_drains_all_slots(client, test_db, sharded):
+    admin = {"Authorization": f"Bearer {get_token(client, test_db, 'shard_admin@test.com', admin=True)}"}
+    buyer = {"Authorization": f"Bearer {get_token(client, test_db, 'shard_buyer@test.com')}"}
+
+    sweet_id = client.post(
+        "/api/sweets",
+        json={"name": "Promo Fudge", "category": "Fudge", "price": 1.0, "quantity": 6},
+        headers=admin
+    ).json()["id"]
+    slots = test_db.query(models.SweetStockSlot).filter(models.SweetStockSlot.sweet_id == sweet_id).all()
+    assert sorted(s.quantity for s in slots) == [1, 1, 2, 2]
+
+    remaining = [
+        client.post(f"/api/sweets/{sweet_id}/purchase", headers=buyer).json()["remaining_quantity"]
+        for _ in range(6)
+    ]
+    assert remaining == [5, 4, 3, 2, 1, 0]
+
+    sold_out = client.post(f"/api/sweets/{sweet_id}/purchase", headers=buyer)
+    assert sold_out.status_code == 400
+    assert sold_out.json()["detail"] == "Out of stock"
+    assert client.get("/api/sweets").json()[0]["quantity"] == 0
+
+    restocked = client.post(f"/api/sweets/{sweet_id}/restock", json={"amount": 5}, headers=admin)
+    assert restocked.json()["quantity"] == 5
+    assert client.get("/api/sweets/search?q=Promo").json()[0]["quantity"] == 5
+
+
+def test_empty_slot_is_refilled_from_fullest(client, test_db, sharded):
+    sweet = models.Sweet(name="Legacy Toffee", category="Toffee", price=1.0, quantity=3)
+    test_db.add(sweet)
+    test_db.commit()
+    test_db.add_all([
+        models.SweetStockSlot(sweet_id=sweet.id, slot=i, quantity=q) for i, q in enumerate([0, 0, 0, 3])
+    ])
+    test_db.commit()
+
+    for expected in (2, 1, 0):
+        assert inventory.purchase(test_db, sweet) == expected
+        test_db.commit()
+    assert inventory.purchase(test_db, sweet) is None
+
+
+def test_existing_sweets_get_slots_on_first_purchase(client, test_db, sharded):
+    sweet = models.Sweet(name="Old Stock", category="Hard", price=1.0, quantity=8)
+    test_db.add(sweet)
+    test_db.commit()
+
+    assert inventory.purchase(test_db, sweet) == 7
+    test_db.commit()
+    assert test_db.query(models.SweetStockSlot).filter(models.SweetStockSlot.sweet_id == sweet.id).count() == 4
+
+
+@pytest.mark.parametrize("engine", ["sql", "columnar"])
+def test_search_reads_slot_totals(client, test_db, sharded, monkeypatch, request, engine):
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+        from app.columnar import get_catalog
+
+        monkeypatch.setattr(get_settings(), "catalog_engine", "columnar")
+        monkeypatch.setattr(get_settings(), "catalog_sync_seconds", 0)
+        get_catalog().reset()
+        request.addfinalizer(get_catalog().reset)
+    admin = {"Authorization": f"Bearer {get_token(client, test_db, 'stock_admin@test.com', admin=True)}"}
+    buyer = {"Authorization": f"Bearer {get_token(client, test_db, 'stock_buyer@test.com')}"}
+    for name, quantity in (("Hot Fudge", 2), ("Slow Fudge", 3)):
+        client.post("/api/sweets", json={"name": name, "category": "Fudge", "price": 1.0, "quantity": quantity},
+                    headers=admin)
+    client.get("/api/sweets/search")
+
+    for _ in range(2):
+        client.post("/api/sweets/1/purchase", headers=buyer)
+    in_stock = client.get("/api/sweets/search?in_stock=true").json()
+    assert [(s["name"], s["quantity"]) for s in in_stock] == [("Slow Fudge", 3)]
+
+    client.post("/api/sweets/2/purchase", headers=buyer)
+    client.post("/api/sweets/1/restock", json={"amount": 4}, headers=admin)
+    by_stock = client.get("/api/sweets/search?sort=-quantity").json()
+    assert [(s["name"], s["quantity"]) for s in by_stock] == [("Hot Fudge", 4), ("Slow Fudge", 2)]
@@ -0,0 +1,62 @@
+# backend/tests/test_online_migration.py
+from sqlalchemy import text
+
+from app import models, online_migration
+from tests.conftest import engine
+
+
+def get_admin_token(client, test_db, email="cents_admin@test.com"):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    user = test_db.query(models.User).filter(models.User.email == email).first()
+    user.is_admin = True
+    test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def test_orm_writes_dual_write_price_cents(client, test_db):
+    headers = {"Authorization": f"Bearer {get_admin_token(client, test_db)}"}
+    sweet_id = client.post(
+        "/api/sweets",
+        json={"name": "Penny Chew", "category": "Chews", "price": 0.29, "quantity": 1},
+        headers=headers,
+    ).json()["id"]
+    assert test_db.get(models.Sweet, sweet_id).price_cents == 29
+
+    client.put(f"/api/sweets/{sweet_id}", json={"price": 1.1}, headers=headers)
+    assert test_db.get(models.Sweet, sweet_id).price_cents == 110
+
+
+def test_backfill_runs_in_resumable_chunks(test_db):
+    test_db.add_all(
+        models.Sweet(name=f"Old {i}", category="Legacy", price=0.01 * i + 0.1, quantity=1)
+        for i in range(10)
+    )
+    test_db.commit()
+    test_db.execute(text("UPDATE sweets SET price_cents = NULL"))
+    test_db.commit()
+
+    with engine.connect() as connection:
+        first = online_migration.run_backfill(
+            connection, online_migration.PRICE_CENTS, chunk_size=4, max_chunks=2
+        )
+        assert (first.rows_done, first.rows_pending, first.finished) == (8, 2, False)
+
+        seen = []
+        rest = online_migration.run_backfill(
+            connection, online_migration.PRICE_CENTS, chunk_size=4, on_progress=seen.append
+        )
+        assert (rest.rows_done, rest.finished) == (2, True)
+        assert seen[-1].finished
+
+        again = online_migration.run_backfill(connection, online_migration.PRICE_CENTS)
+        assert again.finished and again.rows_done == 10
+
+    checkpoint = test_db.get(models.OnlineMigration, "sweets_price_cents")
+    assert checkpoint.rows_done == 10 and checkpoint.finished_at is not None
+    cents = [s.price_cents for s in test_db.query(models.Sweet).order_by(models.Sweet.id)]
+    assert cents == [models.price_to_cents(0.01 * i + 0.1) for i in range(10)]
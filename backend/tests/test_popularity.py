@@ -0,0 +1,132 @@
+# backend/tests/test_popularity.py
+from app import models
+from app.popularity import DecayedSpaceSaving, PopularityTracker, get_tracker
+
+
+def get_token(client, email="popular@test.com"):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def test_space_saving_keeps_heavy_hitters_in_fixed_memory():
+    sketch = DecayedSpaceSaving(capacity=3, half_life=60, clock=lambda: 0.0)
+    # Two heavy sweets among a long tail of one-off purchases
+    for i in range(100):
+        sketch.add(1)
+        sketch.add(2 if i % 2 else 1000 + i)
+    for i in range(50):
+        sketch.add(2)
+
+    assert len(sketch) == 3
+    assert [item for item, _, _ in sketch.top(2)] == [1, 2]
+    count, error = sketch.top(1)[0][1:]
+    assert count - error <= 100 <= count
+
+
+def test_decay_halves_counts_per_half_life():
+    now = [0.0]
+    sketch = DecayedSpaceSaving(capacity=10, half_life=60, clock=lambda: now[0])
+    for _ in range(8):
+        sketch.add(1)
+    now[0] = 120.0
+    sketch.add(2, 3)
+
+    assert sketch.top(2) == [(2, 3.0, 0.0), (1, 2.0, 0.0)]
+
+    # Far in the future the landmark moves, and ratios are preserved
+    now[0] = 120.0 + 60 * 100
+    sketch.add(2)
+    assert [round(c, 6) for _, c, _ in sketch.top(2)] == [1.0, 0.0]
+
+
+def test_popular_endpoint_ranks_recent_purchases(client, test_db):
+    test_db.add_all([
+        models.Sweet(name="Fudge", category="Fudge", price=2.0, quantity=10),
+        models.Sweet(name="Toffee", category="Toffee", price=1.0, quantity=10),
+        models.Sweet(name="Nougat", category="Nougat", price=3.0, quantity=10),
+    ])
+    test_db.commit()
+    fudge, toffee, _ = [s.id for s in test_db.query(models.Sweet).order_by(models.Sweet.id)]
+    headers = {"Authorization": f"Bearer {get_token(client)}"}
+
+    assert client.get("/api/sweets/popular").json() == []
+
+    for sweet_id in (fudge, toffee, toffee, toffee, fudge):
+        client.post(f"/api/sweets/{sweet_id}/purchase", headers=headers)
+
+    response = client.get("/api/sweets/popular?limit=5")
+    assert response.status_code == 200
+    shelf = response.json()
+    assert [(s["name"], s["quantity"]) for s in shelf] == [("Toffee", 7), ("Fudge", 8)]
+    assert shelf[0]["score"] > shelf[1]["score"] > 0
+    assert len(client.get("/api/sweets/popular?limit=1").json()) == 1
+
+
+def test_popular_shelf_survives_restart(client, test_db):
+    test_db.add(models.Sweet(name="Halva", category="Halva", price=2.0, quantity=10))
+    test_db.commit()
+    sweet_id = test_db.query(models.Sweet).first().id
+    headers = {"Authorization": f"Bearer {get_token(client, 'restart@test.com')}"}
+    client.post(f"/api/sweets/{sweet_id}/purchase", headers=headers)
+
+    tracker = get_tracker()
+    tracker.save()
+    assert test_db.query(models.PopularSweet).count() == 1
+
+    # A new process starts with an empty sketch and reloads the snapshot
+    tracker.reset()
+    assert [s["name"] for s in client.get("/api/sweets/popular").json()] == ["Halva"]
+
+
+def saved_counts(test_db):
+    test_db.expire_all()
+    return {row.sweet_id: round(row.count, 2) for row in test_db.query(models.PopularSweet)}
+
+
+def test_workers_merge_their_snapshots(client, test_db):
+    test_db.add_all([
+        models.Sweet(name="Fudge", category="Fudge", price=2.0, quantity=10),
+        models.Sweet(name="Toffee", category="Toffee", price=1.0, quantity=10),
+    ])
+    test_db.commit()
+    # Two worker processes, each with the purchases it served
+    north, south = PopularityTracker(), PopularityTracker()
+    for tracker in (north, south):
+        tracker.ensure_loaded(test_db)
+    north.record(1, 3)
+    south.record(1)
+    south.record(2, 2)
+
+    north.save()
+    south.save()
+    assert saved_counts(test_db) == {1: 4.0, 2: 2.0}
+
+    # Only what was recorded since the last snapshot is added again
+    north.record(2)
+    north.save()
+    assert saved_counts(test_db) == {1: 4.0, 2: 3.0}
+
+
+def test_failed_snapshot_is_retried(client, test_db):
+    test_db.add(models.Sweet(name="Halva", category="Halva", price=2.0, quantity=10))
+    test_db.commit()
+    tracker = PopularityTracker()
+    tracker.ensure_loaded(test_db)
+    tracker.record(1, 2)
+
+    def fail(*args):
+        raise RuntimeError("database is locked")
+
+    tracker.snapshot = fail
+    tracker.save()
+    assert tracker.dirty and saved_counts(test_db) == {}
+
+    del tracker.snapshot
+    tracker.record(1)
+    tracker.save()
+    assert not tracker.dirty and saved_counts(test_db) == {1: 3.0}
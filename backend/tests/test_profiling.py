@@ -0,0 +1,67 @@
+# backend/tests/test_profiling.py
+import json
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import profiling
+from app.auth import create_access_token
+from app.config import get_settings
+from tests.conftest import engine
+
+
+def build_app(tmp_path, monkeypatch, sample_rate=0.0):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_sample_rate", sample_rate)
+
+    app = FastAPI()
+
+    @app.get("/numbers")
+    def numbers():
+        with engine.connect() as conn:
+            return {"sum": sum(conn.execute(text("SELECT 1")).scalar() for _ in range(3))}
+
+    profiling.install(app)
+    return TestClient(app)
+
+
+def bearer(is_admin):
+    token = create_access_token({"sub": "someone@test.com", "is_admin": is_admin})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_admin_request_writes_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_pyinstrument", lambda: None)
+    client = build_app(tmp_path, monkeypatch)
+
+    response = client.get("/numbers", headers={"X-Profile": "1", **bearer(True)})
+    assert response.json() == {"sum": 3}
+
+    profile_id = response.headers["x-profile-id"]
+    summary = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert summary["reason"] == "requested" and summary["status_code"] == 200
+    assert summary["sql_count"] == 3
+    assert summary["statements"][0]["sql"] == "SELECT 1" and summary["statements"][0]["count"] == 3
+    assert 0 < summary["endpoint_ms"] <= summary["total_ms"]
+
+    stats = pstats.Stats(str(tmp_path / f"{profile_id}.pstats"))
+    assert any(name == "numbers" for _, _, name in stats.stats)
+
+
+def test_only_admins_can_ask_for_a_profile(tmp_path, monkeypatch):
+    client = build_app(tmp_path, monkeypatch)
+
+    assert "x-profile-id" not in client.get("/numbers?profile=1", headers=bearer(False)).headers
+    assert "x-profile-id" not in client.get("/numbers?profile=1").headers
+    assert "x-profile-id" in client.get("/numbers?profile=1", headers=bearer(True)).headers
+    assert "x-profile-id" not in client.get("/numbers?profile=0", headers=bearer(True)).headers
+
+
+def test_sampled_requests_are_profiled_without_a_token(tmp_path, monkeypatch):
+    client = build_app(tmp_path, monkeypatch, sample_rate=1.0)
+
+    profile_id = client.get("/numbers").headers["x-profile-id"]
+    assert json.loads((tmp_path / f"{profile_id}.json").read_text())["reason"] == "sampled"
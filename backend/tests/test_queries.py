@@ -0,0 +1,61 @@
+# backend/tests/test_queries.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, queries
+from app.database import Base
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+    Base.metadata.create_all(engine)
+    queries.track(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.Sweet(name="Dark Truffle", category="Chocolate", price=3.0, quantity=5),
+        models.Sweet(name="Milk Truffle", category="Chocolate", price=2.0, quantity=0),
+        models.Sweet(name="Gummy Bears", category="Gummy", price=1.0, quantity=9),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def names(sweets):
+    return [sweet.name for sweet in sweets]
+
+
+def test_lookups(db):
+    assert queries.sweet_by_id(db, 3).name == "Gummy Bears"
+    assert queries.sweet_by_id(db, 99) is None
+    assert sorted(names(queries.sweets_by_ids(db, [1, 3]))) == ["Dark Truffle", "Gummy Bears"]
+    assert names(queries.list_sweets(db, 1, 1)) == ["Milk Truffle"]
+    assert queries.user_by_email(db, "nobody@test.com") is None
+
+
+def test_search_filters_match_the_query_builder(db):
+    assert names(queries.search_sweets(db, q="truffle", sort="price")) == ["Milk Truffle", "Dark Truffle"]
+    assert names(queries.search_sweets(db, category="choc", in_stock=True)) == ["Dark Truffle"]
+    assert names(queries.search_sweets(db, price_min=1.5, price_max=2.5)) == ["Milk Truffle"]
+    assert names(queries.search_sweets(db, sort="-quantity", skip=1, limit=1)) == ["Dark Truffle"]
+    assert names(queries.search_sweets(db, in_stock=False)) == ["Milk Truffle"]
+
+
+def test_same_shape_reuses_statement_and_compiled_sql(db):
+    first, params = queries.search_statement(q="bear", price_max=5.0, limit=10)
+    assert params == {"q": "%bear%", "price_max": 5.0, "limit": 10}
+    second, _ = queries.search_statement(q="truffle", price_max=2.0, limit=3)
+    assert second is first
+    assert queries.search_statement(q="bear", limit=10)[0] is not first
+
+    queries.search_sweets(db, q="warmup", price_max=1.0)
+    before = queries.stats()
+    for word in ("dark", "milk", "gummy"):
+        queries.search_sweets(db, q=word, price_max=9.0)
+    after = queries.stats()
+    assert after["shape_hits"] - before["shape_hits"] == 3
+    assert after["compiled_hits"] - before["compiled_hits"] == 3
+    assert after["compiled_misses"] == before["compiled_misses"]
@@ -0,0 +1,93 @@
+# backend/tests/test_refresh_tokens.py
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, refresh_tokens
+from app.database import Base
+
+
+def login(client, email="session@test.com", password="pass"):
+    client.post("/api/auth/register", json={"email": email, "password": password})
+    return client.post(
+        "/api/auth/login",
+        data={"username": email, "password": password},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+
+
+def test_refresh_rotates_and_detects_reuse(client, test_db):
+    first = login(client).json()
+    assert first["refresh_token"]
+
+    refreshed = client.post("/api/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert refreshed.status_code == 200
+    second = refreshed.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    assert client.get("/api/sweets/", headers={"Authorization": f"Bearer {second['access_token']}"}).status_code == 200
+
+    # Replaying the rotated token revokes the whole session, including the new token
+    assert client.post("/api/auth/refresh", json={"refresh_token": first["refresh_token"]}).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": second["refresh_token"]}).status_code == 401
+
+    # Only hashes are stored
+    stored = {t.token_hash for t in test_db.query(models.RefreshToken)}
+    assert first["refresh_token"] not in stored and len(stored) == 2
+
+
+def test_logout_revokes_refresh_token(client):
+    tokens = login(client, "logout@test.com").json()
+    assert client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 204
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": "made-up"}).status_code == 401
+
+
+def test_password_change_revokes_other_sessions(client):
+    phone = login(client, "change@test.com").json()
+    laptop = login(client, "change@test.com").json()
+
+    response = client.post(
+        "/api/auth/change-password",
+        json={"current_password": "pass", "new_password": "better"},
+        headers={"Authorization": f"Bearer {laptop['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert client.post("/api/auth/refresh", json={"refresh_token": phone["refresh_token"]}).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": response.json()["refresh_token"]}).status_code == 200
+
+    wrong = client.post(
+        "/api/auth/change-password",
+        json={"current_password": "nope", "new_password": "x"},
+        headers={"Authorization": f"Bearer {laptop['access_token']}"},
+    )
+    assert wrong.status_code == 400
+    assert login(client, "change@test.com", "better").status_code == 200
+
+
+def test_concurrent_refreshes_with_one_token_count_as_reuse(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tokens.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        user = models.User(email="race@test.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        raw = refresh_tokens.issue(db, user)
+        db.commit()
+
+    first, second = Session(), Session()
+    try:
+        # The second request has already read the token when the first one rotates it
+        seen = second.query(models.RefreshToken).all()
+        assert refresh_tokens.rotate(first, raw) is not None
+        first.commit()
+
+        assert refresh_tokens.rotate(second, raw) is None and seen
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+
+    with Session() as db:
+        # Reuse detected: the token issued to the first request is revoked too
+        assert db.query(models.RefreshToken).filter(models.RefreshToken.revoked_at.is_(None)).count() == 0
+    engine.dispose()
@@ -0,0 +1,126 @@
+# backend/tests/test_restock.py
+import pytest
+
+from app import models, sales
+
+np = pytest.importorskip("numpy")
+
+from app import restock  # noqa: E402
+
+
+def get_token(client, test_db, email="planner@test.com", admin=True):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    if admin:
+        user = test_db.query(models.User).filter(models.User.email == email).first()
+        user.is_admin = True
+        test_db.commit()
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+
+def steady_sales(sweet_id, per_day, days, today):
+    return [models.SweetDailySales(sweet_id=sweet_id, day=today - offset, units=per_day) for offset in range(days)]
+
+
+def test_purchases_are_recorded_in_the_ledger(client, test_db):
+    headers = get_token(client, test_db, "buyer@test.com", admin=False)
+    test_db.add(models.Sweet(name="Barfi", category="Milk", price=2.0, quantity=5))
+    test_db.commit()
+
+    client.post("/api/sweets/1/purchase", headers=headers)
+    client.post("/api/sweets/1/purchase", headers=headers)
+
+    row = test_db.query(models.SweetDailySales).one()
+    assert (row.sweet_id, row.day, row.units) == (1, sales.today(), 2)
+
+
+def test_compute_plans_the_whole_catalog_at_once():
+    today = 20_000
+    ids = np.array([1, 2, 3, 4])
+    on_hand = np.array([2, 50, 0, 5])
+    ledger = np.array([
+        [1, 20, 40, today - 9],  # 2 a day for 10 days
+        [2, 20, 40, today - 9],  # same demand, plenty in stock
+        [4, 4, 16, today - 3],   # 4 units on one day out of 4
+        [9, 99, 99, today],      # no longer on sale
+    ])
+    demand, reorder_point, amount = restock.compute(
+        ids, on_hand, ledger, today, history_days=90, lead_days=7, cover_days=14, z=1.65
+    )
+
+    assert demand.tolist() == [2.0, 2.0, 0.0, 1.0]
+    # Steady demand needs no safety stock; lumpy demand gets some
+    assert reorder_point.tolist() == [14, 14, 0, 15]
+    assert amount.tolist() == [40, 0, 0, 24]
+
+
+def test_plan_and_apply(client, test_db):
+    headers = get_token(client, test_db)
+    test_db.add_all([
+        models.Sweet(name="Barfi", category="Milk", price=2.0, quantity=2),
+        models.Sweet(name="Peda", category="Milk", price=1.5, quantity=50),
+        models.Sweet(name="Jalebi", category="Fried", price=1.0, quantity=3),
+    ])
+    today = sales.today()
+    test_db.add_all(steady_sales(1, 2, 10, today) + steady_sales(2, 2, 10, today) + steady_sales(3, 1, 30, today))
+    test_db.commit()
+
+    plan = client.get("/api/sweets/restock-plan", headers=headers).json()
+    assert plan["sweets_considered"] == 3
+    # Barfi has one day of stock left, Jalebi three
+    assert [(i["sweet_id"], i["suggested_amount"], i["days_of_stock"]) for i in plan["items"]] == [
+        (1, 40, 1.0), (3, 18, 3.0),
+    ]
+    assert client.get("/api/sweets/restock-plan?limit=1", headers=headers).json()["items"][0]["sweet_id"] == 1
+
+    applied = client.post("/api/sweets/restock-plan/apply", headers=headers).json()
+    assert applied == {"restocked": 2, "units": 58, "skipped": []}
+    quantities = {s["id"]: s["quantity"] for s in client.get("/api/sweets/").json()}
+    assert quantities == {1: 42, 2: 50, 3: 21}
+    assert client.get("/api/sweets/restock-plan", headers=headers).json()["items"] == []
+
+    audit = client.get("/api/audit/?action=restock", headers=headers).json()
+    assert sorted(e["sweet_id"] for e in audit) == [1, 3]
+
+
+def test_apply_edited_plan(client, test_db):
+    headers = get_token(client, test_db, "editor@test.com")
+    test_db.add(models.Sweet(name="Kulfi", category="Frozen", price=2.0, quantity=1))
+    test_db.commit()
+
+    response = client.post("/api/sweets/restock-plan/apply", headers=headers,
+                           json={"items": [{"sweet_id": 1, "amount": 10}, {"sweet_id": 99, "amount": 5}]})
+    assert response.json() == {"restocked": 1, "units": 10, "skipped": [99]}
+    assert client.get("/api/sweets/").json()[0]["quantity"] == 11
+
+    bad = client.post("/api/sweets/restock-plan/apply", headers=headers, json={"items": [{"sweet_id": 1, "amount": 0}]})
+    assert bad.status_code == 400
+
+    duplicate = client.post("/api/sweets/restock-plan/apply", headers=headers,
+                            json={"items": [{"sweet_id": 1, "amount": 10}, {"sweet_id": 1, "amount": 5}]})
+    assert duplicate.status_code == 400
+    assert client.get("/api/sweets/").json()[0]["quantity"] == 11
+
+
+def test_restock_plan_is_admin_only(client, test_db):
+    headers = get_token(client, test_db, "shopper@test.com", admin=False)
+    assert client.get("/api/sweets/restock-plan", headers=headers).status_code == 403
+    assert client.post("/api/sweets/restock-plan/apply", headers=headers).status_code == 403
+
+
+def test_ledger_keeps_only_the_planning_window(test_db):
+    today = sales.today()
+    test_db.add_all(steady_sales(1, 2, 120, today))
+    test_db.commit()
+
+    before_day = today - 90 + 1
+    assert sales.prune(test_db, before_day, batch_size=20) == 20
+    assert sales.prune(test_db, before_day, batch_size=20) == 10
+    assert sales.prune(test_db, before_day, batch_size=20) == 0
+    test_db.commit()
+    days = [day for (day,) in test_db.query(models.SweetDailySales.day)]
+    assert len(days) == 90 and min(days) == before_day
@@ -0,0 +1,38 @@
+# backend/tests/test_serve.py
+from sqlalchemy import text
+
+from app import database, serve
+from app.config import get_settings
+
+
+def test_default_workers(monkeypatch):
+    assert serve.available_cpus() >= 1
+
+    monkeypatch.setattr(get_settings(), "web_concurrency", None)
+    assert serve.default_workers() == serve.available_cpus()
+
+    monkeypatch.setattr(get_settings(), "web_concurrency", 3)
+    assert serve.default_workers() == 3
+
+
+def test_engine_is_recreated_after_fork(monkeypatch, tmp_path):
+    monkeypatch.setattr(get_settings(), "database_url", f"sqlite:///{tmp_path / 'shop.db'}")
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "_engine_pid", None)
+
+    parent_engine = database.get_engine()
+    assert database.get_engine() is parent_engine
+
+    # Simulate running inside a forked worker
+    monkeypatch.setattr(database.os, "getpid", lambda: -1)
+    child_engine = database.get_engine()
+    assert child_engine is not parent_engine
+
+    # File databases are opened in WAL mode with a busy timeout
+    with child_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == get_settings().sqlite_busy_timeout_ms
+
+    database.dispose_engine()
+    assert database._engine is None
+    parent_engine.dispose()
@@ -0,0 +1,70 @@
+# backend/tests/test_sessions.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+
+from app import database, models
+from app.database import Base, ReadOnlySession, get_read_db
+from app.main import app
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_get_db_opens_the_session_on_first_use(engine, monkeypatch):
+    opened = []
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(database, "SessionLocal", lambda: opened.append(1) or factory())
+    before = database.session_stats()
+
+    # A request that never queries
+    untouched = database.get_db()
+    next(untouched)
+    untouched.close()
+    assert opened == []
+
+    used = database.get_db()
+    db = next(used)
+    assert db.query(models.Sweet).count() == 0
+    used.close()
+    assert opened == [1]
+
+    after = database.session_stats()
+    assert after["requests"] - before["requests"] == 2
+    assert after["untouched"] - before["untouched"] == 1
+
+
+def test_read_only_session_reads_but_refuses_writes(engine, monkeypatch):
+    with sessionmaker(bind=engine)() as db:
+        db.add(models.Sweet(name="Barfi", category="Milk", price=1.0, quantity=2))
+        db.commit()
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(class_=ReadOnlySession, bind=engine))
+
+    dependency = database.get_read_db()
+    db = next(dependency)
+    sweet = db.query(models.Sweet).one()
+    sweet.quantity = 0
+    db.add(models.Sweet(name="Peda", category="Milk", price=1.0, quantity=1))
+    with pytest.raises(InvalidRequestError):
+        db.commit()
+    dependency.close()
+
+    with sessionmaker(bind=engine)() as db:
+        assert [(s.name, s.quantity) for s in db.query(models.Sweet)] == [("Barfi", 2)]
+
+
+def test_get_routes_in_tests_read_through_a_read_only_session(client, test_db):
+    dependency = app.dependency_overrides[get_read_db]()
+    db = next(dependency)
+    assert isinstance(db, ReadOnlySession)
+    db.add(models.Sweet(name="Peda", category="Milk", price=1.0, quantity=1))
+    with pytest.raises(InvalidRequestError):
+        db.commit()
+    dependency.close()
+    assert client.get("/api/sweets/").json() == []
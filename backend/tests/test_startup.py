@@ -0,0 +1,24 @@
+# backend/tests/test_startup.py
+import os
+
+from benchmarks.bench_startup import DEFERRED_MODULES, run_probe
+
+# Generous enough for slow CI machines; catches eager heavy imports creeping back.
+# Override with COLD_START_BUDGET_SECONDS to tighten it on known hardware.
+COLD_START_BUDGET_SECONDS = float(os.environ.get("COLD_START_BUDGET_SECONDS", "1.5"))
+
+
+def test_cold_start_within_budget():
+    # Best of 3 fresh interpreters, to ignore one-off disk/cache hiccups.
+    # The first response includes lifespan startup and the middleware build.
+    results = [run_probe() for _ in range(3)]
+    best = min(r["import_s"] + r["first_response_s"] for r in results)
+
+    assert best < COLD_START_BUDGET_SECONDS, f"cold start took {best:.3f}s"
+
+
+def test_heavy_dependencies_are_deferred():
+    result = run_probe()
+
+    assert result["loaded_deferred"] == [], f"{DEFERRED_MODULES} must be imported on first use"
+    assert not result["settings_loaded"], "settings (.env) must be read on first use, not at import"
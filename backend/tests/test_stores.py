@@ -0,0 +1,108 @@
+# backend/tests/test_stores.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import models, stores
+from app.config import get_settings
+from app.database import Base
+from app.main import app
+
+
+@pytest.fixture
+def multi_store(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "store_database_url", f"sqlite:///{tmp_path}/{{store}}.db")
+    monkeypatch.setattr(settings, "store_ids", ["north", "south"])
+    registry = stores.EngineRegistry(max_engines=4, idle_seconds=600)
+    monkeypatch.setattr(stores, "_registry", registry)
+    for store in ("north", "south"):
+        Base.metadata.create_all(registry.get(store))
+    yield registry
+    registry.dispose_all()
+
+
+def add_sweets(registry, store, *sweets):
+    with sessionmaker(bind=registry.get(store))() as db:
+        db.add_all(models.Sweet(name=name, category="Test", price=price, quantity=qty) for name, price, qty in sweets)
+        db.commit()
+
+
+def admin_headers(client, registry, store):
+    client.post("/api/auth/register", json={"email": "boss@test.com", "password": "pass"},
+                headers={"X-Store-Id": store})
+    with sessionmaker(bind=registry.get(store))() as db:
+        db.query(models.User).update({"is_admin": True})
+        db.commit()
+    token = client.post(
+        f"/stores/{store}/api/auth/login",
+        data={"username": "boss@test.com", "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}", "X-Store-Id": store}
+
+
+def test_requests_are_routed_to_their_store(multi_store):
+    add_sweets(multi_store, "north", ("Ladoo", 1.0, 5))
+    add_sweets(multi_store, "south", ("Payasam", 2.0, 3), ("Mysore Pak", 1.5, 4))
+
+    with TestClient(app) as client:
+        assert [s["name"] for s in client.get("/stores/north/api/sweets/").json()] == ["Ladoo"]
+        south = client.get("/api/sweets/", headers={"X-Store-Id": "south"}).json()
+        assert sorted(s["name"] for s in south) == ["Mysore Pak", "Payasam"]
+        assert client.get("/stores/east/api/sweets/").status_code == 404
+
+
+def test_cross_store_queries_fan_out_and_merge(multi_store):
+    add_sweets(multi_store, "north", ("Ladoo", 1.0, 5), ("Jalebi", 0.5, 10))
+    add_sweets(multi_store, "south", ("Ladoo", 1.2, 2))
+
+    with TestClient(app) as client:
+        headers = admin_headers(client, multi_store, "north")
+
+        summary = client.get("/api/stores/", headers=headers).json()
+        assert summary == [
+            {"store": "north", "sweets": 2, "units": 15, "stock_value": 10.0},
+            {"store": "south", "sweets": 1, "units": 2, "stock_value": 2.4},
+        ]
+
+        found = client.get("/api/stores/sweets/search?q=lad", headers=headers).json()
+        assert [(s["store"], s["price"]) for s in found] == [("north", 1.0), ("south", 1.2)]
+
+        # Categories are resolved per store, exact name first
+        found = client.get("/api/stores/sweets/search?category=TEST&limit=2", headers=headers).json()
+        assert [(s["store"], s["name"]) for s in found] == [("north", "Jalebi"), ("north", "Ladoo")]
+        assert client.get("/api/stores/sweets/search?category=toffee", headers=headers).json() == []
+
+
+def test_registry_evicts_least_recently_used_engines(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "store_database_url", f"sqlite:///{tmp_path}/{{store}}.db")
+    registry = stores.EngineRegistry(max_engines=2, idle_seconds=600)
+
+    north = registry.get("north")
+    registry.get("south")
+    assert registry.get("north") is north
+    registry.get("east")
+
+    assert registry.open_stores() == ["north", "east"]
+    registry.dispose_all()
+
+
+def test_tokens_only_work_in_their_store(multi_store):
+    with TestClient(app) as client:
+        admin_headers(client, multi_store, "north")
+        # Someone registers the north admin's email in another store
+        client.post("/stores/south/api/auth/register", json={"email": "boss@test.com", "password": "other"})
+        south = client.post(
+            "/stores/south/api/auth/login",
+            data={"username": "boss@test.com", "password": "other"},
+            headers={"content-type": "application/x-www-form-urlencoded"}
+        ).json()
+
+        sweet = {"name": "Ladoo", "category": "Test", "price": 1.0, "quantity": 1}
+        forged = {"Authorization": f"Bearer {south['access_token']}", "X-Store-Id": "north"}
+        assert client.post("/api/sweets/", json=sweet, headers=forged).status_code == 401
+        assert client.post("/stores/north/api/auth/refresh",
+                           json={"refresh_token": south["refresh_token"]}).status_code == 401
+        assert client.post("/stores/south/api/auth/refresh",
+                           json={"refresh_token": south["refresh_token"]}).status_code == 200
@@ -0,0 +1,99 @@
+# backend/tests/test_suggest.py
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app import changefeed, models
+from app.config import get_settings
+from app.suggest import Suggester
+
+
+def get_admin_token(client, test_db, email="suggest_admin@test.com"):
+    client.post("/api/auth/register", json={"email": email, "password": "pass"})
+    user = test_db.query(models.User).filter(models.User.email == email).first()
+    user.is_admin = True
+    test_db.commit()
+
+    login_res = client.post(
+        "/api/auth/login",
+        data={"username": email, "password": "pass"},
+        headers={"content-type": "application/x-www-form-urlencoded"}
+    )
+    return login_res.json()["access_token"]
+
+
+def test_suggest_by_prefix_weighted_by_stock(client, test_db):
+    test_db.add_all([
+        models.Sweet(name="Dark Chocolate", category="Chocolate", price=3.0, quantity=5),
+        models.Sweet(name="Milk Chocolate", category="Chocolate", price=2.0, quantity=50),
+        models.Sweet(name="Churros", category="Pastry", price=1.0, quantity=1),
+    ])
+    test_db.commit()
+
+    response = client.get("/api/sweets/suggest?prefix=CH")
+    assert response.status_code == 200
+    texts = [s["text"] for s in response.json()]
+    # Category "Chocolate" carries 55 units, then the word-start match "Milk Chocolate"
+    assert texts == ["Chocolate", "Milk Chocolate", "Dark Chocolate", "Churros"]
+
+    limited = client.get("/api/sweets/suggest?prefix=ch&limit=1").json()
+    assert limited == [{"text": "Chocolate", "kind": "category", "score": 55}]
+
+
+def test_suggest_follows_catalog_mutations(client, test_db):
+    token = get_admin_token(client, test_db)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Load the index while the catalog is empty
+    assert client.get("/api/sweets/suggest?prefix=lol").json() == []
+
+    create_res = client.post(
+        "/api/sweets",
+        json={"name": "Lollipop", "category": "Hard", "price": 0.5, "quantity": 3},
+        headers=headers
+    )
+    sweet_id = create_res.json()["id"]
+    assert [s["text"] for s in client.get("/api/sweets/suggest?prefix=lol").json()] == ["Lollipop"]
+
+    client.put(f"/api/sweets/{sweet_id}", json={"name": "Gobstopper"}, headers=headers)
+    assert client.get("/api/sweets/suggest?prefix=lol").json() == []
+    assert client.get("/api/sweets/suggest?prefix=gob").json()[0]["score"] == 3
+
+    client.delete(f"/api/sweets/{sweet_id}", headers=headers)
+    assert client.get("/api/sweets/suggest?prefix=gob").json() == []
+
+
+def test_suggest_picks_up_other_workers_changes(client, test_db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "catalog_sync_seconds", 0)
+    test_db.add_all([
+        models.Sweet(name="Lollipop", category="Hard", price=0.5, quantity=3),
+        models.Sweet(name="Toffee", category="Chewy", price=1.0, quantity=2),
+    ])
+    test_db.commit()
+    assert [s["text"] for s in client.get("/api/sweets/suggest?prefix=lol").json()] == ["Lollipop"]
+
+    # Written by another worker: this process only sees it through the change feed
+    test_db.execute(update(models.Sweet).where(models.Sweet.id == 1).values(name="Gobstopper"))
+    test_db.execute(update(models.Sweet).where(models.Sweet.id == 2).values(discontinued_at=datetime(2026, 1, 1)))
+    changefeed.mark_changed(test_db, 1)
+    changefeed.mark_deleted(test_db, [2])
+    test_db.commit()
+
+    assert client.get("/api/sweets/suggest?prefix=lol").json() == []
+    assert [s["text"] for s in client.get("/api/sweets/suggest?prefix=gob").json()] == ["Gobstopper"]
+    assert client.get("/api/sweets/suggest?prefix=tof").json() == []
+
+
+def test_suggester_normalizes_and_dedupes():
+    suggester = Suggester()
+    suggester.load([
+        (1, "Crème Brûlée", "Dessert", 4),
+        (2, "creme brulee", "Dessert", 6),
+    ])
+
+    results = suggester.suggest("CREME", 10)
+    assert results == [{"text": "Crème Brûlée", "kind": "name", "score": 10}]
+
+    suggester.apply_changes([], [1])
+    assert suggester.suggest("brul", 10)[0]["score"] == 6
+    assert suggester.stats()["entries"] == 2
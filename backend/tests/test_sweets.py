@@ -255,9 +255,12 @@ def test_delete_sweet_as_admin(client, test_db):
     # 3. Verify deletion (204 No Content)
     assert response.status_code == 204
     
-    # 4. Verify sweet is gone from DB
+    # 4. Verify sweet is discontinued (the archiver moves it out later) and gone from the catalog
     deleted_sweet = test_db.query(models.Sweet).filter(models.Sweet.id == sweet_id).first()
-    assert deleted_sweet is None
+    assert deleted_sweet.discontinued_at is not None
+    assert sweet_id not in [s["id"] for s in client.get("/api/sweets/").json()]
+    purchase = client.post(f"/api/sweets/{sweet_id}/purchase", headers={"Authorization": f"Bearer {token}"})
+    assert purchase.status_code == 404
 
 
 def test_delete_sweet_as_normal_user_fails(client, test_db):